@@ -1,15 +1,39 @@
 import abc
+from typing import Callable, Sequence
 
 from contacts.contact import Contact
 from contacts.contact_editor import ContactEditor
 from contacts.contact_printer import ContactPrinter
 from contacts.filter import ContactFilter
-from exceptions.exceptions import TerminateActionLoopException
+from exceptions.exceptions import TerminateActionLoopException, InvalidInputException
 from phone_book.phone_book import PhoneBook
-from util.grouping import group_and_print
+from util.grouping import group_and_print, group_phone_book_and_print, get_last_name_first_letter, \
+    LAST_NAME_FIRST_LETTER
 from util.user_input import get_boolean_from_user
 
 
+def print_contact_pages(contact_count: int, get_page: Callable[[int, int], Sequence[Contact]], page_size: int):
+    """
+    Print the contacts a page at a time, the user moves between the pages until they stop.
+    Only the contacts of the shown page are taken, get_page returns the contacts at an offset up to a limit.
+    """
+    printer = ContactPrinter(page_size=page_size)
+    page_count = printer.get_page_count(contact_count)
+    page = 0
+    while True:
+        printer.print_contacts(get_page(page * page_size, page_size))
+        if page_count == 1:
+            return
+        print(f"Page {page + 1} of {page_count}")
+        choice = input("Type 'n' for the next page, 'p' for the previous page or anything else to stop: ")
+        if choice.lower() == "n" and page + 1 < page_count:
+            page += 1
+        elif choice.lower() == "p" and page > 0:
+            page -= 1
+        elif choice.lower() not in ["n", "p"]:
+            return
+
+
 class Action(abc.ABC):
     name: str
 
@@ -41,15 +65,14 @@ class ExitAction(Action):
 
 class ShowContacts(Action):
     name = "Show Contacts"
+    page_size = ContactPrinter.DEFAULT_PAGE_SIZE
 
     def execute(self, phone_book: PhoneBook):
-        if len(phone_book.contacts) == 0:
+        contact_count = phone_book.contact_count
+        if contact_count == 0:
             print("No contacts")
             return
-        printer = ContactPrinter()
-        print(printer.get_headers())
-        for contact in phone_book.contacts:
-            print(printer.to_line(contact))
+        print_contact_pages(contact_count, phone_book.get_contacts_page, self.page_size)
 
 
 class DeleteContact(Action):
@@ -89,20 +112,20 @@ class DeleteCurrentResults(Action):
         if not is_sure:
             print("Operation cancelled")
             return
-        for contact in phone_book.current_results:
-            phone_book.delete_contact(contact)
+        phone_book.delete_contacts(list(phone_book.current_results))
         print("Current contacts deleted")
 
 
 class ShowCurrentContacts(Action):
     name = "Show Current Contacts"
+    page_size = ContactPrinter.DEFAULT_PAGE_SIZE
 
     def execute(self, phone_book: PhoneBook):
         print("Current filter is:")
         print(phone_book.contact_filter)
-        print(f"Current filter matches {len(phone_book.current_results)} contacts shown below")
-        printer = ContactPrinter()
-        printer.print_contacts(phone_book.current_results)
+        contacts = phone_book.current_results
+        print(f"Current filter matches {len(contacts)} contacts shown below")
+        print_contact_pages(len(contacts), lambda offset, limit: contacts[offset:offset + limit], self.page_size)
 
 
 class ResetFilter(Action):
@@ -137,8 +160,7 @@ class GroupByLastNameFirstLetter(Action):
     name = "Group By Last Name First Letter"
 
     def execute(self, phone_book: PhoneBook):
-        contacts = phone_book.contacts
-        group_and_print(contacts, lambda contact: contact.last_name[0])
+        group_phone_book_and_print(phone_book, LAST_NAME_FIRST_LETTER, get_last_name_first_letter, ["last_name"])
 
 
 class GroupCurrentContactsByLastNameFirstLetter(Action):
@@ -146,7 +168,7 @@ class GroupCurrentContactsByLastNameFirstLetter(Action):
 
     def execute(self, phone_book: PhoneBook):
         contacts = phone_book.current_results
-        group_and_print(contacts, lambda contact: contact.last_name[0])
+        group_and_print(contacts, get_last_name_first_letter)
 
 
 class ImportFromFile(Action):
@@ -154,8 +176,15 @@ class ImportFromFile(Action):
 
     def execute(self, phone_book: PhoneBook):
         file_path = input("Insert the full path to the CSV file: ")
-        contacts = Contact.bulk_create_contacts_from_csv(file_path)
-        print(f"Imported {len(contacts)} contacts")
-        for contact in contacts:
-            phone_book.add_contact(contact)
-        print(f"All {len(contacts)} contacts have been saved")
+        reject_file_path = input("Insert the path of the file for the rejected rows (leave empty to stop on errors): ")
+        if reject_file_path == "":
+            reject_file_path = None
+        workers = input("Insert the number of worker processes (leave empty to import in a single process): ")
+        try:
+            workers = int(workers) if workers != "" else 0
+        except ValueError as error:
+            raise InvalidInputException("Invalid number of worker processes") from error
+        imported_count = phone_book.import_from_file(file_path, reject_file_path, workers=workers)
+        print(f"All {imported_count} contacts have been saved")
+        if reject_file_path is not None:
+            print(f"Rejected rows, if any, are written to '{reject_file_path}'")
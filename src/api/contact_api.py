@@ -0,0 +1,180 @@
+"""
+This module contains the routes of the JSON API over a phone book
+"""
+import datetime
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from api.http_protocol import HttpRequest
+from commands.batch import create_filter, parse_date
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import BasePhoneBookException, InvalidRequestException, InvalidInputException, \
+    InvalidNameException, InvalidPhoneNumberException, InvalidEmailException, NoContactsMatchedException, \
+    ContactIsNotRegisteredException, ContactAlreadyExistsException, ValueTooLongException
+from phone_book.phone_book import PhoneBook
+
+CONTACTS_PATH = "/contacts"
+CONTACT_FIELDS = ("first_name", "last_name", "phone_number", "email", "address")
+DATE_PARAMETERS = ("min_created", "max_created", "min_updated", "max_updated")
+STATUS_BY_EXCEPTION = {
+    InvalidInputException: HTTPStatus.BAD_REQUEST,
+    InvalidNameException: HTTPStatus.BAD_REQUEST,
+    InvalidPhoneNumberException: HTTPStatus.BAD_REQUEST,
+    InvalidEmailException: HTTPStatus.BAD_REQUEST,
+    NoContactsMatchedException: HTTPStatus.NOT_FOUND,
+    ContactIsNotRegisteredException: HTTPStatus.NOT_FOUND,
+    ContactAlreadyExistsException: HTTPStatus.CONFLICT,
+    ValueTooLongException: HTTPStatus.BAD_REQUEST,
+}
+
+Response = Tuple[int, Any]
+
+
+def get_contact_payload(contact: Contact) -> Dict[str, Optional[str]]:
+    return {
+        "id": contact.contact_id,
+        "first_name": contact.first_name,
+        "last_name": contact.last_name,
+        "phone_number": contact.phone_number,
+        "email": contact.email,
+        "address": contact.address,
+        "created_date": contact.created_date.isoformat(),
+        "updated_date": contact.updated_date.isoformat(),
+    }
+
+
+def get_error_response(exc: BasePhoneBookException) -> Response:
+    """The status of an exception is the status of its closest class in STATUS_BY_EXCEPTION, 500 by default"""
+    if isinstance(exc, InvalidRequestException):
+        return exc.status, {"error": str(exc)}
+    status = next(
+        (STATUS_BY_EXCEPTION[cls] for cls in type(exc).__mro__ if cls in STATUS_BY_EXCEPTION),
+        HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+    return status, {"error": str(exc)}
+
+
+class ContactApi:
+    """
+    Serves the contacts of a phone book:
+        GET /contacts with the filter, limit and offset query parameters, see get_filter
+        POST /contacts with the fields of the new contact
+        GET, PATCH and DELETE /contacts/<id>, PATCH changes the given fields only
+    Every search runs its own filter with PhoneBook.query, so the filter and the current results of the phone book,
+    which belong to the interactive user, are never changed and concurrent clients do not see each other's filters.
+    The requests are served one at a time, so a request never sees another one half applied.
+    """
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 1000
+
+    def __init__(self, phone_book: PhoneBook):
+        self.phone_book = phone_book
+
+    def handle(self, request: HttpRequest) -> Response:
+        try:
+            return self.route(request)(request)
+        except BasePhoneBookException as exc:
+            return get_error_response(exc)
+
+    def route(self, request: HttpRequest) -> Callable[[HttpRequest], Response]:
+        if request.path in (CONTACTS_PATH, f"{CONTACTS_PATH}/"):
+            handlers = {"GET": self.search_contacts, "POST": self.create_contact}
+        elif request.path.startswith(f"{CONTACTS_PATH}/") and "/" not in request.path[len(CONTACTS_PATH) + 1:]:
+            handlers = {"GET": self.get_contact, "PATCH": self.edit_contact, "DELETE": self.delete_contact}
+        else:
+            raise InvalidRequestException(f"No resource at {request.path}", HTTPStatus.NOT_FOUND)
+        if request.method not in handlers:
+            raise InvalidRequestException(f"{request.method} is not allowed on {request.path}",
+                                          HTTPStatus.METHOD_NOT_ALLOWED)
+        return handlers[request.method]
+
+    def search_contacts(self, request: HttpRequest) -> Response:
+        limit = self.get_integer(request, "limit", self.DEFAULT_LIMIT)
+        offset = self.get_integer(request, "offset", 0)
+        if not 0 <= limit <= self.MAX_LIMIT:
+            raise InvalidRequestException(f"The limit should be between 0 and {self.MAX_LIMIT}")
+        contacts = self.phone_book.query(self.get_filter(request), limit, offset)
+        return HTTPStatus.OK, {
+            "contacts": [get_contact_payload(contact) for contact in contacts],
+            "limit": limit,
+            "offset": offset,
+        }
+
+    @staticmethod
+    def get_filter(request: HttpRequest) -> ContactFilter:
+        """
+        Create the filter of the search query parameters: search, min_created, max_created, min_updated and
+        max_updated with ISO dates, sort with the name of a sort field and descending with true or false
+        """
+        dates: Dict[str, Optional[datetime.datetime]] = {}
+        for name in DATE_PARAMETERS:
+            value = request.query.get(name)
+            try:
+                dates[name] = parse_date(value) if value else None
+            except InvalidInputException as exc:
+                raise InvalidRequestException(f"Invalid {name}: {exc}") from exc
+        sort_name = request.query.get("sort", ContactSort.UPDATED_DATE.name).upper()
+        if sort_name not in ContactSort.__members__:
+            raise InvalidRequestException(f"Invalid sort field {sort_name.lower()!r}")
+        descending = request.query.get("descending", "false").lower()
+        if descending not in ("true", "false"):
+            raise InvalidRequestException("Descending should be true or false")
+        return create_filter(
+            request.query.get("search") or None, dates["min_created"], dates["max_created"], dates["min_updated"],
+            dates["max_updated"], ContactSort[sort_name], descending == "false"
+        )
+
+    @staticmethod
+    def get_integer(request: HttpRequest, name: str, default: int) -> int:
+        value = request.query.get(name)
+        if value is None:
+            return default
+        if not (value.isascii() and value.isdecimal()):
+            raise InvalidRequestException(f"The {name} should be a non-negative integer")
+        return int(value)
+
+    def create_contact(self, request: HttpRequest) -> Response:
+        values = self.get_contact_values(request)
+        contact = Contact(*(values.get(name) for name in CONTACT_FIELDS))
+        self.phone_book.add_contact(contact)
+        return HTTPStatus.CREATED, get_contact_payload(contact)
+
+    def get_contact(self, request: HttpRequest) -> Response:
+        return HTTPStatus.OK, get_contact_payload(self.find_contact(request))
+
+    def edit_contact(self, request: HttpRequest) -> Response:
+        """Validate all the changed fields before changing any of them, so an invalid edit changes nothing"""
+        contact = self.find_contact(request)
+        values = self.get_contact_values(request)
+        merged_values = {name: values.get(name, getattr(contact, name)) for name in CONTACT_FIELDS}
+        Contact.validate(merged_values["first_name"], merged_values["last_name"], merged_values["phone_number"],
+                         merged_values["email"])
+        for name, value in values.items():
+            if getattr(contact, name) != value:
+                setattr(contact, name, value)
+        return HTTPStatus.OK, get_contact_payload(contact)
+
+    def delete_contact(self, request: HttpRequest) -> Response:
+        self.phone_book.delete_contact(self.find_contact(request))
+        return HTTPStatus.NO_CONTENT, None
+
+    def find_contact(self, request: HttpRequest) -> Contact:
+        contact_id = request.path[len(CONTACTS_PATH) + 1:]
+        contacts = self.phone_book.retrieve_contacts_by_id(contact_id)
+        if not contacts:
+            raise NoContactsMatchedException(f"No contacts matched id: {contact_id}")
+        return contacts[0]
+
+    @staticmethod
+    def get_contact_values(request: HttpRequest) -> Dict[str, Optional[str]]:
+        values = request.get_json()
+        if not isinstance(values, dict):
+            raise InvalidRequestException("The body should be a JSON object of the contact fields")
+        unknown_fields = set(values) - set(CONTACT_FIELDS)
+        if unknown_fields:
+            raise InvalidRequestException(f"Unknown contact fields: {', '.join(sorted(unknown_fields))}")
+        for name, value in values.items():
+            if value is not None and not isinstance(value, str):
+                raise InvalidRequestException(f"The {name} should be a string or null")
+        return values
@@ -0,0 +1,122 @@
+"""
+This module contains the minimal HTTP/1.1 reading and writing the JSON API needs: requests with a Content-Length body,
+persistent connections and pipelining, on top of the asyncio streams
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from exceptions.exceptions import InvalidRequestException
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+HEADER_END = b"\r\n\r\n"
+
+
+@dataclass
+class HttpRequest:
+    """
+    A parsed request. The header names are lowercased and a repeated query parameter keeps its last value.
+    The connection is kept alive by default in HTTP/1.1 and only on request in HTTP/1.0.
+    """
+    method: str
+    path: str
+    query: Dict[str, str] = field(default_factory=dict)
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    keep_alive: bool = True
+
+    def get_json(self) -> Any:
+        if not self.body:
+            raise InvalidRequestException("The request has no JSON body")
+        try:
+            return json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise InvalidRequestException(f"Invalid JSON body: {exc}") from exc
+
+
+async def read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Read the request or status line with the headers, return None if the connection is closed before them"""
+    try:
+        return await reader.readuntil(HEADER_END)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial.strip():
+            raise InvalidRequestException("The connection was closed in the middle of the headers") from exc
+        return None
+    except asyncio.LimitOverrunError as exc:
+        raise InvalidRequestException("The headers are too large", HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE) from exc
+
+
+def parse_headers(lines: List[str]) -> Dict[str, str]:
+    headers = {}
+    for line in lines:
+        name, separator, value = line.partition(":")
+        if not separator or not name or name != name.strip():
+            raise InvalidRequestException(f"Invalid header line: {line!r}")
+        headers[name.lower()] = value.strip()
+    return headers
+
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+    if "transfer-encoding" in headers:
+        raise InvalidRequestException("Chunked bodies are not supported", HTTPStatus.LENGTH_REQUIRED)
+    content_length = headers.get("content-length", "0")
+    if not (content_length.isascii() and content_length.isdecimal()):
+        raise InvalidRequestException(f"Invalid Content-Length: {content_length!r}")
+    if int(content_length) > MAX_BODY_SIZE:
+        raise InvalidRequestException("The body is too large", HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    try:
+        return await reader.readexactly(int(content_length))
+    except asyncio.IncompleteReadError as exc:
+        raise InvalidRequestException("The connection was closed in the middle of the body") from exc
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[HttpRequest]:
+    """Read the next request of the connection, return None if the client closed the connection between requests"""
+    head = await read_head(reader)
+    if head is None:
+        return None
+    try:
+        request_line, *header_lines = head[:-len(HEADER_END)].decode("latin-1").split("\r\n")
+        method, target, version = request_line.split(" ")
+    except ValueError as exc:
+        raise InvalidRequestException("Invalid request line") from exc
+    if version not in ("HTTP/1.1", "HTTP/1.0"):
+        raise InvalidRequestException(f"Unsupported version {version}", HTTPStatus.HTTP_VERSION_NOT_SUPPORTED)
+    headers = parse_headers(header_lines)
+    body = await read_body(reader, headers)
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    url = urlsplit(target)
+    return HttpRequest(method, unquote(url.path), dict(parse_qsl(url.query)), headers, body, keep_alive)
+
+
+def encode_response(status: int, payload: Any = None, keep_alive: bool = True) -> bytes:
+    """Encode a response with the JSON of the payload as the body, a None payload has no body"""
+    body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n" \
+           f"Content-Type: application/json\r\n" \
+           f"Content-Length: {len(body)}\r\n" \
+           f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+def encode_request(method: str, target: str, payload: Any = None, host: str = "localhost") -> bytes:
+    """Encode a keep-alive request with the JSON of the payload as the body, used by the clients of the API"""
+    body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+    head = f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n" \
+           f"Content-Length: {len(body)}\r\n\r\n"
+    return head.encode("latin-1") + body
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, Any]:
+    """Read the next response of the connection and return its status with the decoded JSON body"""
+    head = await read_head(reader)
+    if head is None:
+        raise InvalidRequestException("The connection was closed before the response")
+    status_line, *header_lines = head[:-len(HEADER_END)].decode("latin-1").split("\r\n")
+    body = await read_body(reader, parse_headers(header_lines))
+    return int(status_line.split(" ")[1]), json.loads(body) if body else None
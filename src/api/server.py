@@ -0,0 +1,97 @@
+"""
+This module contains the asyncio server of the JSON API
+"""
+import asyncio
+from http import HTTPStatus
+from typing import Dict, Optional
+
+from api.contact_api import ContactApi, get_error_response
+from api.http_protocol import MAX_HEADER_SIZE, encode_response, read_request
+from audit import get_logger_by_name
+from exceptions.exceptions import InvalidRequestException
+from phone_book.phone_book import PhoneBook
+
+
+class ContactServer:
+    """
+    Serves the contact API on a single event loop. Every connection is a cheap coroutine waiting on its socket,
+    so thousands of idle keep-alive connections cost no thread and no CPU, and the pipelined requests of
+    a connection are answered in order.
+    The phone book calls are synchronous and fast, they run on the loop one at a time, which also keeps
+    the phone book consistent without locks. Connections idle for longer than the idle timeout are closed.
+    """
+    logger = get_logger_by_name("ContactServer")
+    _server: Optional[asyncio.AbstractServer]
+    _connections: Dict[asyncio.Task, asyncio.StreamWriter]
+
+    def __init__(
+            self,
+            phone_book: PhoneBook,
+            host: str = "127.0.0.1",
+            port: int = 8080,
+            idle_timeout: float = 60.0,
+            backlog: int = 4096
+    ):
+        self.api = ContactApi(phone_book)
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.backlog = backlog
+        self._server = None
+        self._connections = {}
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._connections)
+
+    async def start(self):
+        """Start listening, with port 0 the port is picked by the system and the port attribute is updated"""
+        self._server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, limit=MAX_HEADER_SIZE, backlog=self.backlog
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self.logger.info("Serving the contacts on http://%s:%d", self.host, self.port)
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, close the open connections and wait until their handlers are done"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections.values()):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except InvalidRequestException as exc:
+                    writer.write(encode_response(*get_error_response(exc), keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                keep_alive = request.keep_alive
+                status, payload = self.api.handle(request)
+                writer.write(encode_response(status, payload, keep_alive))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.logger.exception("Unexpected error while serving a connection")
+            writer.write(encode_response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"}, False))
+        finally:
+            self._connections.pop(task, None)
+            writer.close()
@@ -0,0 +1,43 @@
+import argparse
+import asyncio
+import sys
+
+from benchmarks.api_load import format_load_test_result, run_load_test
+from benchmarks.report import write_results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Phonebook JSON API Load Test",
+        epilog="Start the server first, e.g. python src/serve.py --file-path contacts.csv, "
+               "many connections may need a higher open file limit, see ulimit -n"
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address of the server")
+    parser.add_argument("--port", type=int, default=8080, help="Port of the server")
+    parser.add_argument("--connections", type=int, default=1000, help="Number of concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=20, help="Number of requests sent on every connection")
+    parser.add_argument(
+        "--write-ratio", type=float, default=0.1, help="Share of the requests editing a contact, 0.1 is 10%%"
+    )
+    parser.add_argument("--seed", type=int, default=2023, help="Seed of the random requests")
+    parser.add_argument(
+        "--output", type=str, help="Path of the JSON file to write the result to, it can be a benchmark baseline"
+    )
+
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_load_test(args.host, args.port, args.connections, args.requests, args.write_ratio, args.seed)
+    )
+    print(format_load_test_result(result))
+    if args.output:
+        write_results(args.output, [result.result], {
+            "connections": args.connections, "requests": args.requests, "write_ratio": args.write_ratio,
+            "seed": args.seed, "errors": result.errors,
+        })
+        print(f"Result written to '{args.output}'")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
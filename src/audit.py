@@ -1,9 +1,12 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Iterator, Dict
 
 LOG_FORMAT = "%(asctime)s:%(name)s:%(levelname)s - %(message)s"
 CONSOLE_LOG_FORMAT = "%(levelname)s - %(message)s"
@@ -13,6 +16,7 @@ logging.basicConfig(
 )
 CURRENT_DIRECTORY: Path = Path(__file__).parent
 BASE_DIRECTORY = CURRENT_DIRECTORY.parent
+LOG_DIRECTORY_VARIABLE = "PHONEBOOK_LOG_DIRECTORY"
 
 
 def make_path_absolute(path: str, base_dir: Path = BASE_DIRECTORY) -> Path:
@@ -33,24 +37,150 @@ class LoggingSetup:
     file_name: Optional[str] = None
     max_file_size_in_bytes: int = 1024 * 1024
     file_backup_count: int = 16
-    log_directory: Path = make_path_absolute("logs", BASE_DIRECTORY)
+    log_directory: Path = make_path_absolute(os.environ.get(LOG_DIRECTORY_VARIABLE, "logs"), BASE_DIRECTORY)
     os.makedirs(log_directory, exist_ok=True)
+    asynchronous: bool = True
+    batch_size: int = 1024
 
     def get_effective_log_level(self):
         return min(self.console_level, self.file_level)
 
 
+class AuditLogger(logging.Logger):
+    """
+    Logger which can collapse its records into counts during bulk operations, see collapse_logs.
+    The collapsed records are only counted, they are not even created, so they cost next to nothing.
+    When the logger writes its file asynchronously, it also holds the listener writing the file.
+    """
+    collapsing: bool
+    collapsed_counts: Dict[str, int]
+    queue_listener: Optional[logging.handlers.QueueListener]
+
+    def __init__(self, name: str, level: int = logging.NOTSET):
+        super().__init__(name, level)
+        self.collapsing = False
+        self.collapsed_counts = {}
+        self.queue_listener = None
+
+    def _log(self, level, msg, args, *other_args, **kwargs):  # pylint: disable=arguments-differ
+        if self.collapsing and level <= logging.INFO:
+            self.collapsed_counts[msg] = self.collapsed_counts.get(msg, 0) + 1
+            return
+        super()._log(level, msg, args, *other_args, **kwargs)
+
+    def flush_handlers(self):
+        """Wait until the queued records are written and flush all the handlers"""
+        if self.queue_listener is not None:
+            self.queue_listener.stop()
+            self.queue_listener.start()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler which leaves the formatting of the records to the listener thread.
+    The queue never leaves the process, so the records do not have to be made picklable.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Queue listener which lets the handlers batch the records and flushes them once the queue is drained"""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+        return super().dequeue(block)
+
+    def stop(self):
+        super().stop()
+        for handler in self.handlers:
+            handler.flush()
+
+
+class BatchingRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler which buffers the formatted records and writes them in a single write per batch.
+    A batch which does not fit in the current file is split at the record boundaries, so the files are rolled
+    over like with one write per record, and a record larger than the limit is written alone to a fresh file.
+    """
+    _buffer: List[str]
+
+    def __init__(self, filename, batch_size: int = 1024, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.batch_size = batch_size
+        self._buffer = []
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._buffer.append(self.format(record) + self.terminator)
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer:
+                if self.stream is None:
+                    self.stream = self._open()
+                self._write_buffer()
+            super().flush()
+        finally:
+            self.release()
+
+    def _write_buffer(self):
+        records = self._buffer
+        self._buffer = []
+        size = self.stream.tell()
+        start = 0
+        for index, record in enumerate(records):
+            if 0 < size and 0 < self.maxBytes <= size + len(record):
+                self.stream.write("".join(records[start:index]))
+                self.doRollover()
+                size = 0
+                start = index
+            size += len(record)
+        self.stream.write("".join(records[start:]))
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+_QUEUE_LISTENERS: List[logging.handlers.QueueListener] = []
+
+
+@atexit.register
+def stop_queue_listeners():
+    """Write the remaining queued records, this runs before the logging module shuts down the handlers"""
+    while _QUEUE_LISTENERS:
+        _QUEUE_LISTENERS.pop().stop()
+
+
 def get_logger(log_config: LoggingSetup) -> logging.Logger:
     """
     Create a logger and return.
+    With the asynchronous setup the file records are passed to a background thread through a queue
+    and written in batches, so logging does not block the caller on the file writes.
     Arguments:
         log_config: configuration object of a logger
     Return:
         logger: the created logger
     """
-    logger = logging.getLogger(
-        name=log_config.name
-    )
+    logger_class = logging.getLoggerClass()
+    logging.setLoggerClass(AuditLogger)
+    try:
+        logger = logging.getLogger(
+            name=log_config.name
+        )
+    finally:
+        logging.setLoggerClass(logger_class)
     if logger.handlers:
         logger.warning("This logger is already set up")
         return logger
@@ -73,14 +203,31 @@ def get_logger(log_config: LoggingSetup) -> logging.Logger:
     file_name = log_config.log_directory.joinpath(log_config.file_name)
     file_formatter = logging.Formatter(log_config.file_format)
 
-    file_handler = logging.handlers.RotatingFileHandler(
-        file_name, maxBytes=log_config.max_file_size_in_bytes,
-        backupCount=log_config.file_backup_count
-    )
+    if log_config.asynchronous:
+        file_handler = BatchingRotatingFileHandler(
+            file_name, batch_size=log_config.batch_size, maxBytes=log_config.max_file_size_in_bytes,
+            backupCount=log_config.file_backup_count
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            file_name, maxBytes=log_config.max_file_size_in_bytes,
+            backupCount=log_config.file_backup_count
+        )
     file_handler.setFormatter(file_formatter)
     file_handler.setLevel(log_config.file_level)
 
-    logger.addHandler(file_handler)
+    if log_config.asynchronous:
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.setLevel(log_config.file_level)
+        listener = BatchingQueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        _QUEUE_LISTENERS.append(listener)
+        if isinstance(logger, AuditLogger):
+            logger.queue_listener = listener
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(file_handler)
     logger.debug("Logger %s has been created", logger.name)
     return logger
 
@@ -88,3 +235,30 @@ def get_logger(log_config: LoggingSetup) -> logging.Logger:
 def get_logger_by_name(name: str):
     log_config = LoggingSetup(name=name)
     return get_logger(log_config)
+
+
+@contextmanager
+def collapse_logs(logger: logging.Logger, operation: str) -> Iterator[None]:
+    """
+    Collapse the info and debug records of the logger into a single summary record with their counts,
+    e.g. to avoid a record per contact during an import. Warnings and errors are still logged one by one.
+    The collapsing applies to the logger as a whole, not only to the current thread.
+    Arguments:
+        logger: the logger to collapse, only an AuditLogger can be collapsed
+        operation: name of the bulk operation used in the summary record
+    """
+    if not isinstance(logger, AuditLogger) or logger.collapsing:
+        yield
+        return
+    logger.collapsing = True
+    try:
+        yield
+    finally:
+        logger.collapsing = False
+        counts = logger.collapsed_counts
+        logger.collapsed_counts = {}
+        if counts:
+            summary = "; ".join(
+                f"{count} x '{message}'" for message, count in sorted(counts.items(), key=lambda item: -item[1])
+            )
+            logger.info("%s collapsed %d records: %s", operation, sum(counts.values()), summary)
@@ -0,0 +1,65 @@
+import argparse
+import sys
+import tempfile
+
+from benchmarks.generator import ContactDataGenerator
+from benchmarks.report import compare_results, format_comparison, format_result, read_results, write_results
+from benchmarks.suite import SCENARIOS, iter_benchmark_results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Phonebook Benchmarks")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+        help="Numbers of contacts to run the scenarios on, from 1000 up to 10000000"
+    )
+    parser.add_argument(
+        "--scenarios", choices=list(SCENARIOS), nargs="+", default=list(SCENARIOS),
+        help="Scenarios to run, all of them by default"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=ContactDataGenerator.DEFAULT_SEED,
+        help="Seed of the generated contacts, the same seed generates the same contacts"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times each scenario is repeated")
+    parser.add_argument("--skip-memory", action="store_true", help="Do not measure the peak memory of the scenarios")
+    parser.add_argument(
+        "--vectorized", action="store_true", help="Evaluate the filters with NumPy, which has to be installed"
+    )
+    parser.add_argument("--data-directory", type=str, help="Directory to write the generated CSV files to")
+    parser.add_argument("--output", type=str, help="Path of the JSON file to write the results to")
+    parser.add_argument("--baseline", type=str, help="Path of a JSON results file to compare the results with")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2,
+        help="Slowdown of the median latency against the baseline which fails the run, 0.2 is 20%%"
+    )
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        results = []
+        for result in iter_benchmark_results(
+                args.sizes, args.scenarios, args.data_directory or temporary_directory, args.seed, args.repeat,
+                not args.skip_memory, args.vectorized
+        ):
+            print(format_result(result), flush=True)
+            results.append(result)
+
+    if args.output:
+        write_results(args.output, results, {
+            "sizes": args.sizes, "scenarios": args.scenarios, "seed": args.seed, "repeat": args.repeat,
+            "vectorized": args.vectorized,
+        })
+        print(f"Results written to '{args.output}'")
+    if args.baseline:
+        comparisons = compare_results(results, read_results(args.baseline), args.max_regression)
+        print(f"Compared with the baseline '{args.baseline}':")
+        for comparison in comparisons:
+            print(format_comparison(comparison))
+        if any(comparison.is_regression for comparison in comparisons):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
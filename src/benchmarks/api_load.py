@@ -0,0 +1,135 @@
+"""
+This module contains the load test of the JSON API: many keep-alive connections sending a mix of searches,
+lookups and edits concurrently
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+from urllib.parse import urlencode
+
+from api.http_protocol import encode_request, read_response
+from benchmarks.report import format_result
+from benchmarks.suite import SEARCH_QUERIES, BenchmarkResult
+from exceptions.exceptions import InvalidRequestException
+
+LOAD_SCENARIO = "api_load"
+SEARCH_LIMIT = 20
+ID_SAMPLE_SIZE = 1000
+
+
+@dataclass
+class LoadTestResult:
+    """
+    Measurements of a load test. The benchmark result of the api_load scenario has the number of connections
+    as its size, and its throughput is the number of responses per second of wall time over the whole test.
+    The errors are the responses with an error status and the requests which got no response.
+    """
+    result: BenchmarkResult
+    errors: int
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+
+class LoadClient:
+    """A keep-alive connection sending its requests one after the other and recording their latencies"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str):
+        self.reader = reader
+        self.writer = writer
+        self.host = host
+
+    async def send(self, method: str, target: str, payload=None):
+        self.writer.write(encode_request(method, target, payload, self.host))
+        await self.writer.drain()
+        return await read_response(self.reader)
+
+    async def run(
+            self,
+            request_count: int,
+            contact_ids: List[str],
+            generator: random.Random,
+            write_ratio: float,
+            latencies: List[float],
+            status_counts: Dict[int, int]
+    ):
+        """
+        Send the requests: edits of the address of random contacts with the write ratio, and out of the rest
+        two thirds searches and one third lookups by id
+        """
+        for _ in range(request_count):
+            draw = generator.random()
+            if draw < write_ratio and contact_ids:
+                method, target = "PATCH", f"/contacts/{generator.choice(contact_ids)}"
+                payload = {"address": f"{generator.randrange(1, 10000)} Load St"}
+            elif draw < write_ratio + (1 - write_ratio) * 2 / 3 or not contact_ids:
+                method, payload = "GET", None
+                target = f"/contacts?{urlencode({'search': generator.choice(SEARCH_QUERIES), 'limit': SEARCH_LIMIT})}"
+            else:
+                method, target, payload = "GET", f"/contacts/{generator.choice(contact_ids)}", None
+            start = time.perf_counter()
+            status, _ = await self.send(method, target, payload)
+            latencies.append(time.perf_counter() - start)
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+    def close(self):
+        self.writer.close()
+
+
+async def get_contact_ids(host: str, port: int) -> List[str]:
+    reader, writer = await asyncio.open_connection(host, port)
+    client = LoadClient(reader, writer, host)
+    try:
+        status, body = await client.send("GET", f"/contacts?limit={ID_SAMPLE_SIZE}")
+    finally:
+        client.close()
+    if status != 200:
+        raise InvalidRequestException(f"The contacts could not be listed, the server answered {status}", status)
+    return [contact["id"] for contact in body["contacts"]]
+
+
+async def open_clients(host: str, port: int, count: int) -> List[LoadClient]:
+    """Open the connections concurrently, the ones which fail to open are left out"""
+    opened = await asyncio.gather(*(asyncio.open_connection(host, port) for _ in range(count)), return_exceptions=True)
+    return [LoadClient(*streams, host) for streams in opened if not isinstance(streams, BaseException)]
+
+
+async def run_load_test(
+        host: str,
+        port: int,
+        connections: int = 1000,
+        requests_per_connection: int = 10,
+        write_ratio: float = 0.1,
+        seed: int = 2023
+) -> LoadTestResult:
+    """
+    Open all the connections first, so they are all alive at the same time, then send their requests concurrently.
+    A connection which fails counts its remaining requests as errors.
+    """
+    contact_ids = await get_contact_ids(host, port)
+    clients = await open_clients(host, port, connections)
+    latencies: List[float] = []
+    status_counts: Dict[int, int] = {}
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(client.run(requests_per_connection, contact_ids, random.Random(seed + index), write_ratio, latencies,
+                         status_counts)
+              for index, client in enumerate(clients)),
+            return_exceptions=True
+        )
+    finally:
+        for client in clients:
+            client.close()
+    total_seconds = time.perf_counter() - start
+    errors = sum(count for status, count in status_counts.items() if status >= 400)
+    errors += connections * requests_per_connection - len(latencies)
+    result = BenchmarkResult.from_latencies(LOAD_SCENARIO, connections, len(latencies), latencies)
+    result.total_seconds = total_seconds
+    result.throughput = len(latencies) / total_seconds if total_seconds > 0 else float("inf")
+    return LoadTestResult(result, errors, dict(sorted(status_counts.items())))
+
+
+def format_load_test_result(load_test_result: LoadTestResult) -> str:
+    return f"{format_result(load_test_result.result)} errors {load_test_result.errors} " \
+           f"statuses {load_test_result.status_counts}"
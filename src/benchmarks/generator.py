@@ -0,0 +1,83 @@
+"""
+This module contains the deterministic generator of the synthetic contacts the benchmarks run on
+"""
+import csv
+import datetime
+import random
+import uuid
+from typing import Iterator, List, Optional, Tuple
+
+from contacts.contact import Contact
+from contacts.contact_import import CSV_FIELD_NAMES
+
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Christopher", "Lisa", "Daniel", "Nancy", "Matthew", "Betty", "Anthony", "Sandra", "Mark", "Margaret",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Walker", "Young", "Allen", "King", "Wright", "Scott", "Torres", "Nguyen", "Hill", "Flores",
+]
+STREETS = ["Main", "Elm", "Oak", "Pine", "Maple", "Cedar", "Lake", "Hill", "Park", "Washington"]
+CITIES = ["Springfield, IL 62701", "Chicago, IL 60601", "Los Angeles, CA 90001", "New York, NY 10001"]
+EMAIL_DOMAINS = ["example.com", "mail.com", "uottawa.ca", "phonebook.org"]
+
+RowValues = Tuple[str, str, str, Optional[str], Optional[str]]
+
+
+class ContactDataGenerator:
+    """
+    Generates the same synthetic contacts for the same seed and count, so the runs of the benchmarks are comparable.
+    The names are drawn from small pools, which gives realistic duplicates for the sorts and the groups,
+    the phone numbers and the addresses are mostly unique.
+    The generated contacts are created and updated over the period starting at the start date,
+    one second apart on average.
+    """
+    DEFAULT_SEED = 2023
+    START_DATE = datetime.datetime(2023, 1, 1)
+
+    def __init__(self, seed: int = DEFAULT_SEED):
+        self.seed = seed
+
+    def iter_rows(self, count: int, with_missing_values: bool = False) -> Iterator[RowValues]:
+        """
+        Yield the first name, last name, phone number, email and address of count contacts.
+        With missing values every tenth contact has no email and every seventh contact has no address.
+        """
+        generator = random.Random(self.seed)
+        for index in range(count):
+            first_name = generator.choice(FIRST_NAMES)
+            last_name = generator.choice(LAST_NAMES)
+            phone_number = f"({generator.randrange(200, 1000)}) {generator.randrange(100, 1000)}-" \
+                           f"{generator.randrange(10000):04d}"
+            email = f"{first_name.lower()}.{last_name.lower()}{index}@{generator.choice(EMAIL_DOMAINS)}"
+            address = f"{generator.randrange(1, 10000)} {generator.choice(STREETS)} St, {generator.choice(CITIES)}"
+            if with_missing_values and index % 10 == 0:
+                email = None
+            if with_missing_values and index % 7 == 0:
+                address = None
+            yield first_name, last_name, phone_number, email, address
+
+    def write_csv(self, file_path: str, count: int) -> str:
+        """Write count contacts to the CSV file in the import format, row by row, and return the path"""
+        with open(file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(CSV_FIELD_NAMES)
+            writer.writerows(self.iter_rows(count))
+        return file_path
+
+    def create_contacts(self, count: int) -> List[Contact]:
+        """Create count contacts with ids and dates derived from the seed"""
+        generator = random.Random(self.seed + 1)
+        contacts = []
+        for index, values in enumerate(self.iter_rows(count, with_missing_values=True)):
+            created_date = self.START_DATE + datetime.timedelta(
+                seconds=index, microseconds=generator.randrange(10 ** 6)
+            )
+            updated_date = created_date + datetime.timedelta(seconds=generator.randrange(count))
+            contact_id = str(uuid.UUID(int=generator.getrandbits(128), version=4))
+            contacts.append(Contact.restore(contact_id, *values, created_date, updated_date))
+        return contacts
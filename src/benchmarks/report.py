@@ -0,0 +1,88 @@
+"""
+This module contains the machine-readable output of the benchmark results and their comparison with a baseline
+"""
+import datetime
+import json
+import platform
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from benchmarks.suite import BenchmarkResult
+from exceptions.exceptions import StorageException
+
+RESULTS_FORMAT_VERSION = 1
+
+
+@dataclass
+class Comparison:
+    """The median latency of a scenario compared with the one of the baseline, a ratio above one is slower"""
+    scenario: str
+    size: int
+    baseline_latency: float
+    latency: float
+    ratio: float
+    is_regression: bool
+
+
+def write_results(file_path: str, results: Iterable[BenchmarkResult], metadata: Optional[Dict] = None):
+    """Write the results to a JSON file, together with the Python version and the platform they were measured on"""
+    document = {
+        "version": RESULTS_FORMAT_VERSION,
+        "created": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metadata": metadata or {},
+        "results": [result.to_dict() for result in results],
+    }
+    with open(file_path, mode="w", encoding="utf-8") as results_file:
+        json.dump(document, results_file, indent=2)
+
+
+def read_results(file_path: str) -> List[BenchmarkResult]:
+    try:
+        with open(file_path, mode="r", encoding="utf-8") as results_file:
+            document = json.load(results_file)
+        if document.get("version") != RESULTS_FORMAT_VERSION:
+            raise StorageException(f"Unsupported benchmark results version {document.get('version')}")
+        return [BenchmarkResult.from_dict(values) for values in document["results"]]
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise StorageException(f"Failed to read the benchmark results from '{file_path}'") from exc
+
+
+def compare_results(
+        results: Iterable[BenchmarkResult],
+        baseline: Iterable[BenchmarkResult],
+        max_regression: float = 0.2
+) -> List[Comparison]:
+    """
+    Compare the median latencies of the results with the ones of the same scenarios and sizes in the baseline.
+    A scenario regressed if it got slower by more than the max regression, e.g. 0.2 for 20%.
+    The results without a baseline are left out.
+    """
+    baseline_latencies: Dict[Tuple[str, int], float] = {
+        (result.scenario, result.size): result.latency_p50 for result in baseline
+    }
+    comparisons = []
+    for result in results:
+        baseline_latency = baseline_latencies.get((result.scenario, result.size))
+        if baseline_latency is None:
+            continue
+        ratio = result.latency_p50 / baseline_latency if baseline_latency > 0 else float("inf")
+        comparisons.append(Comparison(
+            result.scenario, result.size, baseline_latency, result.latency_p50, ratio, ratio > 1 + max_regression
+        ))
+    return comparisons
+
+
+def format_result(result: BenchmarkResult) -> str:
+    memory = "--" if result.peak_memory_bytes is None else f"{result.peak_memory_bytes / 2 ** 20:.1f} MiB"
+    return f"{result.scenario: <20} {result.size: >10} {result.throughput: >14.1f}/s " \
+           f"p50 {result.latency_p50 * 1000: >10.3f} ms p90 {result.latency_p90 * 1000: >10.3f} ms " \
+           f"p99 {result.latency_p99 * 1000: >10.3f} ms peak {memory: >12}"
+
+
+def format_comparison(comparison: Comparison) -> str:
+    status = "REGRESSION" if comparison.is_regression else "ok"
+    return f"{comparison.scenario: <20} {comparison.size: >10} " \
+           f"{comparison.baseline_latency * 1000: >10.3f} ms -> {comparison.latency * 1000: >10.3f} ms " \
+           f"x{comparison.ratio: <6.2f} {status}"
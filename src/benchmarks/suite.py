@@ -0,0 +1,281 @@
+"""
+This module contains the benchmark scenarios of the phone book and the runner measuring them
+"""
+import datetime
+import functools
+import os
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from benchmarks.generator import ContactDataGenerator
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from phone_book.phone_book import PhoneBook
+from util.grouping import LAST_NAME_FIRST_LETTER, get_last_name_first_letter
+
+LOOKUP_COUNT = 1000
+SEARCH_QUERIES = ["smith", "john", "mail.com", "(555)", "elm st", "jo sm"]
+BULK_DELETE_QUERY = "son"
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Measurements of a scenario on a phone book of the given size.
+    The throughput is the number of operations, e.g. imported rows or lookups, per second,
+    and the latencies are the durations of the single measured calls in seconds.
+    """
+    scenario: str
+    size: int
+    operations: int
+    total_seconds: float
+    throughput: float
+    latency_p50: float
+    latency_p90: float
+    latency_p99: float
+    latency_max: float
+    peak_memory_bytes: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, values: Dict) -> 'BenchmarkResult':
+        return cls(**values)
+
+    @classmethod
+    def from_latencies(
+            cls,
+            scenario: str,
+            size: int,
+            operations: int,
+            latencies: List[float],
+            peak_memory_bytes: Optional[int] = None
+    ) -> 'BenchmarkResult':
+        latencies = sorted(latencies)
+        total_seconds = sum(latencies)
+        return cls(
+            scenario, size, operations, total_seconds,
+            operations / total_seconds if total_seconds > 0 else float("inf"),
+            get_percentile(latencies, 50), get_percentile(latencies, 90), get_percentile(latencies, 99),
+            latencies[-1], peak_memory_bytes
+        )
+
+
+def get_percentile(sorted_values: List[float], percent: float) -> float:
+    """Return the nearest-rank percentile of the sorted values"""
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LatencyRecorder:
+    """Collects the durations of the measured calls of a scenario"""
+    latencies: List[float]
+
+    def __init__(self):
+        self.latencies = []
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+
+
+class BenchmarkContext:
+    """
+    The data the scenarios share for a size: the generated contacts, a phone book of them and the CSV file
+    of the same number of rows. They are built on first use and are not part of the measurements.
+    """
+    _contacts: Optional[List[Contact]]
+    _phone_book: Optional[PhoneBook]
+    _csv_path: Optional[str]
+
+    def __init__(self, size: int, generator: ContactDataGenerator, directory: str, repeat: int = 5,
+                 vectorized: bool = False):
+        self.size = size
+        self.generator = generator
+        self.directory = directory
+        self.repeat = repeat
+        self.vectorized = vectorized
+        self._contacts = None
+        self._phone_book = None
+        self._csv_path = None
+
+    @property
+    def contacts(self) -> List[Contact]:
+        if self._contacts is None:
+            self._contacts = self.generator.create_contacts(self.size)
+        return self._contacts
+
+    @property
+    def phone_book(self) -> PhoneBook:
+        if self._phone_book is None:
+            self._phone_book = self.create_phone_book()
+        return self._phone_book
+
+    @property
+    def csv_path(self) -> str:
+        if self._csv_path is None:
+            file_path = os.path.join(self.directory, f"contacts_{self.generator.seed}_{self.size}.csv")
+            self._csv_path = self.generator.write_csv(file_path, self.size)
+        return self._csv_path
+
+    def create_phone_book(self) -> PhoneBook:
+        return PhoneBook(list(self.contacts), vectorized=self.vectorized)
+
+    def get_random(self) -> random.Random:
+        return random.Random(self.generator.seed)
+
+
+def benchmark_import(context: BenchmarkContext, recorder: LatencyRecorder) -> int:
+    csv_path = context.csv_path
+    for _ in range(context.repeat):
+        with recorder.measure():
+            PhoneBook.from_file(csv_path, vectorized=context.vectorized)
+    return context.repeat * context.size
+
+
+def benchmark_id_lookup(context: BenchmarkContext, recorder: LatencyRecorder) -> int:
+    phone_book = context.phone_book
+    contact_ids = [contact.contact_id for contact in context.get_random().choices(context.contacts, k=LOOKUP_COUNT)]
+    for contact_id in contact_ids:
+        with recorder.measure():
+            phone_book.retrieve_contacts_by_id(contact_id)
+    return len(contact_ids)
+
+
+def benchmark_filters(
+        context: BenchmarkContext,
+        recorder: LatencyRecorder,
+        get_filters: Callable[[BenchmarkContext], List[ContactFilter]]
+) -> int:
+    phone_book = context.phone_book
+    filters = get_filters(context)
+    for _ in range(context.repeat):
+        for contact_filter in filters:
+            with recorder.measure():
+                phone_book.apply(contact_filter)
+    return context.repeat * len(filters)
+
+
+def get_search_filters(_: BenchmarkContext) -> List[ContactFilter]:
+    filters = []
+    for search_query in SEARCH_QUERIES:
+        contact_filter = ContactFilter()
+        contact_filter.search_query = search_query
+        filters.append(contact_filter)
+    return filters
+
+
+def get_date_range_filters(context: BenchmarkContext) -> List[ContactFilter]:
+    """Filters selecting a tenth, a half and all but a tenth of the contacts by their dates"""
+    start_date = ContactDataGenerator.START_DATE
+    filters = []
+    for min_created_seconds, max_created_seconds, min_updated_seconds in [
+        (context.size * 0.45, context.size * 0.55, None),
+        (None, context.size * 0.5, None),
+        (None, None, context.size * 0.1),
+    ]:
+        contact_filter = ContactFilter()
+        if min_created_seconds is not None:
+            contact_filter.min_created_date = start_date + datetime.timedelta(seconds=min_created_seconds)
+        if max_created_seconds is not None:
+            contact_filter.max_created_date = start_date + datetime.timedelta(seconds=max_created_seconds)
+        if min_updated_seconds is not None:
+            contact_filter.min_updated_date = start_date + datetime.timedelta(seconds=min_updated_seconds)
+        filters.append(contact_filter)
+    return filters
+
+
+def get_sort_filters(_: BenchmarkContext, sort_field: ContactSort) -> List[ContactFilter]:
+    ascending_filter, descending_filter = ContactFilter(), ContactFilter()
+    ascending_filter.sort_field = descending_filter.sort_field = sort_field
+    descending_filter.ascending = False
+    return [ascending_filter, descending_filter]
+
+
+def benchmark_group_by(context: BenchmarkContext, recorder: LatencyRecorder) -> int:
+    phone_book = context.phone_book
+    for _ in range(context.repeat):
+        with recorder.measure():
+            groups = phone_book.get_groups(LAST_NAME_FIRST_LETTER, get_last_name_first_letter, ["last_name"])
+            sum(len(group) for _, group in groups.items())
+    return context.repeat
+
+
+def benchmark_bulk_delete(context: BenchmarkContext, recorder: LatencyRecorder) -> int:
+    """Delete the contacts matching a search, about a fifth of them, from a copy of the phone book"""
+    contact_filter = ContactFilter()
+    contact_filter.search_query = BULK_DELETE_QUERY
+    deleted_count = 0
+    for _ in range(context.repeat):
+        phone_book = context.create_phone_book()
+        contacts = list(phone_book.apply(contact_filter))
+        with recorder.measure():
+            phone_book.delete_contacts(contacts)
+        deleted_count += len(contacts)
+        phone_book.contacts = []
+    return deleted_count
+
+
+ScenarioFunction = Callable[[BenchmarkContext, LatencyRecorder], int]
+
+SCENARIOS: Dict[str, ScenarioFunction] = {
+    "import": benchmark_import,
+    "id_lookup": benchmark_id_lookup,
+    "search": functools.partial(benchmark_filters, get_filters=get_search_filters),
+    "date_range": functools.partial(benchmark_filters, get_filters=get_date_range_filters),
+    **{
+        f"sort_{sort_field.property_name}": functools.partial(
+            benchmark_filters, get_filters=functools.partial(get_sort_filters, sort_field=sort_field)
+        )
+        for sort_field in ContactSort
+    },
+    "group_by": benchmark_group_by,
+    "bulk_delete": benchmark_bulk_delete,
+}
+
+
+def run_scenario(
+        name: str,
+        scenario: ScenarioFunction,
+        context: BenchmarkContext,
+        measure_memory: bool = True
+) -> BenchmarkResult:
+    """
+    Run the scenario and measure its calls. The peak memory is measured in a separate run with tracemalloc,
+    which slows the allocations down too much to be traced during the timed run.
+    """
+    recorder = LatencyRecorder()
+    operations = scenario(context, recorder)
+    peak_memory_bytes = None
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            scenario(context, LatencyRecorder())
+            peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return BenchmarkResult.from_latencies(name, context.size, operations, recorder.latencies, peak_memory_bytes)
+
+
+def iter_benchmark_results(
+        sizes: Iterable[int],
+        scenario_names: Iterable[str],
+        directory: str,
+        seed: int = ContactDataGenerator.DEFAULT_SEED,
+        repeat: int = 5,
+        measure_memory: bool = True,
+        vectorized: bool = False
+) -> Iterator[BenchmarkResult]:
+    """Run the scenarios on each size and yield their results as soon as they are measured"""
+    scenario_names = list(scenario_names)
+    for size in sizes:
+        context = BenchmarkContext(size, ContactDataGenerator(seed), directory, repeat, vectorized)
+        for name in scenario_names:
+            yield run_scenario(name, SCENARIOS[name], context, measure_memory)
@@ -0,0 +1,168 @@
+"""
+This module contains the non-interactive commands of the phone book, which call the phone book directly
+without prompts, so they can run unattended in scripts and pipelines
+"""
+import csv
+import datetime
+import sys
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from contacts.contact import Contact
+from contacts.contact_import import CSV_FIELD_NAMES, DEFAULT_IMPORT_CHUNK_SIZE
+from contacts.contact_printer import ContactPrinter
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import InvalidInputException, StorageException
+from phone_book.phone_book import PhoneBook
+from util.grouping import LAST_NAME_FIRST_LETTER, get_last_name_first_letter
+
+QUERY_FORMATS = ("table", "csv")
+QUERY_CSV_FIELD_NAMES = ["ID"] + CSV_FIELD_NAMES + ["Created Date", "Updated Date"]
+
+
+def create_filter(
+        search_query: Optional[str] = None,
+        min_created_date: Optional[datetime.datetime] = None,
+        max_created_date: Optional[datetime.datetime] = None,
+        min_updated_date: Optional[datetime.datetime] = None,
+        max_updated_date: Optional[datetime.datetime] = None,
+        sort_field: ContactSort = ContactSort.UPDATED_DATE,
+        ascending: bool = True
+) -> ContactFilter:
+    contact_filter = ContactFilter()
+    contact_filter.search_query = search_query
+    contact_filter.min_created_date = min_created_date
+    contact_filter.max_created_date = max_created_date
+    contact_filter.min_updated_date = min_updated_date
+    contact_filter.max_updated_date = max_updated_date
+    contact_filter.sort_field = sort_field
+    contact_filter.ascending = ascending
+    return contact_filter
+
+
+def parse_date(value: str) -> datetime.datetime:
+    """
+    Parse an ISO date of a filter. The contact dates are naive local times,
+    so a date with a timezone offset can not be compared with them and is rejected.
+    """
+    try:
+        date = datetime.datetime.fromisoformat(value)
+    except ValueError as exc:
+        raise InvalidInputException(f"Invalid date {value!r}, use the ISO format") from exc
+    if date.utcoffset() is not None:
+        raise InvalidInputException(f"Invalid date {value!r}, the dates are local times without a timezone offset")
+    return date
+
+
+def has_criteria(contact_filter: ContactFilter) -> bool:
+    """Whether the filter selects some of the contacts rather than all of them"""
+    return any(value is not None for value in (
+        contact_filter.search_query, contact_filter.min_created_date, contact_filter.max_created_date,
+        contact_filter.min_updated_date, contact_filter.max_updated_date
+    ))
+
+
+def import_contacts(
+        phone_book: PhoneBook,
+        file_path: str,
+        reject_file_path: Optional[str] = None,
+        chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+        workers: int = 0,
+        output: Optional[TextIO] = None
+) -> int:
+    """Import the contacts of the CSV file and report their number to the output, the standard output by default"""
+    imported_count = phone_book.import_from_file(file_path, reject_file_path, chunk_size, workers)
+    output = output if output is not None else sys.stdout
+    output.write(f"{imported_count} contacts imported from '{file_path}'\n")
+    return imported_count
+
+
+def query_contacts(
+        phone_book: PhoneBook,
+        contact_filter: ContactFilter,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        output_format: str = "table",
+        output: Optional[TextIO] = None
+) -> List[Contact]:
+    """
+    Write a page of the contacts matching the filter to the output as a table or as CSV rows with their ids.
+    The output defaults to the standard output at the time of the call.
+    """
+    contacts = phone_book.query(contact_filter, limit, offset)
+    if output_format == "csv":
+        writer = csv.writer(output if output is not None else sys.stdout)
+        writer.writerow(QUERY_CSV_FIELD_NAMES)
+        writer.writerows(
+            [contact.contact_id, *get_csv_values(contact), contact.created_date.isoformat(),
+             contact.updated_date.isoformat()]
+            for contact in contacts
+        )
+    else:
+        ContactPrinter(output=output).print_contacts(contacts)
+    return contacts
+
+
+def get_csv_values(contact: Contact) -> List[str]:
+    return [
+        contact.first_name, contact.last_name, contact.phone_number,
+        contact.email if contact.email is not None else "", contact.address if contact.address is not None else "",
+    ]
+
+
+def export_contacts(phone_book: PhoneBook, contact_filter: ContactFilter, file_path: str) -> int:
+    """
+    Write the contacts matching the filter to the CSV file in the import format, so the file can be imported again.
+    Return the number of exported contacts.
+    """
+    contacts = phone_book.query(contact_filter)
+    try:
+        with open(file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+            write_csv(csv_file, contacts)
+    except OSError as exc:
+        raise StorageException(f"Failed to export the contacts to {file_path}") from exc
+    return len(contacts)
+
+
+def write_csv(csv_file: TextIO, contacts: Iterable[Contact]):
+    writer = csv.writer(csv_file)
+    writer.writerow(CSV_FIELD_NAMES)
+    writer.writerows(get_csv_values(contact) for contact in contacts)
+
+
+def delete_contacts(phone_book: PhoneBook, contact_filter: ContactFilter, delete_all: bool = False) -> int:
+    """
+    Delete the contacts matching the filter at once and return their number.
+    A filter without criteria matches every contact, so it is only accepted when deleting all contacts is asked for.
+    """
+    if not has_criteria(contact_filter) and not delete_all:
+        raise InvalidInputException("The filter matches every contact, confirm deleting all of them explicitly")
+    contacts = phone_book.query(contact_filter)
+    phone_book.delete_contacts(contacts)
+    return len(contacts)
+
+
+def get_stats(phone_book: PhoneBook) -> Dict[str, Any]:
+    """
+    Return the number of contacts, the ranges of their dates and the number of contacts per first letter
+    of the last name. The dates are read with single-contact queries, which use the sort orderings of the phone book.
+    """
+    stats: Dict[str, Any] = {"contacts": phone_book.contact_count}
+    for sort_field, name in [(ContactSort.CREATED_DATE, "created"), (ContactSort.UPDATED_DATE, "updated")]:
+        for ascending, prefix in [(True, "first"), (False, "last")]:
+            contacts = phone_book.query(create_filter(sort_field=sort_field, ascending=ascending), limit=1)
+            date = getattr(contacts[0], sort_field.property_name) if contacts else None
+            stats[f"{prefix}_{name}_date"] = date.isoformat() if date is not None else None
+    groups = phone_book.get_groups(LAST_NAME_FIRST_LETTER, get_last_name_first_letter, ["last_name"])
+    stats["last_name_first_letters"] = {name: groups.get_count(name) for name in groups.get_group_names()}
+    return stats
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    lines = []
+    for name, value in stats.items():
+        if isinstance(value, dict):
+            lines.append(f"{name}:")
+            lines.extend(f"  {key}: {count}" for key, count in value.items())
+        else:
+            lines.append(f"{name}: {value if value is not None else '--'}")
+    return "\n".join(lines) + "\n"
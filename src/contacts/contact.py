@@ -1,29 +1,57 @@
 """
 This module contains the definition of the Contact entry
 """
+import abc
 import csv
 import datetime
 import re
+import sys
 import uuid
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 
 from audit import get_logger_by_name
+from contacts.contact_import import RejectedRowsWriter, DEFAULT_IMPORT_CHUNK_SIZE, ContactValues, ValuesValidator
 from exceptions.exceptions import InvalidPhoneNumberException, InvalidEmailException, InvalidNameException, \
-    ImportFailedException
+    ImportFailedException, BasePhoneBookException
 
 
-class Contact:
+class ContactObserver(abc.ABC):
+    @abc.abstractmethod
+    def on_contact_updated(self, contact: 'Contact', old_values: Dict[str, Any]):
+        """
+        Called after a field of a subscribed contact has changed.
+        Arguments:
+            contact: the changed contact, already holding the new values
+            old_values: the changed property names mapped to their values before the change
+        """
+
+
+class Contact:  # pylint: disable=too-many-public-methods
     """
     This class is intended for storing a single contact and its arguments.
     The updated date of the class is automatically refreshed once a change is made to the class fields.
     This can be controlled by the property setters. just call the __refresh_updated_date method on any setter
-    you want to keep track of
+    you want to keep track of.
+    Every setter notifies the subscribed observers, so that the owners of the contact (e.g. the phone book
+    indexes) can keep up with the changes.
+    The contact is kept compact for large phone books: the instances have no __dict__, the id is stored
+    as the canonical string which is shared with the phone book id index, the names are interned as they
+    repeat a lot, and the observers are kept in a tuple.
+    The lowercased forms of the fields, which the searches compare against, are computed on first use and cached
+    until one of the fields changes. The contacts can be weakly referenced, so that
+    the storage backed phone books can keep an identity map of the materialized contacts.
+    The target is at most 512 bytes per contact including the field strings of a typical contact,
+    excluding the phone book indexes.
     """
+    __slots__ = (
+        "_id", "_first_name", "_last_name", "_phone_number", "_email", "_address", "__created_date",
+        "__updated_date", "_observers", "_search_keys", "__weakref__",
+    )
     logger = get_logger_by_name("ContactLogger")
     _PHONE_NUMBER_PATTERN = re.compile(r"^\(\d{3}\) \d{3}-\d{4}$")
     _EMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,7}$')
 
-    _id: uuid.UUID
+    _id: str
     _first_name: str
     _last_name: str
     _phone_number: str
@@ -31,6 +59,9 @@ class Contact:
     _address: Optional[str]
     __created_date: datetime
     __updated_date: datetime
+    _observers: Tuple[ContactObserver, ...]
+    _search_keys: Optional[Tuple[str, str, Tuple[Optional[str], ...]]]
+    SEARCH_KEY_SEPARATOR = "\0"
 
     def __init__(
             self,
@@ -40,26 +71,90 @@ class Contact:
             email: Optional[str] = None,
             address: Optional[str] = None
     ):
-        self._id = uuid.uuid4()
-        self.validate_phone_number(phone_number)
-        self.validate_name(first_name)
-        self.validate_name(last_name)
-        self.validate_email(email)
-        self._first_name = first_name
-        self._last_name = last_name
+        self._id = str(uuid.uuid4())
+        self.validate(first_name, last_name, phone_number, email)
+        self._first_name = sys.intern(first_name)
+        self._last_name = sys.intern(last_name)
         self._phone_number = phone_number
         self._email = email
         self._address = address
+        self._observers = ()
+        self._search_keys = None
         self.__created_date = datetime.datetime.now()
         self.__refresh_updated_date()
         self.logger.info("Contact '%s'(id=%s) created", self.full_name, self.contact_id)
 
+    @classmethod
+    def restore(
+            cls,
+            contact_id: str,
+            first_name: str,
+            last_name: str,
+            phone_number: str,
+            email: Optional[str],
+            address: Optional[str],
+            created_date: datetime.datetime,
+            updated_date: datetime.datetime
+    ) -> 'Contact':
+        """
+        Recreate a contact from values which were already validated, e.g. by an import worker or a storage.
+        The values are taken as they are, nothing is validated or logged.
+        """
+        contact = cls.__new__(cls)
+        contact._id = contact_id
+        contact._first_name = sys.intern(first_name)
+        contact._last_name = sys.intern(last_name)
+        contact._phone_number = phone_number
+        contact._email = email
+        contact._address = address
+        contact._observers = ()
+        contact._search_keys = None
+        contact._set_dates(created_date, updated_date)
+        return contact
+
+    def copy(self) -> 'Contact':
+        """Return a contact with the same id, values and dates, which is not subscribed to by anyone"""
+        return self.restore(
+            self._id, self._first_name, self._last_name, self._phone_number, self._email, self._address,
+            self.__created_date, self.__updated_date
+        )
+
+    def revert(self, old_values: Dict[str, Any]):
+        """
+        Set the fields back to the old values an update notified the observers of, e.g. when an observer failed
+        to store the update. The observers are not notified again.
+        """
+        for field_name, value in old_values.items():
+            if field_name == "updated_date":
+                self.__updated_date = value
+            else:
+                setattr(self, f"_{field_name}", value)
+        self._search_keys = None
+
+    def _set_dates(self, created_date: datetime.datetime, updated_date: datetime.datetime):
+        self.__created_date = created_date
+        self.__updated_date = updated_date
+
     def __refresh_updated_date(self):
         self.__updated_date = datetime.datetime.now()
 
+    def __get_old_values(self, field_name: str) -> Dict[str, Any]:
+        return {field_name: getattr(self, field_name), "updated_date": self.__updated_date}
+
+    def __notify_observers(self, old_values: Dict[str, Any]):
+        for observer in self._observers:
+            observer.on_contact_updated(self, old_values)
+
+    def subscribe(self, observer: ContactObserver):
+        if observer not in self._observers:
+            self._observers += (observer,)
+
+    def unsubscribe(self, observer: ContactObserver):
+        self._observers = tuple(subscribed for subscribed in self._observers if subscribed is not observer)
+
     @property
     def contact_id(self) -> str:
-        return str(self._id)
+        return self._id
 
     @property
     def first_name(self):
@@ -68,9 +163,12 @@ class Contact:
     @first_name.setter
     def first_name(self, value: str):
         self.validate_name(value)
-        self._first_name = value
+        old_values = self.__get_old_values("first_name")
+        self._first_name = sys.intern(value)
+        self._search_keys = None
         self.__refresh_updated_date()
         self.logger.info("First name of %s updated to %s", self.contact_id, self.first_name)
+        self.__notify_observers(old_values)
 
     @property
     def last_name(self):
@@ -79,9 +177,12 @@ class Contact:
     @last_name.setter
     def last_name(self, value: str):
         self.validate_name(value)
-        self._last_name = value
+        old_values = self.__get_old_values("last_name")
+        self._last_name = sys.intern(value)
+        self._search_keys = None
         self.__refresh_updated_date()
         self.logger.info("Last name of %s updated to %s", self.contact_id, self.last_name)
+        self.__notify_observers(old_values)
 
     @property
     def phone_number(self):
@@ -90,9 +191,12 @@ class Contact:
     @phone_number.setter
     def phone_number(self, value: str):
         self.validate_phone_number(value)
+        old_values = self.__get_old_values("phone_number")
         self._phone_number = value
+        self._search_keys = None
         self.__refresh_updated_date()
         self.logger.info("Phone number of %s updated to %s", self.contact_id, self.phone_number)
+        self.__notify_observers(old_values)
 
     @property
     def email(self):
@@ -101,9 +205,12 @@ class Contact:
     @email.setter
     def email(self, value: Optional[str]):
         self.validate_email(value)
+        old_values = self.__get_old_values("email")
         self._email = value
+        self._search_keys = None
         self.__refresh_updated_date()
         self.logger.info("Email of %s updated to %s", self.contact_id, self.email)
+        self.__notify_observers(old_values)
 
     @property
     def address(self):
@@ -111,9 +218,12 @@ class Contact:
 
     @address.setter
     def address(self, value: Optional[str]):
+        old_values = self.__get_old_values("address")
         self._address = value
+        self._search_keys = None
         self.__refresh_updated_date()
         self.logger.info("Address of %s updated to %s", self.contact_id, self.address)
+        self.__notify_observers(old_values)
 
     @property
     def created_date(self):
@@ -127,6 +237,37 @@ class Contact:
     def full_name(self) -> str:
         return self.first_name + " " + self.last_name
 
+    def __get_search_keys(self) -> Tuple[str, str, Tuple[Optional[str], ...]]:
+        if self._search_keys is None:
+            fields = tuple(
+                field.lower() if field is not None else None
+                for field in (self._first_name, self._last_name, self._phone_number, self._email, self._address)
+            )
+            haystack = self.SEARCH_KEY_SEPARATOR.join(field for field in fields if field is not None)
+            self._search_keys = (haystack, self.full_name.lower(), fields)
+        return self._search_keys
+
+    @property
+    def search_haystack(self) -> str:
+        """The lowercased text fields joined by SEARCH_KEY_SEPARATOR, the missing fields are left out"""
+        return self.__get_search_keys()[0]
+
+    @property
+    def normalized_full_name(self) -> str:
+        return self.__get_search_keys()[1]
+
+    @property
+    def normalized_fields(self) -> Tuple[Optional[str], ...]:
+        """The lowercased first name, last name, phone number, email and address, None if missing"""
+        return self.__get_search_keys()[2]
+
+    @classmethod
+    def validate(cls, first_name: str, last_name: str, phone_number: str, email: Optional[str]):
+        cls.validate_phone_number(phone_number)
+        cls.validate_name(first_name)
+        cls.validate_name(last_name)
+        cls.validate_email(email)
+
     @classmethod
     def validate_phone_number(cls, phone_number: str):
         if phone_number is None:
@@ -196,24 +337,61 @@ class Contact:
     @classmethod
     def bulk_create_contacts_from_csv(cls, file_path: str) -> List['Contact']:
         contacts = []
+        for chunk in cls.iter_contacts_from_csv(file_path):
+            contacts.extend(chunk)
+        return contacts
+
+    @classmethod
+    def iter_contacts_from_csv(
+            cls,
+            file_path: str,
+            chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+            rejects: Optional[RejectedRowsWriter] = None,
+            validate_values: Optional[ValuesValidator] = None
+    ) -> Iterator[List['Contact']]:
+        """
+        Read the contacts from the CSV file lazily and yield them in chunks of at most chunk_size contacts.
+        Arguments:
+            file_path: path to the CSV file
+            chunk_size: maximum number of contacts in a chunk
+            rejects: writer of the invalid rows, if not given the import fails on the first invalid row
+            validate_values: extra validation of the row values, e.g. the limits of a storage
+        """
         try:
             with open(file_path, mode='r', newline='', encoding="utf-8") as csv_file:
                 csv_reader = csv.DictReader(csv_file)
+                chunk = []
                 for row in csv_reader:
-                    contact = Contact.from_dict(row)
-                    contacts.append(contact)
-
-            return contacts
-        except Exception as exc:
+                    try:
+                        contact = cls.from_dict(row, validate_values)
+                    except BasePhoneBookException as exc:
+                        if rejects is None:
+                            raise ImportFailedException(
+                                f"Failed to import line {csv_reader.line_num} of the file: {exc}"
+                            ) from exc
+                        rejects.write(csv_reader.line_num, row, str(exc))
+                        continue
+                    chunk.append(contact)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+        except (OSError, csv.Error, UnicodeError) as exc:
             raise ImportFailedException("Failed to import contacts from the file") from exc
 
     @classmethod
-    def from_dict(cls, row: Dict) -> 'Contact':
+    def from_dict(cls, row: Dict, validate_values: Optional[ValuesValidator] = None) -> 'Contact':
+        values = cls.get_values_from_dict(row)
+        if validate_values is not None:
+            validate_values(values)
+        return cls(*values)
+
+    @classmethod
+    def get_values_from_dict(cls, row: Dict) -> ContactValues:
         first_name = row.get('First Name')
         last_name = row.get('Last Name')
         phone_number = row.get('Phone Number')
-        email = row.get('Email')
-        address = row.get('Address')
-
-        contact = cls(first_name, last_name, phone_number, email, address)
-        return contact
+        email = row.get('Email') or None
+        address = row.get('Address') or None
+        return first_name, last_name, phone_number, email, address
@@ -0,0 +1,69 @@
+"""
+This module contains the helpers of the CSV contact import
+"""
+import csv
+from typing import Callable, Dict, Optional, TextIO, Tuple
+
+from exceptions.exceptions import ImportFailedException
+
+CSV_FIELD_NAMES = ["First Name", "Last Name", "Phone Number", "Email", "Address"]
+DEFAULT_IMPORT_CHUNK_SIZE = 10000
+
+# first name, last name, phone number, email and address of an imported row
+ContactValues = Tuple[str, str, str, Optional[str], Optional[str]]
+ValuesValidator = Callable[[ContactValues], None]
+
+
+class RejectedRowsWriter:
+    """
+    Writes the CSV rows which could not be imported to a separate CSV file,
+    together with their line numbers in the imported file and the reasons of the failures.
+    The file is only created once the first row is rejected.
+    """
+    REJECT_FIELD_NAMES = ["Line Number", "Reason"] + CSV_FIELD_NAMES
+    _file_path: str
+    _file: Optional[TextIO]
+    _writer: Optional[csv.DictWriter]
+    _rejected_count: int
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._file = None
+        self._writer = None
+        self._rejected_count = 0
+
+    def __enter__(self) -> 'RejectedRowsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def rejected_count(self) -> int:
+        return self._rejected_count
+
+    def write(self, line_number: int, row: Dict[Optional[str], str], reason: str):
+        if self._writer is None:
+            try:
+                # the file stays open between the writes and is closed by close()
+                self._file = open(  # pylint: disable=consider-using-with
+                    self._file_path, mode='w', newline='', encoding="utf-8"
+                )
+            except OSError as exc:
+                raise ImportFailedException(f"Failed to open the reject file {self._file_path}") from exc
+            self._writer = csv.DictWriter(self._file, fieldnames=self.REJECT_FIELD_NAMES)
+            self._writer.writeheader()
+        reject_row = {"Line Number": line_number, "Reason": reason}
+        reject_row.update({field_name: row.get(field_name) for field_name in CSV_FIELD_NAMES})
+        self._writer.writerow(reject_row)
+        self._rejected_count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
@@ -1,11 +1,31 @@
-from typing import List
+import sys
+from typing import List, Optional, Sequence, TextIO
 
 from contacts.contact import Contact
 
 
 class ContactPrinter:
-    def __init__(self, indent_size: int = 20):
+    """
+    Prints the contacts as a table. The lines are rendered into large strings which are written to the output
+    at once, instead of printing them one by one.
+    With a page size only that many contacts, starting from the offset, are printed, so the cost of printing
+    a page does not depend on the number of contacts.
+    The column widths are computed once per page: a column is as wide as its longest value on the page,
+    but at least the indent size.
+    """
+    ID_WIDTH = 40
+    DEFAULT_PAGE_SIZE = 50
+    WRITE_BATCH_SIZE = 10000
+    HEADERS = ("ID", "First Name", "Last Name", "Phone Number", "Email", "Address")
+
+    def __init__(self, indent_size: int = 20, page_size: Optional[int] = None, output: Optional[TextIO] = None):
         self._indent_size = indent_size
+        self._page_size = page_size
+        self._output = output
+
+    @property
+    def page_size(self) -> Optional[int]:
+        return self._page_size
 
     def get_headers(self) -> str:
         header_line = f'{"ID": <{40}} ' \
@@ -28,10 +48,42 @@ class ContactPrinter:
                        f'{address: <{self._indent_size}}'
         return contact_line
 
-    def print_contacts(self, contacts: List[Contact]):
+    @staticmethod
+    def get_values(contact: Contact) -> List[str]:
+        return [
+            contact.contact_id, contact.first_name, contact.last_name, contact.phone_number,
+            contact.email if contact.email is not None else "--",
+            contact.address if contact.address is not None else "--",
+        ]
+
+    def get_page(self, contacts: Sequence[Contact], offset: int = 0) -> Sequence[Contact]:
+        if self._page_size is None:
+            return contacts[offset:] if offset > 0 else contacts
+        return contacts[offset:offset + self._page_size]
+
+    def get_page_count(self, contact_count: int) -> int:
+        if self._page_size is None:
+            return 1
+        return max(1, -(-contact_count // self._page_size))
+
+    def get_line_template(self, rows: List[List[str]]) -> str:
+        minimum_widths = [self.ID_WIDTH] + [self._indent_size] * (len(self.HEADERS) - 1)
+        widths = [
+            max(minimum_width, *map(len, column))
+            for minimum_width, column in zip(minimum_widths, zip(*rows))
+        ] if rows else minimum_widths
+        return " ".join(f"{{{index}: <{width}}}" for index, width in enumerate(widths))
+
+    def write(self, text: str):
+        output = self._output if self._output is not None else sys.stdout
+        output.write(text)
+
+    def print_contacts(self, contacts: Sequence[Contact], offset: int = 0):
         if len(contacts) == 0:
-            print("No contacts matching current filter")
+            self.write("No contacts matching current filter\n")
             return
-        print(self.get_headers())
-        for contact in contacts:
-            print(self.to_line(contact))
+        rows = [self.get_values(contact) for contact in self.get_page(contacts, offset)]
+        template = self.get_line_template(rows)
+        self.write(template.format(*self.HEADERS) + "\n")
+        for start in range(0, len(rows), self.WRITE_BATCH_SIZE):
+            self.write("".join(template.format(*row) + "\n" for row in rows[start:start + self.WRITE_BATCH_SIZE]))
@@ -19,6 +19,13 @@ class ContactSort(Enum):
     def __str__(self):
         return self.name
 
+    @property
+    def property_name(self) -> str:
+        """The name of the Contact property sorted by this field"""
+        if self is ContactSort.ID:
+            return "contact_id"
+        return self.name.lower()
+
 
 class ContactFilter:
     search_query: Optional[str] = None
@@ -139,6 +146,48 @@ class ContactFilter:
                 return False
         return True
 
+    @classmethod
+    def compile_predicate(cls, contact_filter: 'ContactFilter') -> Callable[[Contact], bool]:
+        """
+        Compile the filter into a single predicate, which is equivalent to matches with this filter.
+        Only the active criteria are checked: the cheap date comparisons first and the search query last,
+        with the query tokens split and lowercased once, and looked up in the cached search haystack of the contact.
+        """
+        date_bounds = [
+            (property_name, minimum, maximum) for property_name, minimum, maximum in [
+                ("created_date", contact_filter.min_created_date, contact_filter.max_created_date),
+                ("updated_date", contact_filter.min_updated_date, contact_filter.max_updated_date),
+            ]
+            if minimum is not None or maximum is not None
+        ]
+        tokens = None
+        if contact_filter.search_query is not None:
+            tokens = [token.lower() for token in cls.get_query_tokens(contact_filter.search_query)]
+        # the tokens are looked up in the joined fields, unless a token may match across the field separator
+        # or match the empty haystack of a contact without fields
+        tokens_span_fields = tokens is not None and any(
+            token == "" or Contact.SEARCH_KEY_SEPARATOR in token for token in tokens
+        )
+
+        def predicate(contact: Contact) -> bool:
+            for property_name, minimum, maximum in date_bounds:
+                value = getattr(contact, property_name)
+                if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+                    return False
+            if tokens is None:
+                return True
+            if tokens_span_fields:
+                return any(
+                    token in value for value in contact.normalized_fields if value is not None for token in tokens
+                )
+            haystack = contact.search_haystack
+            for token in tokens:
+                if token in haystack:
+                    return True
+            return False
+
+        return predicate
+
     @classmethod
     def is_matching_max_created_date(cls, contact: Contact, contact_filter: 'ContactFilter') -> bool:
         if contact_filter.max_created_date is not None:
@@ -186,8 +235,11 @@ class ContactFilter:
             return False
         if search_query is None:
             return True
-        if " " in search_query:
-            queries = search_query.split(" ")
-        else:
-            queries = [search_query]
+        queries = cls.get_query_tokens(search_query)
         return any(query.lower() in value.lower() for query in queries)
+
+    @classmethod
+    def get_query_tokens(cls, search_query: str) -> List[str]:
+        if " " in search_query:
+            return search_query.split(" ")
+        return [search_query]
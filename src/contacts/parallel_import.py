@@ -0,0 +1,158 @@
+"""
+This module contains the multi-process CSV contact import.
+The file is split into byte ranges on line boundaries, the ranges are parsed and validated
+in a process pool and the contacts are merged back in the file order.
+The ranges are split on line breaks, so the parallel import expects a single line per row,
+i.e. no line breaks inside of quoted values.
+"""
+import csv
+import datetime
+import io
+import os
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import List, Tuple, Optional, Iterator, Dict, Deque
+
+from contacts.contact import Contact
+from contacts.contact_import import RejectedRowsWriter, DEFAULT_IMPORT_CHUNK_SIZE, ValuesValidator
+from exceptions.exceptions import ImportFailedException, BasePhoneBookException
+
+DEFAULT_RANGE_SIZE_IN_BYTES = 4 * 1024 * 1024
+
+ContactRecord = Tuple[str, str, str, str, Optional[str], Optional[str], datetime.datetime]
+RejectedRow = Tuple[int, Dict[Optional[str], str], str]
+
+
+def split_into_row_ranges(file_path: str, range_size: int) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Read the header of the CSV file and split the rest of it into byte ranges ending on line boundaries.
+    Return the field names from the header and the (start, end) offsets of the ranges.
+    """
+    with open(file_path, mode='rb') as csv_file:
+        header = csv_file.readline()
+        file_size = os.fstat(csv_file.fileno()).st_size
+        ranges = []
+        start = csv_file.tell()
+        while start < file_size:
+            csv_file.seek(min(start + range_size, file_size))
+            csv_file.readline()
+            end = min(csv_file.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+    field_names = next(csv.reader([header.decode("utf-8")]), [])
+    return field_names, ranges
+
+
+def parse_row(row: Dict[Optional[str], str], validate_values: Optional[ValuesValidator] = None) -> ContactRecord:
+    """Validate a single row and turn it into the record of a new contact"""
+    values = Contact.get_values_from_dict(row)
+    if validate_values is not None:
+        validate_values(values)
+    first_name, last_name, phone_number, email, address = values
+    Contact.validate(first_name, last_name, phone_number, email)
+    return str(uuid.uuid4()), first_name, last_name, phone_number, email, address, datetime.datetime.now()
+
+
+def parse_row_range(
+        file_path: str,
+        start: int,
+        end: int,
+        field_names: List[str],
+        validate_values: Optional[ValuesValidator] = None
+) -> Tuple[List[ContactRecord], List[RejectedRow], int]:
+    """
+    Parse and validate the rows of a byte range, this runs in the worker processes.
+    Return the records of the valid contacts, the rejected rows with their line numbers relative to the range
+    and the number of lines in the range.
+    """
+    with open(file_path, mode='rb') as csv_file:
+        csv_file.seek(start)
+        text = csv_file.read(end - start).decode("utf-8")
+    csv_reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=field_names)
+    records = []
+    rejected = []
+    for row in csv_reader:
+        try:
+            records.append(parse_row(row, validate_values))
+        except BasePhoneBookException as exc:
+            rejected.append((csv_reader.line_num, row, str(exc)))
+    return records, rejected, text.count("\n")
+
+
+def write_rejected_rows(rejected: List[RejectedRow], first_line_number: int, rejects: Optional[RejectedRowsWriter]):
+    for relative_line_number, row, reason in rejected:
+        line_number = first_line_number + relative_line_number - 1
+        if rejects is None:
+            raise ImportFailedException(f"Failed to import line {line_number} of the file: {reason}")
+        rejects.write(line_number, row, reason)
+
+
+def iter_parsed_ranges(
+        file_path: str,
+        field_names: List[str],
+        ranges: List[Tuple[int, int]],
+        workers: int,
+        validate_values: Optional[ValuesValidator] = None
+) -> Iterator[Tuple[List[ContactRecord], List[RejectedRow], int]]:
+    """Parse the ranges in a process pool and yield the results in the order of the ranges"""
+    # only a few ranges are parsed ahead, so that the memory is bounded when the inserts are slower
+    max_pending = 2 * workers
+    pending: Deque[Future] = deque()
+    remaining_ranges = iter(ranges)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(pending) < max_pending:
+                next_range = next(remaining_ranges, None)
+                if next_range is None:
+                    break
+                pending.append(executor.submit(
+                    parse_row_range, file_path, *next_range, field_names, validate_values
+                ))
+            if not pending:
+                return
+            try:
+                yield pending.popleft().result()
+            except (OSError, UnicodeError, csv.Error) as exc:
+                raise ImportFailedException("Failed to import contacts from the file") from exc
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def iter_contacts_from_csv_parallel(
+        file_path: str,
+        chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+        rejects: Optional[RejectedRowsWriter] = None,
+        workers: Optional[int] = None,
+        range_size: int = DEFAULT_RANGE_SIZE_IN_BYTES,
+        validate_values: Optional[ValuesValidator] = None
+) -> Iterator[List[Contact]]:
+    """
+    Parallel version of Contact.iter_contacts_from_csv, the contacts are yielded in the file order.
+    Arguments:
+        file_path: path to the CSV file
+        chunk_size: maximum number of contacts in a chunk
+        rejects: writer of the invalid rows, if not given the import fails on the first invalid row
+        workers: number of worker processes, defaults to the number of processors
+        range_size: approximate size of the byte range parsed by a single task
+        validate_values: extra validation of the row values, it has to be picklable to reach the workers
+    """
+    try:
+        field_names, ranges = split_into_row_ranges(file_path, range_size)
+    except (OSError, UnicodeError) as exc:
+        raise ImportFailedException("Failed to import contacts from the file") from exc
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    line_number = 2
+    imported_count = 0
+    for records, rejected, line_count in iter_parsed_ranges(
+            file_path, field_names, ranges, workers, validate_values
+    ):
+        write_rejected_rows(rejected, line_number, rejects)
+        line_number += line_count
+        contacts = [Contact.restore(*record, record[-1]) for record in records]
+        imported_count += len(contacts)
+        yield from (contacts[start:start + chunk_size] for start in range(0, len(contacts), chunk_size))
+    Contact.logger.info("%d contacts created from '%s'", imported_count, file_path)
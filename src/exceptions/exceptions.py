@@ -40,3 +40,19 @@ class InvalidInputException(BasePhoneBookException):
 
 class ImportFailedException(BasePhoneBookException):
     """Throw when the import file reading fails"""
+
+
+class StorageException(BasePhoneBookException):
+    """Throw when the contacts can not be stored or loaded"""
+
+
+class ValueTooLongException(StorageException):
+    """Throw when a value of a contact does not fit in the fixed size fields of a storage"""
+
+
+class InvalidRequestException(BasePhoneBookException):
+    """Throw when a request of the API is malformed or can not be served, the status is its HTTP response status"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
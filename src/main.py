@@ -1,25 +1,244 @@
 import argparse
+import datetime
+import json
+import shlex
+import sys
+from typing import List, Optional
 
+from commands.batch import QUERY_FORMATS, create_filter, delete_contacts, export_contacts, format_stats, get_stats, \
+    import_contacts, parse_date, query_contacts
+from contacts.contact_import import DEFAULT_IMPORT_CHUNK_SIZE
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import BasePhoneBookException, InvalidInputException
+from metrics import METRICS_FORMATS, MetricsSetup
+from phone_book.mapped_phone_book import MappedPhoneBook
+from phone_book.persistent_phone_book import PersistentPhoneBook
 from phone_book.phone_book import PhoneBook
 from phone_book.phone_book_controller import PhoneBookController
+from phone_book.sqlite_phone_book import SqlitePhoneBook
+from phone_book.stored_phone_book import StoredPhoneBook
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Phonebook Application")
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Phonebook Application, interactive unless a command is given",
+        epilog="The import, query, export, delete and stats commands run without prompts on the loaded phonebook, "
+               "the script command runs a file of such commands, one per line"
+    )
+    add_phone_book_arguments(parser)
+    parser.add_argument(
+        "--metrics-path", type=str,
+        help="Path to dump the latency metrics of the actions and of the phonebook operations to after every action"
+    )
+    parser.add_argument(
+        "--metrics-format", choices=METRICS_FORMATS, default="prometheus", help="Format of the metrics dump"
+    )
+    parser.add_argument(
+        "--profile-action", type=str,
+        help="Name of an action, e.g. 'Update Filter', to profile with cProfile and tracemalloc when it is performed"
+    )
+    parser.add_argument(
+        "--profile-directory", type=str, help="Directory to write the profiles to, 'profiles' by default"
+    )
+
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    add_command_parsers(commands)
+    script_parser = commands.add_parser(
+        "script", help="Run the commands of a file, one per line, blank lines and lines starting with # are skipped"
+    )
+    script_parser.add_argument("script_path", help="Path of the script file, '-' to read the commands from stdin")
+    return parser
+
+
+def create_script_parser(line_number: int) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=f"script line {line_number}", description="Command of a phonebook script")
+    add_command_parsers(parser.add_subparsers(dest="command", metavar="command", required=True))
+    return parser
+
+
+def add_phone_book_arguments(parser: argparse.ArgumentParser):
+    """Add the arguments selecting the phonebook to load, see open_phone_book"""
     parser.add_argument("--file-path", type=str, help="Path to a CSV file to initialize the phonebook")
+    parser.add_argument(
+        "--store-path", type=str,
+        help="Path to persist the phonebook in, the stored contacts are loaded on start"
+    )
+    parser.add_argument(
+        "--storage", choices=["snapshot", "mapped", "sqlite"], default="snapshot",
+        help="How the phonebook is persisted: a snapshot with a journal in the store path directory, "
+             "a memory-mapped record file at the store path which is read lazily, "
+             "or a SQLite database at the store path"
+    )
+    parser.add_argument(
+        "--reject-file-path", type=str, help="Path to a CSV file to write the invalid rows of the import to"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_IMPORT_CHUNK_SIZE, help="Number of contacts imported at once"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=0,
+        help="Number of processes parsing the CSV file in parallel, the file is parsed in a single process by default"
+    )
+    parser.add_argument(
+        "--vectorized", action="store_true",
+        help="Evaluate the filters of an in-memory phonebook with NumPy, which has to be installed"
+    )
+
+
+def add_command_parsers(commands):
+    import_parser = commands.add_parser(
+        "import", help="Import a CSV file, the global chunk size, workers and reject file path options apply"
+    )
+    import_parser.add_argument("import_path", help="Path to the CSV file to import")
+
+    query_parser = commands.add_parser("query", help="Print the contacts matching a filter")
+    add_filter_arguments(query_parser)
+    query_parser.add_argument("--limit", type=int, help="Maximum number of contacts to print")
+    query_parser.add_argument("--offset", type=int, default=0, help="Number of matching contacts to skip")
+    query_parser.add_argument(
+        "--format", dest="output_format", choices=QUERY_FORMATS, default="table",
+        help="Print a table, or CSV rows with the ids and the dates of the contacts"
+    )
+
+    export_parser = commands.add_parser(
+        "export", help="Write the contacts matching a filter to a CSV file which can be imported again"
+    )
+    add_filter_arguments(export_parser)
+    export_parser.add_argument("export_path", help="Path to the CSV file to write")
+
+    delete_parser = commands.add_parser("delete", help="Delete the contacts matching a filter")
+    add_filter_arguments(delete_parser)
+    delete_parser.add_argument(
+        "--all", dest="delete_all", action="store_true", help="Allow a filter without criteria, deleting every contact"
+    )
+
+    stats_parser = commands.add_parser("stats", help="Print the number of contacts, their date ranges and groups")
+    stats_parser.add_argument("--format", dest="output_format", choices=["text", "json"], default="text")
+
+
+def parse_date_argument(value: str) -> datetime.datetime:
+    try:
+        return parse_date(value)
+    except InvalidInputException as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
 
-    args = parser.parse_args()
 
-    if args.file_path:
+def add_filter_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--search", help="Search query, a contact matches if any of its space separated components matches, "
+                         "e.g. 'john smith' matches every John and every Smith"
+    )
+    for name in ["min-created", "max-created", "min-updated", "max-updated"]:
+        parser.add_argument(
+            f"--{name}", type=parse_date_argument, metavar="DATE",
+            help=f"{name.replace('-', ' ').capitalize()} date in the ISO format, e.g. 2023-01-31T12:00:00"
+        )
+    parser.add_argument(
+        "--sort", type=str.lower, choices=[sort_field.name.lower() for sort_field in ContactSort],
+        default=ContactSort.UPDATED_DATE.name.lower(), help="Field to sort the contacts by"
+    )
+    parser.add_argument("--descending", action="store_true", help="Sort the contacts in descending order")
+
+
+def get_filter(args: argparse.Namespace) -> ContactFilter:
+    return create_filter(
+        args.search, args.min_created, args.max_created, args.min_updated, args.max_updated,
+        ContactSort[args.sort.upper()], not args.descending
+    )
+
+
+def open_phone_book(args: argparse.Namespace) -> PhoneBook:
+    if args.store_path:
+        if args.storage == "mapped":
+            phone_book = MappedPhoneBook.open(args.store_path)
+        elif args.storage == "sqlite":
+            phone_book = SqlitePhoneBook.open(args.store_path)
+        else:
+            phone_book = PersistentPhoneBook.open(args.store_path, args.vectorized)
+        print(f"Phonebook with {phone_book.contact_count} contacts loaded from '{args.store_path}'", file=sys.stderr)
+        if args.file_path:
+            phone_book.import_from_file(args.file_path, args.reject_file_path, args.chunk_size, args.workers)
+            print(f"Contacts imported from '{args.file_path}'", file=sys.stderr)
+    elif args.file_path:
         file_path = args.file_path
-        phone_book = PhoneBook.from_file(file_path)
-        print(f"Phonebook initialized from '{file_path}'")
+        phone_book = PhoneBook.from_file(
+            file_path, args.reject_file_path, args.chunk_size, args.workers, args.vectorized
+        )
+        print(f"Phonebook initialized from '{file_path}'", file=sys.stderr)
     else:
-        phone_book = PhoneBook()
-        print("Empty phonebook initialized")
-    controller = PhoneBookController(phone_book)
-    controller.run()
+        phone_book = PhoneBook(vectorized=args.vectorized)
+        print("Empty phonebook initialized", file=sys.stderr)
+    return phone_book
+
+
+def close_phone_book(phone_book: PhoneBook):
+    """Close the store of a persisted phonebook, an in-memory phonebook has nothing to close"""
+    if isinstance(phone_book, (PersistentPhoneBook, StoredPhoneBook)):
+        phone_book.close()
+
+
+def run_command(phone_book: PhoneBook, args: argparse.Namespace, options: argparse.Namespace):
+    """Run a command on the phone book, the options are the global ones given before the command"""
+    if args.command == "import":
+        import_contacts(phone_book, args.import_path, options.reject_file_path, options.chunk_size, options.workers)
+    elif args.command == "query":
+        query_contacts(phone_book, get_filter(args), args.limit, args.offset, args.output_format)
+    elif args.command == "export":
+        exported_count = export_contacts(phone_book, get_filter(args), args.export_path)
+        print(f"{exported_count} contacts exported to '{args.export_path}'")
+    elif args.command == "delete":
+        deleted_count = delete_contacts(phone_book, get_filter(args), args.delete_all)
+        print(f"{deleted_count} contacts deleted")
+    elif args.command == "stats":
+        stats = get_stats(phone_book)
+        print(json.dumps(stats, indent=2) if args.output_format == "json" else format_stats(stats), end="\n")
+
+
+def run_script(phone_book: PhoneBook, script_lines: List[str], options: argparse.Namespace):
+    """
+    Run the commands of the script in order. All the lines are parsed before the first command runs,
+    so a mistyped command does not leave the script half done, and the script stops at the first command which fails.
+    """
+    commands = []
+    for line_number, line in enumerate(script_lines, 1):
+        arguments = shlex.split(line, comments=True)
+        if arguments:
+            commands.append(create_script_parser(line_number).parse_args(arguments))
+    for args in commands:
+        run_command(phone_book, args, options)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    phone_book = open_phone_book(args)
+    if args.command is None:
+        metrics_setup = MetricsSetup(args.metrics_path, args.metrics_format, args.profile_action)
+        if args.profile_directory:
+            metrics_setup.profile_directory = args.profile_directory
+        controller = PhoneBookController(phone_book, metrics_setup=metrics_setup)
+        try:
+            controller.run()
+        finally:
+            close_phone_book(phone_book)
+        return 0
+    try:
+        if args.command == "script":
+            if args.script_path == "-":
+                run_script(phone_book, sys.stdin.readlines(), args)
+            else:
+                with open(args.script_path, encoding="utf-8") as script_file:
+                    run_script(phone_book, script_file.readlines(), args)
+        else:
+            run_command(phone_book, args, args)
+    except (BasePhoneBookException, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        close_phone_book(phone_book)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+This module contains the in-process metrics of the phone book: the latency histograms of the actions
+and of the phone book operations, their dump to a file, and the profiling of single calls
+"""
+import cProfile
+import datetime
+import functools
+import json
+import os
+import re
+import time
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from audit import make_path_absolute, BASE_DIRECTORY
+
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+METRICS_FORMATS = ("prometheus", "json")
+
+
+@dataclass
+class MetricsSetup:
+    """
+    Configuration of the metrics of a controller.
+    The metrics are dumped to the file after every action, if a file path is given.
+    If the profiled action is given, every execution of the action with this name is profiled
+    into the profile directory.
+    """
+    file_path: Optional[str] = None
+    file_format: str = "prometheus"
+    profiled_action: Optional[str] = None
+    profile_directory: Path = make_path_absolute("profiles", BASE_DIRECTORY)
+
+
+class LatencyHistogram:
+    """
+    Counts of the observed durations per bucket, with their sum and count, as a Prometheus histogram.
+    A duration falls into the first bucket whose upper bound is not below it, the last bucket has no upper bound.
+    """
+    buckets: Tuple[float, ...]
+    bucket_counts: List[int]
+    count: int
+    sum: float
+    max: float
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.bucket_counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def get_cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Return the number of durations up to every upper bound, the last bound is +Inf"""
+        cumulative_counts = []
+        total = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            total += bucket_count
+            cumulative_counts.append((format_bound(bound), total))
+        return cumulative_counts
+
+    def get_quantile(self, quantile: float) -> float:
+        """Estimate the quantile with the upper bound of its bucket, the durations above the last bound give the max"""
+        if self.count == 0:
+            return 0.0
+        rank = quantile * self.count
+        total = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            total += bucket_count
+            if total >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.get_quantile(0.5),
+            "p99": self.get_quantile(0.99),
+            "buckets": dict(self.get_cumulative_counts()),
+        }
+
+
+def format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """
+    Latency histograms of the measured calls, keyed by the kind of the calls, e.g. action or operation,
+    and by their names.
+    """
+    METRIC_PREFIX = "phone_book"
+    _histograms: Dict[Tuple[str, str], LatencyHistogram]
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._histograms = {}
+
+    def observe(self, kind: str, name: str, seconds: float):
+        histogram = self._histograms.get((kind, name))
+        if histogram is None:
+            histogram = LatencyHistogram(self._buckets)
+            self._histograms[(kind, name)] = histogram
+        histogram.observe(seconds)
+
+    @contextmanager
+    def measure(self, kind: str, name: str) -> Iterator[None]:
+        """Measure the duration of the block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - start)
+
+    def get_histogram(self, kind: str, name: str) -> Optional[LatencyHistogram]:
+        return self._histograms.get((kind, name))
+
+    def instrument(self, target: Any, method_names: Iterable[str], kind: str = "operation"):
+        """
+        Measure the calls of the methods of the target object under their names.
+        The methods are wrapped on the object itself, so its class and the other objects are not affected,
+        and the calls the object makes to these methods are measured as well.
+        """
+        for method_name in method_names:
+            method = getattr(target, method_name)
+            setattr(target, method_name, self._get_measured(method, kind, method_name))
+
+    def _get_measured(self, method, kind: str, name: str):
+        @functools.wraps(method)
+        def measured(*args, **kwargs):
+            with self.measure(kind, name):
+                return method(*args, **kwargs)
+        return measured
+
+    def to_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        metrics = {}
+        for (kind, name), histogram in sorted(self._histograms.items()):
+            metrics.setdefault(kind, {})[name] = histogram.to_dict()
+        return metrics
+
+    def to_prometheus(self) -> str:
+        """Render the histograms in the Prometheus text format, a metric per kind with the names as labels"""
+        lines = []
+        kinds = sorted({kind for kind, _ in self._histograms})
+        for kind in kinds:
+            metric = f"{self.METRIC_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', kind)}_duration_seconds"
+            lines.append(f"# HELP {metric} Duration of the phone book {kind} calls in seconds")
+            lines.append(f"# TYPE {metric} histogram")
+            for (histogram_kind, name), histogram in sorted(self._histograms.items()):
+                if histogram_kind != kind:
+                    continue
+                label = f'name="{escape_label_value(name)}"'
+                for bound, count in histogram.get_cumulative_counts():
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram.sum!r}")
+                lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, file_path: str, metrics_format: str = "prometheus"):
+        """Write the metrics to the file, which is replaced at once, so a reader never sees a partial dump"""
+        if metrics_format == "json":
+            content = json.dumps(self.to_dict(), indent=2)
+        else:
+            content = self.to_prometheus()
+        temporary_path = f"{file_path}.tmp"
+        with open(temporary_path, mode="w", encoding="utf-8") as metrics_file:
+            metrics_file.write(content)
+        os.replace(temporary_path, file_path)
+
+
+class CallProfiler:
+    """
+    Profiles single calls with cProfile and tracemalloc. The profile of a call is written to a .prof file,
+    which can be read with pstats or snakeviz, and the lines which allocated the most memory during the call
+    are written next to it.
+    """
+    _directory: Path
+    _top_count: int
+    last_paths: Optional[Tuple[Path, Path]]
+
+    def __init__(self, directory: Path, top_count: int = 25):
+        self._directory = Path(directory)
+        self._top_count = top_count
+        self.last_paths = None
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        os.makedirs(self._directory, exist_ok=True)
+        file_stem = f"{re.sub(r'[^a-zA-Z0-9]+', '_', name).strip('_').lower()}-" \
+                    f"{datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        profile_path = self._directory.joinpath(f"{file_stem}.prof")
+        allocations_path = self._directory.joinpath(f"{file_stem}.allocations.txt")
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        profiler = cProfile.Profile()
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            after = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not was_tracing:
+                tracemalloc.stop()
+            profiler.dump_stats(str(profile_path))
+            with open(allocations_path, mode="w", encoding="utf-8") as allocations_file:
+                allocations_file.write(f"Peak traced memory: {peak} bytes\n")
+                for statistic in after.compare_to(before, "lineno")[:self._top_count]:
+                    allocations_file.write(f"{statistic}\n")
+            self.last_paths = (profile_path, allocations_path)
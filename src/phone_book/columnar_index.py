@@ -0,0 +1,221 @@
+"""
+This module contains the columnar copy of the contacts, which is filtered and sorted with NumPy.
+NumPy is an optional dependency, the pure Python phone book works without it.
+"""
+from typing import Any, Collection, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from phone_book.contact_store import to_timestamp
+
+
+class ColumnarContactIndex:
+    """
+    Keeps the created and updated dates of the contacts as int64 arrays of microseconds since the epoch,
+    so the date criteria of a filter are evaluated as boolean masks and the results are ordered with a stable
+    argsort instead of comparing Python objects.
+    The rows follow the insertion order, which makes the stable sorts break the ties the same way
+    as PhoneBook.sort_values. A deleted row is only marked, and the rows are compacted once most of them
+    are deleted.
+    The text columns (id, names and phone number) are built when the results are first sorted by them and are
+    maintained from then on. NumPy compares the strings by their code points as Python does, except that it
+    ignores trailing NUL characters, so a column with such values is sorted in Python instead.
+    The search query is still checked in Python, on the rows which passed the date masks.
+    """
+    _INITIAL_CAPACITY = 1024
+
+    _size: int
+    _live_count: int
+    _rows: Dict[str, int]
+    _text_columns: Dict[str, Any]
+    _unsortable_counts: Dict[str, int]
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("NumPy is required for the columnar contact index")
+        self._size = 0
+        self._live_count = 0
+        self._rows = {}
+        self._contacts = np.empty(self._INITIAL_CAPACITY, dtype=object)
+        self._live = np.zeros(self._INITIAL_CAPACITY, dtype=bool)
+        self._created = np.zeros(self._INITIAL_CAPACITY, dtype=np.int64)
+        self._updated = np.zeros(self._INITIAL_CAPACITY, dtype=np.int64)
+        self._text_columns = {}
+        self._unsortable_counts = {}
+
+    @staticmethod
+    def is_available() -> bool:
+        return np is not None
+
+    def __len__(self):
+        return self._live_count
+
+    @staticmethod
+    def _is_unsortable(value: Optional[str]) -> bool:
+        return value is None or value.endswith("\0")
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self._contacts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        self._contacts = self._grow(self._contacts, capacity)
+        self._live = self._grow(self._live, capacity)
+        self._created = self._grow(self._created, capacity)
+        self._updated = self._grow(self._updated, capacity)
+        for property_name, column in self._text_columns.items():
+            self._text_columns[property_name] = self._grow(column, capacity)
+
+    @staticmethod
+    def _grow(column, capacity: int):
+        grown = np.zeros(capacity, dtype=column.dtype)
+        grown[:len(column)] = column
+        return grown
+
+    def add_many(self, contacts: List[Contact]):
+        """Add the contacts, which have to come after the already added ones in the insertion order"""
+        first_row = self._size
+        self._ensure_capacity(first_row + len(contacts))
+        end = first_row + len(contacts)
+        self._contacts[first_row:end] = contacts
+        self._live[first_row:end] = True
+        self._created[first_row:end] = [to_timestamp(contact.created_date) for contact in contacts]
+        self._updated[first_row:end] = [to_timestamp(contact.updated_date) for contact in contacts]
+        for property_name in self._text_columns:
+            self._set_text_values(
+                property_name, slice(first_row, end), [getattr(contact, property_name) for contact in contacts]
+            )
+        for row, contact in enumerate(contacts, first_row):
+            self._rows[contact.contact_id] = row
+        self._size = end
+        self._live_count += len(contacts)
+
+    def remove(self, contact: Contact):
+        self.remove_many([contact])
+
+    def remove_many(self, contacts: List[Contact]):
+        rows = [self._rows.pop(contact.contact_id) for contact in contacts]
+        for property_name in self._text_columns:
+            self._unsortable_counts[property_name] -= sum(
+                1 for contact in contacts if self._is_unsortable(getattr(contact, property_name))
+            )
+        self._live[rows] = False
+        self._contacts[rows] = None
+        self._live_count -= len(rows)
+        if self._size > self._INITIAL_CAPACITY and self._live_count < self._size // 2:
+            self._compact()
+
+    def replace(self, contact: Contact, replacement: Contact):
+        """Put the replacement of a contact with the same id in its row, it keeps the place in the insertion order"""
+        row = self._rows[contact.contact_id]
+        self._contacts[row] = replacement
+        self._created[row] = to_timestamp(replacement.created_date)
+        self._updated[row] = to_timestamp(replacement.updated_date)
+        for property_name in self._text_columns:
+            if self._is_unsortable(getattr(contact, property_name)):
+                self._unsortable_counts[property_name] -= 1
+            self._set_text_values(property_name, [row], [getattr(replacement, property_name)])
+
+    def update(self, contact: Contact, old_values: Dict[str, Any]):
+        row = self._rows[contact.contact_id]
+        self._updated[row] = to_timestamp(contact.updated_date)
+        for property_name in self._text_columns:
+            if property_name in old_values:
+                if self._is_unsortable(old_values[property_name]):
+                    self._unsortable_counts[property_name] -= 1
+                self._set_text_values(property_name, [row], [getattr(contact, property_name)])
+
+    def _set_text_values(self, property_name: str, rows, values: List[Optional[str]]):
+        self._unsortable_counts[property_name] += sum(1 for value in values if self._is_unsortable(value))
+        values = ["" if value is None else value for value in values]
+        column = self._text_columns[property_name]
+        width = max((len(value) for value in values), default=0)
+        if width > column.dtype.itemsize // np.dtype("U1").itemsize:
+            column = column.astype(f"U{width}")
+            self._text_columns[property_name] = column
+        column[rows] = values
+
+    def _build_text_column(self, property_name: str):
+        self._text_columns[property_name] = np.zeros(len(self._contacts), dtype="U1")
+        self._unsortable_counts[property_name] = 0
+        rows = np.flatnonzero(self._live[:self._size])
+        values = [getattr(contact, property_name) for contact in self._contacts[rows]]
+        self._set_text_values(property_name, rows, values)
+
+    def _compact(self):
+        rows = np.flatnonzero(self._live[:self._size])
+        capacity = max(self._INITIAL_CAPACITY, 2 * len(rows))
+        self._contacts = self._compacted(self._contacts, rows, capacity)
+        self._live = self._compacted(self._live, rows, capacity)
+        self._created = self._compacted(self._created, rows, capacity)
+        self._updated = self._compacted(self._updated, rows, capacity)
+        for property_name, column in self._text_columns.items():
+            self._text_columns[property_name] = self._compacted(column, rows, capacity)
+        self._rows = {contact.contact_id: row for row, contact in enumerate(self._contacts[:len(rows)])}
+        self._size = len(rows)
+
+    @staticmethod
+    def _compacted(column, rows, capacity: int):
+        compacted = np.zeros(capacity, dtype=column.dtype)
+        compacted[:len(rows)] = column[rows]
+        return compacted
+
+    def apply(self, contact_filter: ContactFilter, candidates: Optional[Collection[Contact]] = None) -> List[Contact]:
+        """
+        Return the contacts matching the filter in its order.
+        If the candidates are given, the contacts which are not among them are known not to match the search query.
+        """
+        rows = self._get_matching_rows(contact_filter, candidates)
+        return self._contacts[self._sort_rows(rows, contact_filter)].tolist()
+
+    def _get_matching_rows(self, contact_filter: ContactFilter, candidates: Optional[Collection[Contact]]):
+        mask = self._live[:self._size].copy()
+        for column, minimum, maximum in [
+            (self._created, contact_filter.min_created_date, contact_filter.max_created_date),
+            (self._updated, contact_filter.min_updated_date, contact_filter.max_updated_date),
+        ]:
+            if minimum is not None:
+                mask &= column[:self._size] >= to_timestamp(minimum)
+            if maximum is not None:
+                mask &= column[:self._size] <= to_timestamp(maximum)
+        if candidates is not None:
+            candidate_mask = np.zeros(self._size, dtype=bool)
+            candidate_mask[[self._rows[contact.contact_id] for contact in candidates]] = True
+            mask &= candidate_mask
+        rows = np.flatnonzero(mask)
+        if contact_filter.search_query is not None:
+            matches = ContactFilter.compile_predicate(contact_filter)
+            rows = rows[np.array([matches(contact) for contact in self._contacts[rows]], dtype=bool)]
+        return rows
+
+    def _sort_rows(self, rows, contact_filter: ContactFilter):
+        sort_field = contact_filter.sort_field
+        property_name = sort_field.property_name if isinstance(sort_field, ContactSort) else "updated_date"
+        if property_name == "created_date":
+            keys = self._created[rows]
+        elif property_name == "updated_date":
+            keys = self._updated[rows]
+        else:
+            if property_name not in self._text_columns:
+                self._build_text_column(property_name)
+            if self._unsortable_counts[property_name] > 0:
+                return self._sort_rows_in_python(rows, property_name, contact_filter.ascending)
+            keys = self._text_columns[property_name][rows]
+            if not contact_filter.ascending:
+                keys = np.unique(keys, return_inverse=True)[1]
+        if not contact_filter.ascending:
+            keys = -keys
+        return rows[np.argsort(keys, kind="stable")]
+
+    def _sort_rows_in_python(self, rows, property_name: str, ascending: bool):
+        contacts = self._contacts
+        return np.array(
+            sorted(rows.tolist(), key=lambda row: getattr(contacts[row], property_name), reverse=not ascending),
+            dtype=np.intp
+        )
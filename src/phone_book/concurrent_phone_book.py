@@ -0,0 +1,241 @@
+"""
+This module contains the definition of the ConcurrentPhoneBook, a phone book which can be shared between threads
+"""
+import logging
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from audit import LoggingSetup, get_logger
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+from exceptions.exceptions import InvalidActionException, InvalidInputException, NoContactsMatchedException
+from phone_book.phone_book import PhoneBook
+
+EDITABLE_FIELDS = ("first_name", "last_name", "phone_number", "email", "address")
+
+
+class ReaderSlot:
+    """The phone book a thread is reading, with the depth of its nested reads"""
+    __slots__ = ("phone_book", "depth", "__weakref__")
+
+    def __init__(self):
+        self.phone_book = None
+        self.depth = 0
+
+
+class PhoneBookSnapshot:
+    """
+    A read-only view of a version of the phone book, which does not change while the snapshot is open.
+    The view is only valid inside the snapshot block which created it.
+    """
+
+    def __init__(self, phone_book: PhoneBook):
+        self._phone_book = phone_book
+
+    @property
+    def contact_count(self) -> int:
+        return self._phone_book.contact_count
+
+    @property
+    def contacts(self) -> List[Contact]:
+        return self._phone_book.contacts
+
+    def query(self, contact_filter: ContactFilter, limit: Optional[int] = None, offset: int = 0) -> List[Contact]:
+        return self._phone_book.query(contact_filter, limit, offset)
+
+    def retrieve_contacts_by_id(self, contact_id: str) -> List[Contact]:
+        return self._phone_book.retrieve_contacts_by_id(contact_id)
+
+
+class ConcurrentPhoneBook:
+    """
+    A phone book which many threads can read and write at the same time.
+    Two copies of the phone book are kept, each with its own copies of the contacts. The readers query
+    the published copy without taking any lock: a reader only announces the copy it reads in a slot of its thread.
+    A writer takes the writer lock, applies the change to the other copy and publishes it, so the new readers
+    see the whole change at once. It then waits until the readers still reading the previous copy are done,
+    and applies the same change to that copy, which becomes the one the next writer changes.
+    So a reader always sees a version of the phone book which does not change under it, and the writers
+    only wait for the reads which were already running when they published.
+    The changes are validated before they are applied, so they are applied in the same way to both copies.
+    The copies log their warnings and errors only, every change is logged once by the concurrent phone book.
+    The contacts are never changed once they are published: an edit replaces the contact with an edited copy,
+    so the contacts returned to a reader keep their values. They should not be edited directly,
+    edit_contact changes them through the phone book.
+    The filters are evaluated with query, each reader passes its own filter, there are no shared current results.
+    """
+    logger = PhoneBook.logger
+    replica_logger = get_logger(LoggingSetup(
+        name="ConcurrentPhoneBookReplicaLogger", console_level=logging.ERROR, file_level=logging.WARNING
+    ))
+    MIN_WAIT_INTERVAL = 0.00005
+    MAX_WAIT_INTERVAL = 0.001
+    _published: PhoneBook
+    _standby: PhoneBook
+    _reader_slots: Tuple[weakref.ref, ...]
+
+    def __init__(self, contacts: Optional[List[Contact]] = None):
+        contacts = contacts if contacts is not None else []
+        self._published = PhoneBook([contact.copy() for contact in contacts], logger=self.replica_logger)
+        self._standby = PhoneBook([contact.copy() for contact in contacts], logger=self.replica_logger)
+        for phone_book in (self._published, self._standby):
+            phone_book.build_sort_indexes()
+        self._write_lock = threading.RLock()
+        self._registration_lock = threading.Lock()
+        self._local = threading.local()
+        self._reader_slots = ()
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """The number of changes published so far"""
+        return self._version
+
+    def _get_reader_slot(self) -> ReaderSlot:
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = ReaderSlot()
+            self._local.slot = slot
+            with self._registration_lock:
+                self._reader_slots = tuple(
+                    reference for reference in self._reader_slots if reference() is not None
+                ) + (weakref.ref(slot),)
+        return slot
+
+    @contextmanager
+    def snapshot(self) -> Iterator[PhoneBookSnapshot]:
+        """
+        Read a version of the phone book which does not change inside the block, a nested snapshot of the same
+        thread reads the same version. The copy is announced before it is read and taken again if a writer
+        published another copy in between, so a writer never changes a copy which is announced.
+        """
+        slot = self._get_reader_slot()
+        if slot.depth == 0:
+            while True:
+                phone_book = self._published
+                slot.phone_book = phone_book
+                if self._published is phone_book:
+                    break
+        slot.depth += 1
+        try:
+            yield PhoneBookSnapshot(slot.phone_book)
+        finally:
+            slot.depth -= 1
+            if slot.depth == 0:
+                slot.phone_book = None
+
+    @property
+    def contact_count(self) -> int:
+        with self.snapshot() as snapshot:
+            return snapshot.contact_count
+
+    @property
+    def contacts(self) -> List[Contact]:
+        with self.snapshot() as snapshot:
+            return snapshot.contacts
+
+    def query(self, contact_filter: ContactFilter, limit: Optional[int] = None, offset: int = 0) -> List[Contact]:
+        with self.snapshot() as snapshot:
+            return snapshot.query(contact_filter, limit, offset)
+
+    def retrieve_contacts_by_id(self, contact_id: str) -> List[Contact]:
+        with self.snapshot() as snapshot:
+            return snapshot.retrieve_contacts_by_id(contact_id)
+
+    def _write(self, change: Callable[[PhoneBook], Any]) -> Any:
+        """
+        Apply the change to both copies and return its result on the copy which is published.
+        The change has to fail before it changes anything, or not at all.
+        """
+        slot = self._get_reader_slot()
+        if slot.depth > 0:
+            raise InvalidActionException("The phone book can not be changed inside a snapshot of the same thread")
+        with self._write_lock:
+            result = change(self._standby)
+            previous = self._published
+            self._published = self._standby
+            self._version += 1
+            self._wait_for_readers(previous)
+            change(previous)
+            self._standby = previous
+        return result
+
+    def _wait_for_readers(self, phone_book: PhoneBook):
+        """
+        Poll the reader slots until none of them announces the phone book. The writer yields once and then sleeps
+        for intervals doubling from MIN_WAIT_INTERVAL to MAX_WAIT_INTERVAL, so a long read is not busy-waited on.
+        """
+        interval = 0.0
+        while any(
+                slot is not None and slot.phone_book is phone_book
+                for slot in (reference() for reference in self._reader_slots)
+        ):
+            time.sleep(interval)
+            interval = min(max(2 * interval, self.MIN_WAIT_INTERVAL), self.MAX_WAIT_INTERVAL)
+
+    def add_contact(self, contact: Contact) -> Contact:
+        """Add a copy of the contact and return the published copy"""
+        added = self._write(lambda phone_book: self._add_copies(phone_book, [contact])[0])
+        self.logger.info("Contact '%s'(id=%s) created", added.full_name, added.contact_id)
+        return added
+
+    def add_contacts(self, contacts: Iterable[Contact]) -> List[Contact]:
+        """Add copies of the contacts at once and return the published copies"""
+        contacts = list(contacts)
+        added = self._write(lambda phone_book: self._add_copies(phone_book, contacts))
+        self.logger.info("%d contacts added", len(added))
+        return added
+
+    @staticmethod
+    def _add_copies(phone_book: PhoneBook, contacts: List[Contact]) -> List[Contact]:
+        copies = [contact.copy() for contact in contacts]
+        phone_book.add_contacts(copies)
+        return copies
+
+    def edit_contact(self, contact_id: str, values: Dict[str, Optional[str]]) -> Contact:
+        """
+        Change the given fields of the contact and return the published edited contact.
+        The edited contact is a new object, the contact which was published before keeps its values.
+        The fields are set on a copy first, which validates them before any of the copies is changed.
+        """
+        unknown_fields = set(values) - set(EDITABLE_FIELDS)
+        if unknown_fields:
+            raise InvalidInputException(f"Unknown contact fields: {', '.join(sorted(unknown_fields))}")
+        with self._write_lock:
+            edited = self._find_contact(self._standby, contact_id).copy()
+            for name, value in values.items():
+                if getattr(edited, name) != value:
+                    setattr(edited, name, value)
+            replacement = self._write(lambda phone_book: self._replace_contact(phone_book, edited))
+        self.logger.info("Contact '%s'(id=%s) edited", replacement.full_name, replacement.contact_id)
+        return replacement
+
+    @staticmethod
+    def _replace_contact(phone_book: PhoneBook, edited: Contact) -> Contact:
+        """The edited contact takes the place of the contact in the insertion order"""
+        replacement = edited.copy()
+        phone_book.replace_contact(ConcurrentPhoneBook._find_contact(phone_book, edited.contact_id), replacement)
+        return replacement
+
+    @staticmethod
+    def _find_contact(phone_book: PhoneBook, contact_id: str) -> Contact:
+        contacts = phone_book.retrieve_contacts_by_id(contact_id)
+        if not contacts:
+            raise NoContactsMatchedException(f"No contacts matched id: {contact_id}")
+        return contacts[0]
+
+    def delete_contacts_by_id(self, contact_id: str):
+        self._write(lambda phone_book: phone_book.delete_contact(self._find_contact(phone_book, contact_id)))
+        self.logger.info("Contact %s deleted", contact_id)
+
+    def delete_contacts(self, contacts: Iterable[Contact]) -> int:
+        """Delete the contacts with the ids of the given contacts at once, either all or none of them"""
+        contact_ids = list(dict.fromkeys(contact.contact_id for contact in contacts))
+        self._write(lambda phone_book: phone_book.delete_contacts(
+            [self._find_contact(phone_book, contact_id) for contact_id in contact_ids]
+        ))
+        self.logger.info("%d contacts deleted", len(contact_ids))
+        return len(contact_ids)
@@ -0,0 +1,211 @@
+"""
+This module contains the on-disk storage of the contacts: a binary snapshot and an append-only journal
+"""
+import datetime
+import os
+import struct
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, BinaryIO, Tuple
+
+from contacts.contact import Contact
+from exceptions.exceptions import StorageException, ValueTooLongException
+
+EPOCH = datetime.datetime(1970, 1, 1)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def to_timestamp(value: datetime.datetime) -> int:
+    """Convert a naive datetime to the exact number of microseconds since the epoch"""
+    return (value - EPOCH) // ONE_MICROSECOND
+
+
+def from_timestamp(value: int) -> datetime.datetime:
+    return EPOCH + value * ONE_MICROSECOND
+
+
+class ContactRecordCodec:
+    """
+    Binary encoding of a contact: the 16 bytes of the id, the created and updated dates as
+    microseconds since the epoch, the byte lengths of the five text fields, and the UTF-8 text fields.
+    A missing field has the length NONE_LENGTH, so the text fields are shorter than NONE_LENGTH bytes.
+    """
+    HEADER = struct.Struct("<16sqq5H")
+    NONE_LENGTH = 0xFFFF
+
+    @classmethod
+    def encode(cls, contact: Contact) -> bytes:
+        fields = [contact.first_name, contact.last_name, contact.phone_number, contact.email, contact.address]
+        encoded_fields = [field.encode("utf-8") if field is not None else b"" for field in fields]
+        lengths = [
+            len(encoded) if field is not None else cls.NONE_LENGTH for field, encoded in zip(fields, encoded_fields)
+        ]
+        if any(len(encoded) >= cls.NONE_LENGTH for encoded in encoded_fields):
+            raise ValueTooLongException(f"A field of contact {contact.contact_id} is too long to be stored")
+        header = cls.HEADER.pack(
+            uuid.UUID(contact.contact_id).bytes, to_timestamp(contact.created_date),
+            to_timestamp(contact.updated_date), *lengths
+        )
+        return header + b"".join(encoded_fields)
+
+    @classmethod
+    def decode(cls, data: bytes, offset: int = 0) -> Tuple[Contact, int]:
+        """Decode the contact starting at the offset, return it with the offset of the next record"""
+        id_bytes, created, updated, *lengths = cls.HEADER.unpack_from(data, offset)
+        offset += cls.HEADER.size
+        fields = []
+        for length in lengths:
+            if length == cls.NONE_LENGTH:
+                fields.append(None)
+                continue
+            fields.append(data[offset:offset + length].decode("utf-8"))
+            offset += length
+        contact = Contact.restore(
+            str(uuid.UUID(bytes=id_bytes)), fields[0], fields[1], fields[2], fields[3], fields[4],
+            from_timestamp(created), from_timestamp(updated)
+        )
+        return contact, offset
+
+
+class ContactStore:
+    """
+    Stores the contacts of a phone book in a directory as a binary snapshot and an append-only journal.
+    Every mutation is appended to the journal, and on load the journal is replayed on top of the snapshot.
+    The journal is compacted into a new snapshot once it grows larger than the snapshot.
+    A journal entry is a 4 byte length, a single byte operation and the encoded contact (or the id for a delete),
+    so a partially written last entry is detected and dropped on load.
+    """
+    SNAPSHOT_MAGIC = b"PBSNAP01"
+    SNAPSHOT_FILE_NAME = "contacts.snapshot"
+    JOURNAL_FILE_NAME = "contacts.journal"
+    MIN_COMPACTION_ENTRIES = 1000
+    _ADD = b"A"
+    _UPDATE = b"U"
+    _DELETE = b"D"
+    _ENTRY_HEADER = struct.Struct("<Ic")
+    _COUNT = struct.Struct("<Q")
+
+    _directory: Path
+    _journal: Optional[BinaryIO]
+    _snapshot_count: int
+    _journal_entry_count: int
+
+    def __init__(self, directory: str):
+        self._directory = Path(directory)
+        self._journal = None
+        self._snapshot_count = 0
+        self._journal_entry_count = 0
+
+    @property
+    def snapshot_path(self) -> Path:
+        return self._directory.joinpath(self.SNAPSHOT_FILE_NAME)
+
+    @property
+    def journal_path(self) -> Path:
+        return self._directory.joinpath(self.JOURNAL_FILE_NAME)
+
+    @property
+    def journal_entry_count(self) -> int:
+        return self._journal_entry_count
+
+    def load(self) -> List[Contact]:
+        """Load the snapshot, replay the journal on top of it and open the journal for appending"""
+        try:
+            os.makedirs(self._directory, exist_ok=True)
+            contacts = self._load_snapshot()
+            self._snapshot_count = len(contacts)
+            valid_journal_size = self._replay_journal(contacts)
+            self._journal = open(self.journal_path, mode="ab")  # pylint: disable=consider-using-with
+            self._journal.truncate(valid_journal_size)
+        except (OSError, struct.error, UnicodeError, ValueError) as exc:
+            raise StorageException(f"Failed to load the contacts from {self._directory}") from exc
+        return list(contacts.values())
+
+    def _load_snapshot(self) -> Dict[str, Contact]:
+        contacts = {}
+        if not self.snapshot_path.exists():
+            return contacts
+        data = self.snapshot_path.read_bytes()
+        if not data.startswith(self.SNAPSHOT_MAGIC):
+            raise StorageException(f"{self.snapshot_path} is not a contact snapshot")
+        offset = len(self.SNAPSHOT_MAGIC)
+        (count,) = self._COUNT.unpack_from(data, offset)
+        offset += self._COUNT.size
+        for _ in range(count):
+            contact, offset = ContactRecordCodec.decode(data, offset)
+            contacts[contact.contact_id] = contact
+        return contacts
+
+    def _replay_journal(self, contacts: Dict[str, Contact]) -> int:
+        """Apply the journal entries to the contacts and return the size of the complete entries"""
+        if not self.journal_path.exists():
+            return 0
+        data = self.journal_path.read_bytes()
+        offset = 0
+        while offset + self._ENTRY_HEADER.size <= len(data):
+            length, operation = self._ENTRY_HEADER.unpack_from(data, offset)
+            end = offset + self._ENTRY_HEADER.size + length
+            if end > len(data):
+                break
+            payload = data[offset + self._ENTRY_HEADER.size:end]
+            if operation == self._DELETE:
+                contacts.pop(str(uuid.UUID(bytes=payload)), None)
+            elif operation == self._ADD:
+                contact, _ = ContactRecordCodec.decode(payload)
+                contacts[contact.contact_id] = contact
+            elif operation == self._UPDATE:
+                contact, _ = ContactRecordCodec.decode(payload)
+                if contact.contact_id in contacts:
+                    contacts[contact.contact_id] = contact
+            else:
+                raise StorageException(f"Unknown journal operation {operation!r}")
+            self._journal_entry_count += 1
+            offset = end
+        return offset
+
+    def _append(self, operation: bytes, payloads: Iterable[bytes]):
+        """Append an entry per payload, the entries are flushed at once"""
+        if self._journal is None:
+            raise StorageException("The contact store is not loaded")
+        entries = [self._ENTRY_HEADER.pack(len(payload), operation) + payload for payload in payloads]
+        self._journal.write(b"".join(entries))
+        self._journal.flush()
+        self._journal_entry_count += len(entries)
+
+    def append_added(self, records: Iterable[bytes]):
+        """Append the records of the added contacts, encoded with ContactRecordCodec"""
+        self._append(self._ADD, records)
+
+    def append_updated(self, record: bytes):
+        """Append the record of the updated contact, encoded with ContactRecordCodec"""
+        self._append(self._UPDATE, [record])
+
+    def append_deleted(self, contacts: Iterable[Contact]):
+        self._append(self._DELETE, (uuid.UUID(contact.contact_id).bytes for contact in contacts))
+
+    def should_compact(self) -> bool:
+        return self._journal_entry_count >= max(self.MIN_COMPACTION_ENTRIES, self._snapshot_count)
+
+    def compact(self, contacts: List[Contact]):
+        """Write the contacts to a new snapshot and empty the journal"""
+        temporary_path = self.snapshot_path.with_suffix(".tmp")
+        try:
+            with open(temporary_path, mode="wb") as snapshot_file:
+                snapshot_file.write(self.SNAPSHOT_MAGIC + self._COUNT.pack(len(contacts)))
+                for contact in contacts:
+                    snapshot_file.write(ContactRecordCodec.encode(contact))
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+            if self._journal is not None:
+                self._journal.truncate(0)
+                self._journal.flush()
+        except OSError as exc:
+            raise StorageException(f"Failed to write the snapshot to {self._directory}") from exc
+        self._snapshot_count = len(contacts)
+        self._journal_entry_count = 0
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
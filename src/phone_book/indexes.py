@@ -0,0 +1,414 @@
+"""
+This module contains the in-memory indexes the PhoneBook keeps over its contacts
+"""
+import datetime
+import math
+from bisect import bisect_left, insort
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, Set, Optional, Iterable, Any, List, Tuple, Iterator, Callable, Collection
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+
+
+class TrigramIndex:
+    """
+    Inverted index from the lowercase trigrams of the searchable fields to the contacts containing them.
+    A query token can only be a substring of a field if all of its trigrams are in that field,
+    so the index gives a superset of the matching contacts, which still needs the exact substring check.
+    Tokens shorter than a trigram can not be narrowed down by the index.
+    """
+    GRAM_SIZE = 3
+    SEARCH_FIELDS = ("first_name", "last_name", "phone_number", "email", "address")
+    _postings: Dict[str, Set[Contact]]
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+
+    def __len__(self):
+        return len(self._postings)
+
+    @classmethod
+    def get_grams(cls, value: Optional[str]) -> Set[str]:
+        if value is None:
+            return set()
+        value = value.lower()
+        return {value[index:index + cls.GRAM_SIZE] for index in range(len(value) - cls.GRAM_SIZE + 1)}
+
+    @classmethod
+    def get_contact_grams(cls, values: Iterable[Optional[str]]) -> Set[str]:
+        grams = set()
+        for value in values:
+            grams.update(cls.get_grams(value))
+        return grams
+
+    @classmethod
+    def get_field_values(cls, contact: Contact, overrides: Optional[Dict[str, Any]] = None) -> Iterable[Optional[str]]:
+        if overrides is None:
+            overrides = {}
+        return [overrides.get(field, getattr(contact, field)) for field in cls.SEARCH_FIELDS]
+
+    def add(self, contact: Contact):
+        for gram in self.get_contact_grams(self.get_field_values(contact)):
+            self._postings[gram].add(contact)
+
+    def remove(self, contact: Contact):
+        self._discard(contact, self.get_contact_grams(self.get_field_values(contact)))
+
+    def update(self, contact: Contact, old_values: Dict[str, Any]):
+        if not any(field in old_values for field in self.SEARCH_FIELDS):
+            return
+        old_grams = self.get_contact_grams(self.get_field_values(contact, old_values))
+        new_grams = self.get_contact_grams(self.get_field_values(contact))
+        self._discard(contact, old_grams - new_grams)
+        for gram in new_grams - old_grams:
+            self._postings[gram].add(contact)
+
+    def _discard(self, contact: Contact, grams: Iterable[str]):
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            posting.discard(contact)
+            if not posting:
+                del self._postings[gram]
+
+    def get_candidates(self, search_query: str) -> Optional[Set[Contact]]:
+        """
+        Return the contacts that may match any of the query tokens,
+        or None if the query has a token which is too short to be looked up
+        """
+        candidates = set()
+        for token in ContactFilter.get_query_tokens(search_query):
+            grams = self.get_grams(token)
+            if not grams:
+                return None
+            postings = sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+            candidates.update(postings[0].intersection(*postings[1:]))
+        return candidates
+
+
+class SortedContactList:
+    """
+    Contacts kept sorted by unique keys, so that a key range can be found with a binary search.
+    The keys are usually tuples of the sorted value and a tie breaker which makes them unique.
+    """
+    _BULK_INSERT_RATIO = 16
+    _keys: List[Tuple]
+    _contacts: List[Contact]
+
+    def __init__(self):
+        self._keys = []
+        self._contacts = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def insert(self, key: Tuple, contact: Contact):
+        index = bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self._contacts.insert(index, contact)
+
+    def insert_many(self, entries: List[Tuple[Tuple, Contact]]):
+        """Insert many contacts, a large batch is merged in with a single sort instead of an insert per contact"""
+        if len(entries) * self._BULK_INSERT_RATIO < len(self._keys):
+            for key, contact in entries:
+                self.insert(key, contact)
+            return
+        merged = sorted(list(zip(self._keys, self._contacts)) + entries, key=itemgetter(0))
+        self._keys = [key for key, _ in merged]
+        self._contacts = [contact for _, contact in merged]
+
+    def remove(self, key: Tuple):
+        index = bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            raise KeyError(key)
+        del self._keys[index]
+        del self._contacts[index]
+
+    def remove_many(self, keys: List[Tuple]):
+        """Remove many contacts, a large batch is removed in a single pass instead of a delete per contact"""
+        if len(keys) * self._BULK_INSERT_RATIO < len(self._keys):
+            for key in keys:
+                self.remove(key)
+            return
+        removed = set(keys)
+        kept = [index for index, key in enumerate(self._keys) if key not in removed]
+        if len(self._keys) - len(kept) != len(removed):
+            raise KeyError(next(iter(removed.difference(self._keys))))
+        self._keys = [self._keys[index] for index in kept]
+        self._contacts = [self._contacts[index] for index in kept]
+
+    def get_range(self, min_key: Optional[Tuple] = None, max_key: Optional[Tuple] = None) -> List[Contact]:
+        """Return the contacts with min_key <= key < max_key in the key order, a missing bound is not checked"""
+        start = 0 if min_key is None else bisect_left(self._keys, min_key)
+        end = len(self._keys) if max_key is None else bisect_left(self._keys, max_key, lo=start)
+        return self._contacts[start:end]
+
+    def get_by_prefix(self, prefix: str) -> List[Contact]:
+        """Return the contacts whose string key value starts with the prefix"""
+        return self.get_range((prefix,), (prefix + chr(0x10FFFF),))
+
+    def iter_contacts(self, ascending: bool = True) -> Iterator[Contact]:
+        """
+        Iterate over the contacts in the order of the first item of their keys.
+        The contacts with equal first key items are in the order of the remaining items in both directions.
+        """
+        if ascending:
+            yield from self._contacts
+            return
+        keys, contacts = self._keys, self._contacts
+        last = len(keys) - 1
+        while last >= 0:
+            value = keys[last][0]
+            first = last
+            while first > 0 and keys[first - 1][0] == value:
+                first -= 1
+            if first == last:
+                yield contacts[last]
+            else:
+                yield from contacts[first:last + 1]
+            last = first - 1
+
+
+class PhoneNumberIndex:
+    """
+    Index of the phone number digits, which answers exact, prefix, suffix and area code lookups
+    with a binary search over the digits and over the reversed digits.
+    Phone numbers are always of the form (###) ###-####, so a query is matched against this template
+    to find out which digits of the number it refers to.
+    """
+    PHONE_NUMBER_TEMPLATE = "(ddd) ddd-dddd"
+    _DIGIT_SLOT = "d"
+    _by_digits: SortedContactList
+    _by_reversed_digits: SortedContactList
+
+    def __init__(self):
+        self._by_digits = SortedContactList()
+        self._by_reversed_digits = SortedContactList()
+
+    def __len__(self):
+        return len(self._by_digits)
+
+    @classmethod
+    def get_digits(cls, phone_number: str) -> str:
+        return "".join(
+            char for char, slot in zip(phone_number, cls.PHONE_NUMBER_TEMPLATE) if slot == cls._DIGIT_SLOT
+        )
+
+    def add(self, contact: Contact, phone_number: Optional[str] = None):
+        if phone_number is None:
+            phone_number = contact.phone_number
+        digits = self.get_digits(phone_number)
+        self._by_digits.insert((digits, contact.contact_id), contact)
+        self._by_reversed_digits.insert((digits[::-1], contact.contact_id), contact)
+
+    def add_many(self, contacts: List[Contact]):
+        digits = [self.get_digits(contact.phone_number) for contact in contacts]
+        self._by_digits.insert_many([
+            ((contact_digits, contact.contact_id), contact) for contact_digits, contact in zip(digits, contacts)
+        ])
+        self._by_reversed_digits.insert_many([
+            ((contact_digits[::-1], contact.contact_id), contact) for contact_digits, contact in zip(digits, contacts)
+        ])
+
+    def remove(self, contact: Contact, phone_number: Optional[str] = None):
+        if phone_number is None:
+            phone_number = contact.phone_number
+        digits = self.get_digits(phone_number)
+        self._by_digits.remove((digits, contact.contact_id))
+        self._by_reversed_digits.remove((digits[::-1], contact.contact_id))
+
+    def remove_many(self, contacts: List[Contact]):
+        digits = [self.get_digits(contact.phone_number) for contact in contacts]
+        self._by_digits.remove_many([
+            (contact_digits, contact.contact_id) for contact_digits, contact in zip(digits, contacts)
+        ])
+        self._by_reversed_digits.remove_many([
+            (contact_digits[::-1], contact.contact_id) for contact_digits, contact in zip(digits, contacts)
+        ])
+
+    def update(self, contact: Contact, old_values: Dict[str, Any]):
+        if "phone_number" not in old_values:
+            return
+        self.remove(contact, old_values["phone_number"])
+        self.add(contact)
+
+    def find_exact(self, digits: str) -> List[Contact]:
+        return self._by_digits.get_range((digits,), (digits + chr(0),))
+
+    def find_by_prefix(self, digits: str) -> List[Contact]:
+        return self._by_digits.get_by_prefix(digits)
+
+    def find_by_suffix(self, digits: str) -> List[Contact]:
+        return self._by_reversed_digits.get_by_prefix(digits[::-1])
+
+    def find_by_area_code(self, area_code: str) -> List[Contact]:
+        return self.find_by_prefix(area_code)
+
+    def find(self, query: str) -> Optional[Set[Contact]]:
+        """
+        Return the contacts whose formatted phone number contains the query,
+        or None if the query refers to digits in the middle of the number, which are not indexed
+        """
+        matches = set()
+        template = self.PHONE_NUMBER_TEMPLATE
+        for offset in range(len(template) - len(query) + 1):
+            slots = template[offset:offset + len(query)]
+            if not all(
+                    char.isdecimal() if slot == self._DIGIT_SLOT else char == slot for char, slot in zip(query, slots)
+            ):
+                continue
+            digits = "".join(char for char, slot in zip(query, slots) if slot == self._DIGIT_SLOT)
+            first_digit = template[:offset].count(self._DIGIT_SLOT)
+            if first_digit == 0 or not digits:
+                matches.update(self.find_by_prefix(digits))
+            elif first_digit + len(digits) == template.count(self._DIGIT_SLOT):
+                matches.update(self.find_by_suffix(digits))
+            else:
+                return None
+        return matches
+
+
+class SortIndex:
+    """
+    Contacts sorted by one of their properties, which gives them in a sort order without sorting them.
+    The sequence number of the contact in the phone book is used as a tie breaker, so the contacts with
+    equal values are in the insertion order, as they are after a stable sort.
+    """
+    _field: str
+    _contacts: SortedContactList
+
+    def __init__(self, field: str):
+        self._field = field
+        self._contacts = SortedContactList()
+
+    def __len__(self):
+        return len(self._contacts)
+
+    def add(self, contact: Contact, sequence_number: int):
+        self._contacts.insert((getattr(contact, self._field), sequence_number), contact)
+
+    def add_many(self, contacts: Iterable[Tuple[Contact, int]]):
+        self._contacts.insert_many([
+            ((getattr(contact, self._field), sequence_number), contact) for contact, sequence_number in contacts
+        ])
+
+    def remove(self, contact: Contact, sequence_number: int):
+        self._contacts.remove((getattr(contact, self._field), sequence_number))
+
+    def remove_many(self, contacts: Iterable[Tuple[Contact, int]]):
+        self._contacts.remove_many([
+            (getattr(contact, self._field), sequence_number) for contact, sequence_number in contacts
+        ])
+
+    def update(self, contact: Contact, sequence_number: int, old_values: Dict[str, Any]):
+        if self._field not in old_values:
+            return
+        self._contacts.remove((old_values[self._field], sequence_number))
+        self.add(contact, sequence_number)
+
+    def iter_sorted(self, ascending: bool = True) -> Iterator[Contact]:
+        """Iterate over the contacts in the order of PhoneBook.sort_values"""
+        return self._contacts.iter_contacts(ascending)
+
+
+class DateIndex(SortIndex):
+    """
+    Contacts sorted by one of their date properties, which answers date range lookups with a binary search.
+    """
+    def get_range(
+            self,
+            min_date: Optional[datetime.datetime] = None,
+            max_date: Optional[datetime.datetime] = None
+    ) -> List[Contact]:
+        """Return the contacts with min_date <= date <= max_date ordered by the date"""
+        min_key = None if min_date is None else (min_date,)
+        max_key = None if max_date is None else (max_date, math.inf)
+        return self._contacts.get_range(min_key, max_key)
+
+
+class GroupIndex:
+    """
+    Contacts grouped by a key computed from some of their properties, the fields.
+    The group names are kept sorted, and the contacts of a group are kept in the insertion order
+    by their sequence numbers. The group of every contact is remembered, so a contact is moved
+    to its new group without computing its old key.
+    """
+    _key: Callable[[Contact], str]
+    _fields: frozenset
+    _groups: Dict[str, SortedContactList]
+    _group_names: List[str]
+    _contact_groups: Dict[int, str]
+
+    def __init__(self, key: Callable[[Contact], str], fields: Collection[str]):
+        self._key = key
+        self._fields = frozenset(fields)
+        self._groups = {}
+        self._group_names = []
+        self._contact_groups = {}
+
+    def __len__(self):
+        return len(self._contact_groups)
+
+    def add(self, contact: Contact, sequence_number: int):
+        self.add_many([(contact, sequence_number)])
+
+    def get_keys(self, contacts: Iterable[Contact]) -> List[str]:
+        """Compute the group names of the contacts, e.g. before the other indexes are changed"""
+        return [self._key(contact) for contact in contacts]
+
+    def add_many(self, contacts: Iterable[Tuple[Contact, int]], group_names: Optional[List[str]] = None):
+        """Add the contacts, all the group names are computed before the index is changed"""
+        contacts = list(contacts)
+        if group_names is None:
+            group_names = self.get_keys(contact for contact, _ in contacts)
+        entries = defaultdict(list)
+        for (contact, sequence_number), group_name in zip(contacts, group_names):
+            self._contact_groups[sequence_number] = group_name
+            entries[group_name].append(((sequence_number,), contact))
+        for group_name, group_entries in entries.items():
+            group = self._groups.get(group_name)
+            if group is None:
+                group = SortedContactList()
+                self._groups[group_name] = group
+                insort(self._group_names, group_name)
+            group.insert_many(group_entries)
+
+    def remove(self, sequence_number: int):
+        self.remove_many([sequence_number])
+
+    def remove_many(self, sequence_numbers: Iterable[int]):
+        keys = defaultdict(list)
+        for sequence_number in sequence_numbers:
+            keys[self._contact_groups.pop(sequence_number)].append((sequence_number,))
+        for group_name, group_keys in keys.items():
+            group = self._groups[group_name]
+            group.remove_many(group_keys)
+            if len(group) == 0:
+                del self._groups[group_name]
+                del self._group_names[bisect_left(self._group_names, group_name)]
+
+    def update(self, contact: Contact, sequence_number: int, old_values: Dict[str, Any]):
+        if self._fields.isdisjoint(old_values):
+            return
+        if self._contact_groups[sequence_number] == self._key(contact):
+            return
+        self.remove(sequence_number)
+        self.add(contact, sequence_number)
+
+    def get_group_names(self) -> List[str]:
+        return list(self._group_names)
+
+    def get_count(self, group_name: str) -> int:
+        group = self._groups.get(group_name)
+        return 0 if group is None else len(group)
+
+    def get_group(self, group_name: str) -> List[Contact]:
+        group = self._groups.get(group_name)
+        return [] if group is None else group.get_range()
+
+    def items(self) -> Iterator[Tuple[str, List[Contact]]]:
+        for group_name in self._group_names:
+            yield group_name, self._groups[group_name].get_range()
@@ -0,0 +1,222 @@
+"""
+This module contains the memory-mapped storage of the contacts in a file of fixed size records
+"""
+import mmap
+import os
+import struct
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from contacts.contact import Contact
+from contacts.contact_import import ContactValues
+from exceptions.exceptions import StorageException, ValueTooLongException
+from phone_book.contact_store import to_timestamp, from_timestamp
+
+
+class MappedContactStore:
+    """
+    Stores the contacts in a memory-mapped file of fixed size records, so a record is addressed by its slot
+    number, is decoded only when it is read and is overwritten in place when the contact changes.
+    A record is a status byte, the 16 bytes of the id, the created and updated dates as microseconds since
+    the epoch, the byte lengths of the five text fields and the UTF-8 text fields padded to FIELD_SIZES.
+    New records are always appended, so the slot numbers follow the insertion order. A deleted record is only
+    marked as such and its slot is never reused.
+    The changes are written to the mapped memory and reach the file when the operating system flushes it,
+    or at the latest when the store is closed.
+    The slots of the live records are indexed by their ids in memory, the index is built when the store is opened.
+    """
+    MAGIC = b"PBMMAP01"
+    HEADER = struct.Struct("<8sIQQ")
+    HEADER_SIZE = 64
+    FIELD_SIZES = (64, 64, 32, 128, 256)
+    FIELD_NAMES = ("first name", "last name", "phone number", "email", "address")
+    RECORD = struct.Struct("<B16sqq5H" + "".join(f"{size}s" for size in FIELD_SIZES))
+    DATES = struct.Struct("<qq")
+    DATES_OFFSET = 17
+    ID_OFFSET = 1
+    ID_SIZE = 16
+    NONE_LENGTH = 0xFFFF
+    LIVE = 1
+    DELETED = 0
+    INITIAL_CAPACITY = 1024
+
+    _file_path: str
+    _closed: bool
+    _slot_count: int
+    _live_count: int
+    _slots_by_id: Dict[bytes, int]
+
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+        self._closed = False
+        try:
+            if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+                self._file = open(file_path, "r+b")  # pylint: disable=consider-using-with
+                self._map = mmap.mmap(self._file.fileno(), 0)
+                self._read_header()
+                self._index_ids()
+            else:
+                self._file = open(file_path, "w+b")  # pylint: disable=consider-using-with
+                self._file.truncate(self._get_offset(self.INITIAL_CAPACITY))
+                self._map = mmap.mmap(self._file.fileno(), 0)
+                self._slot_count = 0
+                self._live_count = 0
+                self._slots_by_id = {}
+                self._write_header()
+        except OSError as exc:
+            raise StorageException(f"Failed to open contact store '{file_path}': {exc}") from exc
+
+    def __len__(self) -> int:
+        return self._live_count
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def slot_count(self) -> int:
+        return self._slot_count
+
+    def _read_header(self):
+        if len(self._map) < self.HEADER_SIZE:
+            raise StorageException(f"Contact store '{self._file_path}' is truncated")
+        magic, record_size, self._slot_count, self._live_count = self.HEADER.unpack_from(self._map, 0)
+        if magic != self.MAGIC or record_size != self.RECORD.size:
+            raise StorageException(f"'{self._file_path}' is not a contact store")
+        if self._get_offset(self._slot_count) > len(self._map):
+            raise StorageException(f"Contact store '{self._file_path}' is truncated")
+
+    def _index_ids(self):
+        self._slots_by_id = {}
+        for slot in self.iter_slots():
+            self._slots_by_id[self._read_id_bytes(slot)] = slot
+
+    def _read_id_bytes(self, slot: int) -> bytes:
+        offset = self._get_offset(slot) + self.ID_OFFSET
+        return self._map[offset:offset + self.ID_SIZE]
+
+    def _write_header(self):
+        self.HEADER.pack_into(self._map, 0, self.MAGIC, self.RECORD.size, self._slot_count, self._live_count)
+
+    def _get_offset(self, slot: int) -> int:
+        return self.HEADER_SIZE + slot * self.RECORD.size
+
+    def _ensure_capacity(self, slot_count: int):
+        size = self._get_offset(slot_count)
+        if size <= len(self._map):
+            return
+        size = max(size, self._get_offset(2 * (len(self._map) - self.HEADER_SIZE) // self.RECORD.size))
+        self._map.close()
+        try:
+            self._file.truncate(size)
+        finally:
+            self._map = mmap.mmap(self._file.fileno(), 0)
+
+    def _check_slot(self, slot: int):
+        if not 0 <= slot < self._slot_count or self._map[self._get_offset(slot)] != self.LIVE:
+            raise StorageException(f"There is no contact in slot {slot}")
+
+    @classmethod
+    def check_field_sizes(cls, values: ContactValues):
+        """Check that the encoded text fields fit in the record, e.g. before a row is imported"""
+        for field_name, value, size in zip(cls.FIELD_NAMES, values, cls.FIELD_SIZES):
+            if value is not None and len(value.encode("utf-8")) > size:
+                raise ValueTooLongException(f"The {field_name} is longer than the {size} bytes of the record")
+
+    @classmethod
+    def encode(cls, contact: Contact) -> bytes:
+        fields = [contact.first_name, contact.last_name, contact.phone_number, contact.email, contact.address]
+        lengths = []
+        encoded_fields = []
+        for field, size in zip(fields, cls.FIELD_SIZES):
+            encoded = field.encode("utf-8") if field is not None else b""
+            if len(encoded) > size:
+                raise ValueTooLongException(
+                    f"A field of contact {contact.contact_id} is longer than the {size} bytes of the record"
+                )
+            lengths.append(len(encoded) if field is not None else cls.NONE_LENGTH)
+            encoded_fields.append(encoded)
+        return cls.RECORD.pack(
+            cls.LIVE, uuid.UUID(contact.contact_id).bytes, to_timestamp(contact.created_date),
+            to_timestamp(contact.updated_date), *lengths, *encoded_fields
+        )
+
+    def append_many(self, contacts: List[Contact]) -> List[int]:
+        """
+        Append the contacts and return their slots.
+        All the contacts are encoded before anything is written, so either all or none of them are stored.
+        """
+        records = [self.encode(contact) for contact in contacts]
+        first_slot = self._slot_count
+        self._ensure_capacity(first_slot + len(records))
+        offset = self._get_offset(first_slot)
+        self._map[offset:offset + len(records) * self.RECORD.size] = b"".join(records)
+        for slot, contact in enumerate(contacts, first_slot):
+            self._slots_by_id[uuid.UUID(contact.contact_id).bytes] = slot
+        self._slot_count += len(records)
+        self._live_count += len(records)
+        self._write_header()
+        return list(range(first_slot, self._slot_count))
+
+    def write(self, slot: int, contact: Contact):
+        self._check_slot(slot)
+        record = self.encode(contact)
+        offset = self._get_offset(slot)
+        self._map[offset:offset + self.RECORD.size] = record
+
+    def delete(self, slot: int):
+        self._check_slot(slot)
+        self._map[self._get_offset(slot)] = self.DELETED
+        del self._slots_by_id[self._read_id_bytes(slot)]
+        self._live_count -= 1
+        self._write_header()
+
+    def clear(self):
+        self._slot_count = 0
+        self._live_count = 0
+        self._slots_by_id = {}
+        self._write_header()
+
+    def is_live(self, slot: int) -> bool:
+        return self._map[self._get_offset(slot)] == self.LIVE
+
+    def read(self, slot: int) -> Contact:
+        self._check_slot(slot)
+        _, id_bytes, created, updated, *values = self.RECORD.unpack_from(self._map, self._get_offset(slot))
+        lengths, encoded_fields = values[:5], values[5:]
+        fields = [
+            encoded[:length].decode("utf-8") if length != self.NONE_LENGTH else None
+            for length, encoded in zip(lengths, encoded_fields)
+        ]
+        return Contact.restore(
+            str(uuid.UUID(bytes=id_bytes)), fields[0], fields[1], fields[2], fields[3], fields[4],
+            from_timestamp(created), from_timestamp(updated)
+        )
+
+    def read_timestamps(self, slot: int) -> Tuple[int, int]:
+        """Return the created and updated dates of the slot as microseconds since the epoch, without decoding it"""
+        return self.DATES.unpack_from(self._map, self._get_offset(slot) + self.DATES_OFFSET)
+
+    def iter_slots(self) -> Iterator[int]:
+        """Iterate over the slots of the stored contacts in the insertion order"""
+        for slot in range(self._slot_count):
+            if self._map[self._get_offset(slot)] == self.LIVE:
+                yield slot
+
+    def find(self, contact_id: str) -> Optional[int]:
+        """Return the slot of the live contact with the id"""
+        try:
+            return self._slots_by_id.get(uuid.UUID(contact_id).bytes)
+        except ValueError:
+            return None
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._closed = True
@@ -0,0 +1,88 @@
+"""
+This module contains the definition of the MappedPhoneBook entry
+"""
+from typing import Any, Iterator, List, Optional, Tuple
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+from phone_book.contact_store import to_timestamp
+from phone_book.mapped_contact_store import MappedContactStore
+from phone_book.stored_phone_book import StoredPhoneBook
+
+
+class MappedPhoneBook(StoredPhoneBook):
+    """
+    Phone book which keeps its contacts in a MappedContactStore, so opening it does not read the contacts
+    and the resident memory is proportional to the contacts in use rather than to the size of the book.
+    The slot of a contact in the store is its position. The filters are served by scanning the store,
+    the date ranges are checked on the raw records before a contact is decoded.
+    """
+    validate_imported_values = MappedContactStore.check_field_sizes
+    _store: MappedContactStore
+
+    def __init__(self, store: MappedContactStore):
+        self._store = store
+        super().__init__()
+
+    @classmethod
+    def open(cls, file_path: str) -> 'MappedPhoneBook':
+        return cls(MappedContactStore(file_path))
+
+    @property
+    def store(self) -> MappedContactStore:
+        return self._store
+
+    def _store_contacts(self, contacts: List[Contact]) -> List[int]:
+        return self._store.append_many(contacts)
+
+    def _update_stored_contact(self, position: int, contact: Contact):
+        self._store.write(position, contact)
+
+    def _delete_stored_contact(self, position: int):
+        self._store.delete(position)
+
+    def _clear_stored_contacts(self):
+        self._store.clear()
+
+    def _count_stored_contacts(self) -> int:
+        return len(self._store)
+
+    def _find_stored_contact(self, contact_id: str) -> Optional[Tuple[int, Any]]:
+        slot = self._store.find(contact_id)
+        if slot is None:
+            return None
+        return slot, slot
+
+    def _iter_stored_records(self, contact_filter: Optional[ContactFilter] = None) -> Iterator[Tuple[int, Any]]:
+        created_range = updated_range = None
+        if contact_filter is not None:
+            created_range = self._get_timestamp_range(contact_filter.min_created_date, contact_filter.max_created_date)
+            updated_range = self._get_timestamp_range(contact_filter.min_updated_date, contact_filter.max_updated_date)
+        for slot in self._store.iter_slots():
+            if created_range is not None or updated_range is not None:
+                created, updated = self._store.read_timestamps(slot)
+                if not self._is_in_range(created, created_range) or not self._is_in_range(updated, updated_range):
+                    continue
+            yield slot, slot
+
+    @staticmethod
+    def _get_timestamp_range(minimum, maximum) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        if minimum is None and maximum is None:
+            return None
+        return (
+            to_timestamp(minimum) if minimum is not None else None,
+            to_timestamp(maximum) if maximum is not None else None,
+        )
+
+    @staticmethod
+    def _is_in_range(value: int, timestamp_range: Optional[Tuple[Optional[int], Optional[int]]]) -> bool:
+        if timestamp_range is None:
+            return True
+        minimum, maximum = timestamp_range
+        return (minimum is None or value >= minimum) and (maximum is None or value <= maximum)
+
+    def _decode_stored_record(self, record: Any) -> Contact:
+        return self._store.read(record)
+
+    def close(self):
+        self._store.close()
@@ -0,0 +1,82 @@
+"""
+This module contains the definition of the PersistentPhoneBook entry
+"""
+from typing import Dict, Any, Iterable, List
+
+from contacts.contact import Contact
+from exceptions.exceptions import StorageException
+from phone_book.contact_store import ContactRecordCodec, ContactStore
+from phone_book.phone_book import PhoneBook
+
+
+class PersistentPhoneBook(PhoneBook):
+    """
+    Phone book which keeps its contacts in a ContactStore.
+    The contacts are loaded from the snapshot and the journal on start, so their ids and dates survive restarts,
+    and every add, edit and delete is appended to the journal.
+    The journal records are encoded before a change is applied in memory, so a contact which can not be stored,
+    e.g. with a too long field, changes nothing. An edit of such a contact is reverted.
+    """
+    _store: ContactStore
+
+    def __init__(self, store: ContactStore, vectorized: bool = False):
+        self._store = store
+        super().__init__(store.load(), vectorized)
+
+    @classmethod
+    def open(cls, directory: str, vectorized: bool = False) -> 'PersistentPhoneBook':
+        return cls(ContactStore(directory), vectorized)
+
+    @property
+    def store(self) -> ContactStore:
+        return self._store
+
+    def add_contact(self, contact: Contact):
+        record = ContactRecordCodec.encode(contact)
+        super().add_contact(contact)
+        self._store.append_added([record])
+        self._compact_if_needed()
+
+    def add_contacts(self, contacts: List[Contact]):
+        records = [ContactRecordCodec.encode(contact) for contact in contacts]
+        super().add_contacts(contacts)
+        self._store.append_added(records)
+        self._compact_if_needed()
+
+    def delete_contact(self, contact: Contact):
+        super().delete_contact(contact)
+        self._store.append_deleted([contact])
+        self._compact_if_needed()
+
+    def delete_contacts(self, contacts: Iterable[Contact]):
+        contacts = list(dict.fromkeys(contacts))
+        super().delete_contacts(contacts)
+        self._store.append_deleted(contacts)
+        self._compact_if_needed()
+
+    def replace_contact(self, contact: Contact, replacement: Contact):
+        record = ContactRecordCodec.encode(replacement)
+        super().replace_contact(contact, replacement)
+        self._store.append_updated(record)
+        self._compact_if_needed()
+
+    def on_contact_updated(self, contact: Contact, old_values: Dict[str, Any]):
+        try:
+            record = ContactRecordCodec.encode(contact)
+        except StorageException:
+            contact.revert(old_values)
+            raise
+        super().on_contact_updated(contact, old_values)
+        self._store.append_updated(record)
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        if self._store.should_compact():
+            self.compact()
+
+    def compact(self):
+        self._store.compact(self.contacts)
+        self.logger.info("Contact store compacted to %d contacts", len(self._contacts))
+
+    def close(self):
+        self._store.close()
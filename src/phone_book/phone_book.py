@@ -1,37 +1,130 @@
 """
 This module contains the definition of the PhoneBook entry
 """
+import heapq
+import itertools
+import logging
 from collections import defaultdict
-from typing import List, Dict, Callable
+from operator import attrgetter
+from typing import List, Dict, Callable, Any, Iterable, Collection, Iterator, Optional, Tuple
 
-from audit import get_logger_by_name
-from contacts.contact import Contact
+from audit import get_logger_by_name, collapse_logs
+from contacts.contact import Contact, ContactObserver
+from contacts.contact_import import RejectedRowsWriter, DEFAULT_IMPORT_CHUNK_SIZE, ValuesValidator
+from contacts.parallel_import import iter_contacts_from_csv_parallel
 from contacts.filter import ContactFilter, ContactSort
 from exceptions.exceptions import ContactAlreadyExistsException, NoContactsMatchedException, \
-    ContactIsNotRegisteredException
+    ContactIsNotRegisteredException, InvalidInputException
+from phone_book.columnar_index import ColumnarContactIndex
+from phone_book.indexes import TrigramIndex, PhoneNumberIndex, DateIndex, SortIndex, GroupIndex
 
 
-class PhoneBook:
+class PhoneBook(ContactObserver):  # pylint: disable=too-many-public-methods
+    """
+    Keeps the registered contacts and the results of the currently applied filter.
+    Contacts are stored in a dict keyed by their id, so id lookups, deletes and duplicate checks
+    do not need to scan the whole book. The dict keeps the insertion order of the contacts.
+    The phone book subscribes to its contacts to keep the search, phone number and date indexes
+    up to date with their changes.
+    The current results are kept up to date incrementally: added, deleted and edited contacts are checked
+    against the current filter and moved to their sorted position, without filtering the whole book again.
+    Contacts with equal sort values keep the order in which they were added.
+    The contacts are also kept in the order of every sort field, so that the results of a filter can be taken
+    from an ordering in the sort direction instead of being sorted. The orderings of the date fields are the date
+    indexes, the other ones are built when the contacts are first sorted by their field.
+    The groupings of the contacts are registered by name on first use and are maintained in the same way.
+    """
     logger = get_logger_by_name("PhoneBookLogger")
-    _contacts: List[Contact]
+    _INCREMENTAL_INSERT_LIMIT = 32
+    _ORDERED_SCAN_RATIO = 4
+    # extra validation of the imported rows, e.g. the limits of a storage, the rows failing it are rejected
+    validate_imported_values: Optional[ValuesValidator] = None
+    _contacts: Dict[str, Contact]
+    _sequence_numbers: Dict[str, int]
+    _next_sequence_number: int
+    _search_index: TrigramIndex
+    _phone_number_index: PhoneNumberIndex
+    _created_date_index: DateIndex
+    _updated_date_index: DateIndex
+    _sort_indexes: Dict[ContactSort, SortIndex]
+    _group_indexes: Dict[str, GroupIndex]
+    _columnar_index: Optional[ColumnarContactIndex] = None
     _contact_filter: ContactFilter
     _current_results: List[Contact]
 
-    def __init__(self, contacts: List[Contact] = None):
-        if contacts is None:
-            contacts = []
-        self.contacts = contacts
+    def __init__(
+            self, contacts: List[Contact] = None, vectorized: bool = False, logger: Optional[logging.Logger] = None
+    ):
+        """
+        If vectorized, the filters are evaluated on a ColumnarContactIndex, which requires NumPy.
+        If the logger is given, the phone book logs to it instead of the logger of the class.
+        """
+        if logger is not None:
+            self.logger = logger
+        self._vectorized = vectorized
+        self._reset_indexes()
+        if contacts:
+            self._check_new_contacts(contacts)
+            self._register_contacts(contacts)
         self.contact_filter = ContactFilter()
         self.refresh_current_results()
 
     @classmethod
-    def from_file(cls, file_path: str) -> 'PhoneBook':
-        contacts = Contact.bulk_create_contacts_from_csv(file_path)
-        return cls(contacts)
+    def from_file(
+            cls,
+            file_path: str,
+            reject_file_path: Optional[str] = None,
+            chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+            workers: int = 0,
+            vectorized: bool = False
+    ) -> 'PhoneBook':
+        phone_book = cls(vectorized=vectorized)
+        phone_book.import_from_file(file_path, reject_file_path, chunk_size, workers)
+        return phone_book
+
+    def import_from_file(
+            self,
+            file_path: str,
+            reject_file_path: Optional[str] = None,
+            chunk_size: int = DEFAULT_IMPORT_CHUNK_SIZE,
+            workers: int = 0
+    ) -> int:
+        """
+        Stream the contacts of the CSV file into the phone book chunk by chunk.
+        If the reject file path is given, the invalid rows are written there instead of failing the import.
+        With a positive number of workers the rows are parsed and validated in that many processes.
+        Return the number of imported contacts.
+        """
+        imported_count = 0
+        rejects = RejectedRowsWriter(reject_file_path) if reject_file_path is not None else None
+        if workers > 0:
+            chunks = iter_contacts_from_csv_parallel(
+                file_path, chunk_size, rejects, workers, validate_values=self.validate_imported_values
+            )
+        else:
+            chunks = Contact.iter_contacts_from_csv(file_path, chunk_size, rejects, self.validate_imported_values)
+        try:
+            with collapse_logs(Contact.logger, f"Import of '{file_path}'"):
+                for chunk in chunks:
+                    self.add_contacts(chunk)
+                    imported_count += len(chunk)
+        finally:
+            if rejects is not None:
+                rejects.close()
+        self.logger.info("Imported %d contacts from '%s'", imported_count, file_path)
+        return imported_count
 
     @property
-    def contacts(self):
-        return self._contacts
+    def contacts(self) -> List[Contact]:
+        return list(self._contacts.values())
+
+    @property
+    def contact_count(self) -> int:
+        return len(self._contacts)
+
+    def get_contacts_page(self, offset: int, limit: int) -> List[Contact]:
+        """Return the contacts in the insertion order from the offset, without a list of the whole book"""
+        return list(itertools.islice(self._contacts.values(), offset, offset + limit))
 
     @property
     def current_results(self):
@@ -46,77 +139,427 @@ class PhoneBook:
         self._current_results = value
 
     @contacts.setter
-    def contacts(self, value):
-        self._contacts = value
+    def contacts(self, value: List[Contact]):
+        self._clear_contacts()
+        self._check_new_contacts(value)
+        self._register_contacts(value)
 
     @contact_filter.setter
     def contact_filter(self, value):
         self._contact_filter = value
 
     def add_contact(self, contact: Contact):
-        if len(self.retrieve_contacts_by_id(contact.contact_id)) != 0:
-            raise ContactAlreadyExistsException(f"Contact {contact.contact_id} already exists")
-        self.contacts.append(contact)
-        self.refresh_current_results()
+        self._check_new_contacts([contact])
+        self._register_contact(contact)
+        if ContactFilter.matches(contact, self.contact_filter):
+            self._insert_current_result(contact)
         self.logger.info("Contact '%s'(id=%s) created", contact.full_name, contact.contact_id)
 
+    def add_contacts(self, contacts: List[Contact]):
+        """
+        Add a batch of contacts at once, the current results are updated once for the whole batch.
+        Either all or none of the contacts are added.
+        """
+        self._check_new_contacts(contacts)
+        self._register_contacts(contacts)
+        matches = ContactFilter.compile_predicate(self.contact_filter)
+        self._insert_current_results([contact for contact in contacts if matches(contact)])
+        self.logger.info("%d contacts added", len(contacts))
+
     def retrieve_contacts_by_name(self, name: str) -> List[Contact]:
+        name = name.lower()
         return [
-            contact for contact in self.contacts if name.lower() in contact.full_name.lower()
+            contact for contact in self._contacts.values() if name in contact.normalized_full_name
         ]
 
     def retrieve_contact_by_phone(self, phone_number: str) -> List[Contact]:
-        return [contact for contact in self.contacts if phone_number in contact.phone_number]
+        contacts = self._phone_number_index.find(phone_number)
+        if contacts is None:
+            return [contact for contact in self._contacts.values() if phone_number in contact.phone_number]
+        return sorted(contacts, key=self._get_sequence_number)
+
+    def retrieve_contacts_by_area_code(self, area_code: str) -> List[Contact]:
+        contacts = self._phone_number_index.find_by_area_code(area_code)
+        return sorted(contacts, key=self._get_sequence_number)
 
     def retrieve_contacts_by_id(self, contact_id: str) -> List[Contact]:
-        contacts = [contact for contact in self.contacts if contact_id == contact.contact_id]
-        return contacts
+        contact = self._contacts.get(contact_id)
+        if contact is None:
+            return []
+        return [contact]
 
     def delete_contact(self, contact: Contact):
-        if contact not in self.contacts:
+        if not self._is_registered(contact):
             raise ContactIsNotRegisteredException(f"Contact {contact.contact_id} is not registered")
-        self.contacts.remove(contact)
+        self._remove_current_result(contact)
+        self._unregister_contact(contact)
         self.logger.info("Contact '%s'(id=%s) deleted", contact.full_name, contact.contact_id)
 
+    def delete_contacts(self, contacts: Iterable[Contact]):
+        """
+        Delete a batch of contacts at once, the indexes and the current results are updated once for the whole batch.
+        Either all or none of the contacts are deleted.
+        """
+        contacts = list(dict.fromkeys(contacts))
+        for contact in contacts:
+            if not self._is_registered(contact):
+                raise ContactIsNotRegisteredException(f"Contact {contact.contact_id} is not registered")
+        self._remove_current_results(contacts)
+        self._unregister_contacts(contacts)
+        self.logger.info("%d contacts deleted", len(contacts))
+
+    def replace_contact(self, contact: Contact, replacement: Contact):
+        """
+        Replace a registered contact with another contact of the same id, e.g. an edited copy of it.
+        The replacement takes the sequence number of the contact, so it keeps its place in the insertion order
+        and among the contacts with equal sort values.
+        """
+        self._check_replacement(contact, replacement)
+        group_names = self._get_group_keys([replacement])
+        self._remove_current_result(contact)
+        self._replace_registered_contact(contact, replacement, group_names)
+        if ContactFilter.matches(replacement, self.contact_filter):
+            self._insert_current_result(replacement)
+        self.logger.info("Contact '%s'(id=%s) replaced", replacement.full_name, replacement.contact_id)
+
+    def _check_replacement(self, contact: Contact, replacement: Contact):
+        if not self._is_registered(contact):
+            raise ContactIsNotRegisteredException(f"Contact {contact.contact_id} is not registered")
+        if replacement.contact_id != contact.contact_id:
+            raise InvalidInputException(
+                f"Contact {contact.contact_id} can not be replaced with contact {replacement.contact_id}"
+            )
+
     def delete_contacts_by_id(self, contact_id: str):
-        contacts = [contact for contact in self.contacts if contact_id == contact.contact_id]
+        contacts = self.retrieve_contacts_by_id(contact_id)
         if len(contacts) == 0:
             raise NoContactsMatchedException(f"No contacts matched id: {contact_id}")
         for contact in contacts:
             self.delete_contact(contact)
-        self.refresh_current_results()
+
+    def _reset_indexes(self):
+        self._contacts = {}
+        self._sequence_numbers = {}
+        self._next_sequence_number = 0
+        self._search_index = TrigramIndex()
+        self._phone_number_index = PhoneNumberIndex()
+        self._created_date_index = DateIndex("created_date")
+        self._updated_date_index = DateIndex("updated_date")
+        self._sort_indexes = {}
+        self._group_indexes = {}
+        self._columnar_index = ColumnarContactIndex() if self._vectorized else None
+
+    def _clear_contacts(self):
+        for contact in self._contacts.values():
+            contact.unsubscribe(self)
+        self._reset_indexes()
+
+    def _is_registered(self, contact: Contact) -> bool:
+        return self._contacts.get(contact.contact_id) is contact
+
+    def _check_new_contacts(self, contacts: List[Contact]):
+        contact_ids = set()
+        for contact in contacts:
+            if contact.contact_id in self._contacts or contact.contact_id in contact_ids:
+                raise ContactAlreadyExistsException(f"Contact {contact.contact_id} already exists")
+            contact_ids.add(contact.contact_id)
+
+    def _register_contact(self, contact: Contact):
+        self._register_contacts([contact])
+
+    def _get_group_keys(self, contacts: List[Contact]) -> List[List[str]]:
+        return [group_index.get_keys(contacts) for group_index in self._group_indexes.values()]
+
+    def _register_contacts(self, contacts: List[Contact]):
+        """The group keys are computed first, so that a failing key does not leave the contacts half registered"""
+        group_names = self._get_group_keys(contacts)
+        sequence_numbers = []
+        for contact in contacts:
+            self._contacts[contact.contact_id] = contact
+            sequence_number = self._next_sequence_number
+            self._sequence_numbers[contact.contact_id] = sequence_number
+            self._next_sequence_number += 1
+            sequence_numbers.append(sequence_number)
+            contact.subscribe(self)
+        self._add_to_indexes(contacts, sequence_numbers, group_names)
+        if self._columnar_index is not None:
+            self._columnar_index.add_many(contacts)
+
+    def _replace_registered_contact(self, contact: Contact, replacement: Contact, group_names: List[List[str]]):
+        """
+        The replacement takes the place of the contact in the dict of the contacts, its sequence number
+        and its row of the columnar index
+        """
+        contact.unsubscribe(self)
+        sequence_number = self._sequence_numbers[contact.contact_id]
+        self._remove_from_indexes(contact, sequence_number)
+        self._contacts[contact.contact_id] = replacement
+        replacement.subscribe(self)
+        self._add_to_indexes([replacement], [sequence_number], group_names)
+        if self._columnar_index is not None:
+            self._columnar_index.replace(contact, replacement)
+
+    def _add_to_indexes(self, contacts: List[Contact], sequence_numbers: List[int], group_names: List[List[str]]):
+        """Add the contacts to the indexes keyed by their values, the columnar index follows the insertion order"""
+        for contact in contacts:
+            self._search_index.add(contact)
+        self._phone_number_index.add_many(contacts)
+        self._created_date_index.add_many(zip(contacts, sequence_numbers))
+        self._updated_date_index.add_many(zip(contacts, sequence_numbers))
+        for sort_index in self._sort_indexes.values():
+            sort_index.add_many(zip(contacts, sequence_numbers))
+        for group_index, names in zip(self._group_indexes.values(), group_names):
+            group_index.add_many(zip(contacts, sequence_numbers), names)
+
+    def _unregister_contact(self, contact: Contact):
+        contact.unsubscribe(self)
+        self._remove_from_indexes(contact, self._sequence_numbers.pop(contact.contact_id))
+        if self._columnar_index is not None:
+            self._columnar_index.remove(contact)
+        del self._contacts[contact.contact_id]
+
+    def _remove_from_indexes(self, contact: Contact, sequence_number: int):
+        self._search_index.remove(contact)
+        self._phone_number_index.remove(contact)
+        self._created_date_index.remove(contact, sequence_number)
+        self._updated_date_index.remove(contact, sequence_number)
+        for sort_index in self._sort_indexes.values():
+            sort_index.remove(contact, sequence_number)
+        for group_index in self._group_indexes.values():
+            group_index.remove(sequence_number)
+
+    def _unregister_contacts(self, contacts: List[Contact]):
+        if len(contacts) <= self._INCREMENTAL_INSERT_LIMIT:
+            for contact in contacts:
+                self._unregister_contact(contact)
+            return
+        sequence_numbers = []
+        for contact in contacts:
+            contact.unsubscribe(self)
+            self._search_index.remove(contact)
+            sequence_numbers.append(self._sequence_numbers.pop(contact.contact_id))
+            del self._contacts[contact.contact_id]
+        self._phone_number_index.remove_many(contacts)
+        self._created_date_index.remove_many(zip(contacts, sequence_numbers))
+        self._updated_date_index.remove_many(zip(contacts, sequence_numbers))
+        for sort_index in self._sort_indexes.values():
+            sort_index.remove_many(zip(contacts, sequence_numbers))
+        for group_index in self._group_indexes.values():
+            group_index.remove_many(sequence_numbers)
+        if self._columnar_index is not None:
+            self._columnar_index.remove_many(contacts)
+
+    def on_contact_updated(self, contact: Contact, old_values: Dict[str, Any]):
+        self._update_indexes(contact, old_values)
+        self._remove_current_result(contact, old_values)
+        if ContactFilter.matches(contact, self.contact_filter):
+            self._insert_current_result(contact)
+
+    def _update_indexes(self, contact: Contact, old_values: Dict[str, Any]):
+        sequence_number = self._get_sequence_number(contact)
+        for group_index in self._group_indexes.values():
+            group_index.update(contact, sequence_number, old_values)
+        self._search_index.update(contact, old_values)
+        self._phone_number_index.update(contact, old_values)
+        self._updated_date_index.update(contact, sequence_number, old_values)
+        for sort_index in self._sort_indexes.values():
+            sort_index.update(contact, sequence_number, old_values)
+        if self._columnar_index is not None:
+            self._columnar_index.update(contact, old_values)
+
+    def _get_sequence_number(self, contact: Contact) -> int:
+        return self._sequence_numbers[contact.contact_id]
+
+    def get_candidates(self, contact_filter: ContactFilter) -> Iterable[Contact]:
+        """
+        Narrow down the contacts which may match the filter using the indexes.
+        The smallest of the date range slices and the search index candidates is taken.
+        The candidates are returned in the insertion order, but still need to be checked against the filter.
+        """
+        candidates = self._get_narrowest_candidates(contact_filter)
+        if candidates is None:
+            return self._contacts.values()
+        return sorted(candidates, key=self._get_sequence_number)
+
+    def _get_sorted_candidates(self, contact_filter: ContactFilter) -> Tuple[Iterable[Contact], bool]:
+        """
+        Return the candidates of the filter and whether they are already in the order of the filter.
+        All the contacts are taken from the ordering of the sort field, unless the indexes narrow them down
+        to a small enough part of the book, which is cheaper to sort.
+        """
+        candidates = self._get_narrowest_candidates(contact_filter)
+        if candidates is not None and len(candidates) * self._ORDERED_SCAN_RATIO < len(self._contacts):
+            return sorted(candidates, key=self._get_sequence_number), False
+        return self._get_sort_index(contact_filter.sort_field).iter_sorted(contact_filter.ascending), True
+
+    def _get_sort_index(self, sort_field: ContactSort) -> SortIndex:
+        if sort_field is ContactSort.CREATED_DATE:
+            return self._created_date_index
+        if sort_field is ContactSort.UPDATED_DATE:
+            return self._updated_date_index
+        sort_index = self._sort_indexes.get(sort_field)
+        if sort_index is None:
+            sort_index = SortIndex(sort_field.property_name)
+            sort_index.add_many(
+                (contact, self._sequence_numbers[contact_id]) for contact_id, contact in self._contacts.items()
+            )
+            self._sort_indexes[sort_field] = sort_index
+        return sort_index
+
+    def build_sort_indexes(self):
+        """Build the orderings of all the sort fields now, instead of when the contacts are first sorted by them"""
+        for sort_field in ContactSort:
+            self._get_sort_index(sort_field)
+
+    def get_groups(self, name: str, key: Callable[[Contact], str], fields: Collection[str]) -> GroupIndex:
+        """
+        Return the contacts grouped by the key. The grouping is built under the name on first use
+        and is kept up to date from then on, the fields are the properties of the contacts the key depends on.
+        """
+        group_index = self._group_indexes.get(name)
+        if group_index is None:
+            group_index = GroupIndex(key, fields)
+            group_index.add_many(
+                (contact, self._sequence_numbers[contact_id]) for contact_id, contact in self._contacts.items()
+            )
+            self._group_indexes[name] = group_index
+        return group_index
+
+    def _get_narrowest_candidates(self, contact_filter: ContactFilter) -> Optional[Collection[Contact]]:
+        candidates = None
+        for narrowed in self._get_narrowed_candidates(contact_filter):
+            if candidates is None or len(narrowed) < len(candidates):
+                candidates = narrowed
+        return candidates
+
+    def _get_narrowed_candidates(self, contact_filter: ContactFilter) -> Iterator[Collection[Contact]]:
+        if contact_filter.min_created_date is not None or contact_filter.max_created_date is not None:
+            yield self._created_date_index.get_range(contact_filter.min_created_date, contact_filter.max_created_date)
+        if contact_filter.min_updated_date is not None or contact_filter.max_updated_date is not None:
+            yield self._updated_date_index.get_range(contact_filter.min_updated_date, contact_filter.max_updated_date)
+        if contact_filter.search_query is not None:
+            candidates = self._search_index.get_candidates(contact_filter.search_query)
+            if candidates is not None:
+                yield candidates
+
+    def _get_search_candidates(self, contact_filter: ContactFilter) -> Optional[Collection[Contact]]:
+        if contact_filter.search_query is None:
+            return None
+        return self._search_index.get_candidates(contact_filter.search_query)
 
     def apply(self, contact_filter: ContactFilter) -> List[Contact]:
         self.contact_filter = contact_filter
-        self.current_results = list(filter(
-            lambda contact: ContactFilter.matches(contact, self.contact_filter),
-            self.contacts))
-        self.current_results = self.sort_values(self.current_results, self.contact_filter)
+        self.current_results = self.query(contact_filter)
         return self.current_results
 
+    def query(self, contact_filter: ContactFilter, limit: Optional[int] = None, offset: int = 0) -> List[Contact]:
+        """
+        Return the contacts matching the filter in its order, skipping the first offset of them
+        and returning at most limit contacts. Unlike apply, the current results are left as they are.
+        The matching contacts are taken in order from the ordering of the sort field when possible. Otherwise,
+        with a limit only the first offset + limit contacts are selected with a heap instead of sorting them all.
+        """
+        self.check_page(limit, offset)
+        if self._columnar_index is not None:
+            contacts = self._columnar_index.apply(contact_filter, self._get_search_candidates(contact_filter))
+            if limit is None:
+                return contacts[offset:] if offset > 0 else contacts
+            return contacts[offset:offset + limit]
+        candidates, is_sorted = self._get_sorted_candidates(contact_filter)
+        matching = filter(ContactFilter.compile_predicate(contact_filter), candidates)
+        if is_sorted and limit is not None:
+            return list(itertools.islice(matching, offset, offset + limit))
+        if is_sorted:
+            contacts = list(matching)
+        elif limit is None:
+            contacts = self.sort_values(list(matching), contact_filter)
+        else:
+            return self.select_first(matching, contact_filter, offset + limit)[offset:]
+        return contacts[offset:] if offset > 0 else contacts
+
+    @staticmethod
+    def check_page(limit: Optional[int], offset: int):
+        if limit is not None and limit < 0:
+            raise InvalidInputException(f"Invalid limit {limit}, should not be negative")
+        if offset < 0:
+            raise InvalidInputException(f"Invalid offset {offset}, should not be negative")
+
+    @staticmethod
+    def select_first(contacts: Iterable[Contact], contact_filter: ContactFilter, count: int) -> List[Contact]:
+        """
+        Select the first count contacts in the order of the filter in O(n log count).
+        The result is the same as the one of sort_values cut to count, ties included.
+        """
+        key = attrgetter(contact_filter.sort_field.property_name)
+        if contact_filter.ascending:
+            return heapq.nsmallest(count, contacts, key=key)
+        return heapq.nlargest(count, contacts, key=key)
+
     def refresh_current_results(self):
         self.apply(self.contact_filter)
 
+    def _insert_current_result(self, contact: Contact):
+        self._current_results.insert(self._find_current_result_position(contact), contact)
+
+    def _insert_current_results(self, contacts: List[Contact]):
+        if len(contacts) <= self._INCREMENTAL_INSERT_LIMIT:
+            for contact in contacts:
+                self._insert_current_result(contact)
+        else:
+            # the results are already sorted and the new contacts come after them in the insertion order,
+            # so the stable sort only has to merge the two runs
+            self.current_results = self.sort_values(self._current_results + contacts, self.contact_filter)
+
+    def _remove_current_result(self, contact: Contact, old_values: Optional[Dict[str, Any]] = None):
+        position = self._find_current_result_position(contact, old_values)
+        if position < len(self._current_results) and self._current_results[position] is contact:
+            del self._current_results[position]
+
+    def _remove_current_results(self, contacts: List[Contact]):
+        if len(contacts) <= self._INCREMENTAL_INSERT_LIMIT:
+            for contact in contacts:
+                self._remove_current_result(contact)
+            return
+        removed = set(contacts)
+        self.current_results = [contact for contact in self._current_results if contact not in removed]
+
+    def _find_current_result_position(self, contact: Contact, old_values: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Binary search of the position of the contact in the current results.
+        The old values are used for the sort value, if the contact was sorted before the change.
+        """
+        property_name = self.contact_filter.sort_field.property_name
+        if old_values is not None and property_name in old_values:
+            value = old_values[property_name]
+        else:
+            value = getattr(contact, property_name)
+        sequence_number = self._get_sequence_number(contact)
+        low, high = 0, len(self._current_results)
+        while low < high:
+            middle = (low + high) // 2
+            other = self._current_results[middle]
+            if other is not contact and self._is_sorted_before(other, value, sequence_number):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _is_sorted_before(self, contact: Contact, value: Any, sequence_number: int) -> bool:
+        contact_value = getattr(contact, self.contact_filter.sort_field.property_name)
+        if contact_value == value:
+            return self._get_sequence_number(contact) < sequence_number
+        if self.contact_filter.ascending:
+            return contact_value < value
+        return contact_value > value
+
     @staticmethod
     def sort_values(contacts: List[Contact], contact_filter: 'ContactFilter') -> List[Contact]:
         if contact_filter is None:
             return contacts
 
-        # Define a sorting key function based on the sort_field enum
-        def sorting_key(one: 'Contact'):
-            key_map = {
-                ContactSort.ID: one.contact_id,
-                ContactSort.FIRST_NAME: one.first_name,
-                ContactSort.LAST_NAME: one.last_name,
-                ContactSort.PHONE_NUMBER: one.phone_number,
-                ContactSort.CREATED_DATE: one.created_date,
-                ContactSort.UPDATED_DATE: one.updated_date
-            }
-            return key_map.get(contact_filter.sort_field, one.updated_date)
-
-        # Sort the contacts based on the sorting key and the ascending flag
-        sorted_contacts = sorted(contacts, key=sorting_key, reverse=not contact_filter.ascending)
-        return sorted_contacts
+        return sorted(
+            contacts, key=attrgetter(contact_filter.sort_field.property_name), reverse=not contact_filter.ascending
+        )
 
     @classmethod
     def get_grouped_by(
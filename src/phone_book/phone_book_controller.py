@@ -1,6 +1,7 @@
 """
 This module contains the definition of the PhoneBookController entry
 """
+from contextlib import nullcontext
 from typing import Optional, Dict, Set
 
 from actions.action import ContactCreateAction, ExitAction, Action, ShowContacts, DeleteContact, UpdateFilter, \
@@ -8,10 +9,20 @@ from actions.action import ContactCreateAction, ExitAction, Action, ShowContacts
     GroupCurrentContactsByLastNameFirstLetter, ImportFromFile
 from audit import get_logger_by_name
 from exceptions.exceptions import TerminateActionLoopException, BasePhoneBookException
+from metrics import MetricsRegistry, MetricsSetup, CallProfiler
 from phone_book.phone_book import PhoneBook
 
 
 class PhoneBookController:
+    """
+    Runs the actions the user selects on the phone book.
+    The durations of the actions and of the main operations of the phone book are recorded in the metrics,
+    see MetricsSetup for dumping them and for profiling an action.
+    """
+    INSTRUMENTED_OPERATIONS = [
+        "apply", "query", "sort_values", "add_contact", "add_contacts", "delete_contact", "delete_contacts",
+        "import_from_file",
+    ]
     logger = get_logger_by_name("PhoneBookController")
     __DEFAULT_ACTIONS = [
         ShowContacts,
@@ -29,8 +40,16 @@ class PhoneBookController:
     ]
     _phone_book: PhoneBook
     __actions: Dict[str, Action]
+    _metrics: MetricsRegistry
+    _metrics_setup: MetricsSetup
+    _profiler: Optional[CallProfiler]
 
-    def __init__(self, phone_book: Optional[PhoneBook] = None, actions: Set[Action] = None):
+    def __init__(
+            self,
+            phone_book: Optional[PhoneBook] = None,
+            actions: Set[Action] = None,
+            metrics_setup: Optional[MetricsSetup] = None
+    ):
         if phone_book is None:
             phone_book = PhoneBook()
         if actions is None:
@@ -38,11 +57,37 @@ class PhoneBookController:
             self.__actions = actions
 
         self._phone_book = phone_book
+        self._metrics = MetricsRegistry()
+        self._metrics.instrument(phone_book, self.INSTRUMENTED_OPERATIONS)
+        self._metrics_setup = metrics_setup if metrics_setup is not None else MetricsSetup()
+        self._profiler = None
+        if self._metrics_setup.profiled_action is not None:
+            self._profiler = CallProfiler(self._metrics_setup.profile_directory)
 
     @property
     def phone_book(self):
         return self._phone_book
 
+    @property
+    def metrics(self) -> MetricsRegistry:
+        return self._metrics
+
+    def execute(self, action: Action):
+        """Execute the action, measuring it and profiling it if it is the profiled action"""
+        profiled = self._profiler is not None and action.name == self._metrics_setup.profiled_action
+        try:
+            with self._metrics.measure("action", action.name), \
+                    self._profiler.profile(action.name) if profiled else nullcontext():
+                action.execute(self.phone_book)
+        finally:
+            if profiled:
+                self.logger.info("Action %s profiled into %s", action.name, self._profiler.last_paths)
+            self.dump_metrics()
+
+    def dump_metrics(self):
+        if self._metrics_setup.file_path is not None:
+            self._metrics.dump(self._metrics_setup.file_path, self._metrics_setup.file_format)
+
     def show_actions(self):
         print("Actions:")
         for index, action in self.__actions.items():
@@ -61,7 +106,7 @@ class PhoneBookController:
             action = self.__actions[choice]
             print(f"Performing action {action.name}")
             try:
-                action.execute(self.phone_book)
+                self.execute(action)
             except TerminateActionLoopException:
                 self.logger.info("Exiting")
                 break
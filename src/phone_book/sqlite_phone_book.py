@@ -0,0 +1,279 @@
+"""
+This module contains the definition of the SqlitePhoneBook entry
+"""
+import itertools
+import sqlite3
+from typing import Any, Iterator, List, Optional, Tuple
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import ContactAlreadyExistsException, StorageException
+from phone_book.contact_store import to_timestamp, from_timestamp
+from phone_book.stored_phone_book import StoredPhoneBook
+
+
+class SqlitePhoneBook(StoredPhoneBook):
+    """
+    Phone book which keeps its contacts in a SQLite database.
+    The position of a contact is the autoincremented rowid of its row, so it follows the insertion order.
+    The date ranges, the sort field and the direction of a filter are translated into an indexed query,
+    and the search query is served by an FTS5 trigram table over the five text fields, if SQLite supports it.
+    The query only narrows the contacts down: the rows are still checked against the filter, so the results
+    are exactly the results of PhoneBook. The trigram table misses the matches after a NUL character,
+    so the search queries scan the contacts once a stored value or a query token contains one.
+    Every statement has a fixed text with bound parameters, so the statements are prepared once and reused
+    from the statement cache of the connection.
+    """
+    COLUMNS = "contact_id, first_name, last_name, phone_number, email, address, created_date, updated_date"
+    SORT_COLUMNS = {
+        ContactSort.ID: "contact_id",
+        ContactSort.FIRST_NAME: "first_name",
+        ContactSort.LAST_NAME: "last_name",
+        ContactSort.PHONE_NUMBER: "phone_number",
+        ContactSort.CREATED_DATE: "created_date",
+        ContactSort.UPDATED_DATE: "updated_date",
+    }
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS contacts (
+            position INTEGER PRIMARY KEY AUTOINCREMENT,
+            contact_id TEXT NOT NULL UNIQUE,
+            first_name TEXT,
+            last_name TEXT,
+            phone_number TEXT,
+            email TEXT,
+            address TEXT,
+            created_date INTEGER NOT NULL,
+            updated_date INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS contacts_first_name ON contacts (first_name, position)",
+        "CREATE INDEX IF NOT EXISTS contacts_last_name ON contacts (last_name, position)",
+        "CREATE INDEX IF NOT EXISTS contacts_phone_number ON contacts (phone_number, position)",
+        "CREATE INDEX IF NOT EXISTS contacts_created_date ON contacts (created_date, position)",
+        "CREATE INDEX IF NOT EXISTS contacts_updated_date ON contacts (updated_date, position)",
+    ]
+    SEARCH_SCHEMA = [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS contacts_search USING fts5(
+            first_name, last_name, phone_number, email, address,
+            content='contacts', content_rowid='position', tokenize='trigram'
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS contacts_search_insert AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_search (rowid, first_name, last_name, phone_number, email, address)
+            VALUES (new.position, new.first_name, new.last_name, new.phone_number, new.email, new.address);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS contacts_search_delete AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_search (contacts_search, rowid, first_name, last_name, phone_number, email, address)
+            VALUES ('delete', old.position, old.first_name, old.last_name, old.phone_number, old.email, old.address);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS contacts_search_update AFTER UPDATE ON contacts BEGIN
+            INSERT INTO contacts_search (contacts_search, rowid, first_name, last_name, phone_number, email, address)
+            VALUES ('delete', old.position, old.first_name, old.last_name, old.phone_number, old.email, old.address);
+            INSERT INTO contacts_search (rowid, first_name, last_name, phone_number, email, address)
+            VALUES (new.position, new.first_name, new.last_name, new.phone_number, new.email, new.address);
+        END
+        """,
+    ]
+    TRIGRAM_LENGTH = 3
+
+    _connection: sqlite3.Connection
+    _has_search_table: bool
+    _has_nul_values: bool
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self._has_search_table = self._create_schema()
+        self._has_nul_values = self._has_search_table and self._find_nul_values()
+        super().__init__()
+
+    @classmethod
+    def open(cls, database_path: str) -> 'SqlitePhoneBook':
+        try:
+            connection = sqlite3.connect(database_path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as exc:
+            raise StorageException(f"Failed to open contact database '{database_path}': {exc}") from exc
+        return cls(connection)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._connection
+
+    def _create_schema(self) -> bool:
+        """Create the tables if they do not exist, return whether the search table is available"""
+        try:
+            with self._connection:
+                for statement in self.SCHEMA:
+                    self._connection.execute(statement)
+        except sqlite3.Error as exc:
+            raise StorageException(f"Failed to create the contact tables: {exc}") from exc
+        try:
+            with self._connection:
+                for statement in self.SEARCH_SCHEMA:
+                    self._connection.execute(statement)
+        except sqlite3.OperationalError:
+            self.logger.warning("FTS5 trigram tables are not supported, the search queries scan the contacts")
+            return False
+        return True
+
+    def _find_nul_values(self) -> bool:
+        """Return whether a stored text field contains a NUL character, the blobs are compared byte by byte"""
+        conditions = " OR ".join(
+            f"instr(CAST({column} AS BLOB), x'00')"
+            for column in ("first_name", "last_name", "phone_number", "email", "address")
+        )
+        return bool(self._connection.execute(
+            f"SELECT EXISTS (SELECT 1 FROM contacts WHERE {conditions})"
+        ).fetchone()[0])
+
+    def _check_nul_values(self, contact: Contact):
+        if not self._has_nul_values:
+            self._has_nul_values = any(
+                value is not None and "\0" in value
+                for value in (contact.first_name, contact.last_name, contact.phone_number, contact.email,
+                              contact.address)
+            )
+
+    @staticmethod
+    def _to_row(contact: Contact) -> Tuple[Any, ...]:
+        return (
+            contact.first_name, contact.last_name, contact.phone_number, contact.email, contact.address,
+            to_timestamp(contact.created_date), to_timestamp(contact.updated_date), contact.contact_id
+        )
+
+    def _store_contacts(self, contacts: List[Contact]) -> List[int]:
+        positions = []
+        try:
+            with self._connection:
+                for contact in contacts:
+                    self._check_nul_values(contact)
+                    cursor = self._connection.execute(
+                        "INSERT INTO contacts (first_name, last_name, phone_number, email, address, created_date, "
+                        "updated_date, contact_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._to_row(contact)
+                    )
+                    positions.append(cursor.lastrowid)
+        except sqlite3.IntegrityError as exc:
+            raise ContactAlreadyExistsException(f"Contact {contact.contact_id} already exists") from exc
+        return positions
+
+    def _update_stored_contact(self, position: int, contact: Contact):
+        self._check_nul_values(contact)
+        with self._connection:
+            self._connection.execute(
+                "UPDATE contacts SET first_name = ?, last_name = ?, phone_number = ?, email = ?, address = ?, "
+                "created_date = ?, updated_date = ?, contact_id = ? WHERE position = ?",
+                self._to_row(contact) + (position,)
+            )
+
+    def _delete_stored_contact(self, position: int):
+        with self._connection:
+            self._connection.execute("DELETE FROM contacts WHERE position = ?", (position,))
+
+    def _delete_stored_contacts(self, positions: List[int]):
+        with self._connection:
+            self._connection.executemany(
+                "DELETE FROM contacts WHERE position = ?", [(position,) for position in positions]
+            )
+
+    def _clear_stored_contacts(self):
+        with self._connection:
+            self._connection.execute("DELETE FROM contacts")
+
+    def _count_stored_contacts(self) -> int:
+        return self._connection.execute("SELECT count(*) FROM contacts").fetchone()[0]
+
+    def _get_contacts_to_look_up(self, contacts: List[Contact]) -> List[Contact]:
+        """The unique constraint of the table checks the ids of the new contacts on insert"""
+        return []
+
+    def _find_stored_contact(self, contact_id: str) -> Optional[Tuple[int, Any]]:
+        row = self._connection.execute(
+            f"SELECT position, {self.COLUMNS} FROM contacts WHERE contact_id = ?", (contact_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1:]
+
+    def _iter_stored_records(self, contact_filter: Optional[ContactFilter] = None) -> Iterator[Tuple[int, Any]]:
+        return self._select_records(contact_filter, False)
+
+    def _select_records(self, contact_filter: Optional[ContactFilter], ordered: bool) -> Iterator[Tuple[int, Any]]:
+        """
+        Select the rows which may match the filter.
+        If ordered, the rows are sorted as the filter requires, with the ties in the insertion order.
+        """
+        conditions = []
+        parameters = []
+        order = "position"
+        if contact_filter is not None:
+            for column, minimum, maximum in [
+                ("created_date", contact_filter.min_created_date, contact_filter.max_created_date),
+                ("updated_date", contact_filter.min_updated_date, contact_filter.max_updated_date),
+            ]:
+                if minimum is not None:
+                    conditions.append(f"{column} >= ?")
+                    parameters.append(to_timestamp(minimum))
+                if maximum is not None:
+                    conditions.append(f"{column} <= ?")
+                    parameters.append(to_timestamp(maximum))
+            search_expression = self._get_search_expression(contact_filter.search_query)
+            if search_expression is not None:
+                conditions.append("position IN (SELECT rowid FROM contacts_search WHERE contacts_search MATCH ?)")
+                parameters.append(search_expression)
+            if ordered:
+                direction = "ASC" if contact_filter.ascending else "DESC"
+                column = self.SORT_COLUMNS.get(contact_filter.sort_field, "updated_date")
+                order = f"{column} {direction}, position"
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self._connection.execute(
+            f"SELECT position, {self.COLUMNS} FROM contacts {where} ORDER BY {order}", parameters
+        )
+        for row in cursor:
+            yield row[0], row[1:]
+
+    def _get_search_expression(self, search_query: Optional[str]) -> Optional[str]:
+        """
+        Build the full-text query which matches the rows containing any of the query tokens,
+        or return None if the tokens cannot be looked up in the trigram table.
+        The tokens have to be at least a trigram long, and only the ASCII tokens are looked up, as the case folding
+        of SQLite may differ from str.lower for the other characters. Neither the tokens nor the stored values
+        may contain a NUL character.
+        """
+        if search_query is None or not self._has_search_table or self._has_nul_values:
+            return None
+        tokens = ContactFilter.get_query_tokens(search_query)
+        if any(len(token) < self.TRIGRAM_LENGTH or not token.isascii() or "\0" in token for token in tokens):
+            return None
+        return " OR ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+
+    def _decode_stored_record(self, record: Any) -> Contact:
+        contact_id, first_name, last_name, phone_number, email, address, created_date, updated_date = record
+        return Contact.restore(
+            contact_id, first_name, last_name, phone_number, email, address,
+            from_timestamp(created_date), from_timestamp(updated_date)
+        )
+
+    def query(self, contact_filter: ContactFilter, limit: Optional[int] = None, offset: int = 0) -> List[Contact]:
+        """The rows come sorted from the database, so only the rows up to the requested page are read"""
+        self.check_page(limit, offset)
+        matches = ContactFilter.compile_predicate(contact_filter)
+        contacts = (
+            contact for contact in (
+                self._materialize(position, record)
+                for position, record in self._select_records(contact_filter, True)
+            )
+            if matches(contact)
+        )
+        return list(itertools.islice(contacts, offset, offset + limit if limit is not None else None))
+
+    def close(self):
+        self._connection.close()
@@ -0,0 +1,236 @@
+"""
+This module contains the definition of the StoredPhoneBook entry
+"""
+import abc
+import itertools
+import weakref
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+from exceptions.exceptions import ContactAlreadyExistsException, StorageException
+from phone_book.indexes import PhoneNumberIndex, GroupIndex
+from phone_book.phone_book import PhoneBook
+
+
+class StoredPhoneBook(PhoneBook, abc.ABC):
+    """
+    Phone book which keeps its contacts in a storage instead of the memory.
+    A stored contact is decoded only when it is needed, and the materialized contacts are kept in an identity map,
+    so a stored contact is represented by a single object as long as it is referenced anywhere.
+    The edits of the materialized contacts are written back to the storage.
+    Every stored contact has a position in the storage, which grows with the insertion order and is used
+    as the sequence number of the contact.
+    The current results are computed on first access, so opening a large book does not decode it.
+    """
+    _materialized: weakref.WeakValueDictionary
+    _positions: weakref.WeakKeyDictionary
+    _current_results: Optional[List[Contact]]
+
+    @abc.abstractmethod
+    def _store_contacts(self, contacts: List[Contact]) -> List[int]:
+        """Store the new contacts, either all or none of them, and return their positions"""
+
+    @abc.abstractmethod
+    def _update_stored_contact(self, position: int, contact: Contact):
+        pass
+
+    @abc.abstractmethod
+    def _delete_stored_contact(self, position: int):
+        pass
+
+    def _delete_stored_contacts(self, positions: List[int]):
+        for position in positions:
+            self._delete_stored_contact(position)
+
+    @abc.abstractmethod
+    def _clear_stored_contacts(self):
+        pass
+
+    @abc.abstractmethod
+    def _find_stored_contact(self, contact_id: str) -> Optional[Tuple[int, Any]]:
+        """Return the position and the record of the contact with the id"""
+
+    @abc.abstractmethod
+    def _iter_stored_records(self, contact_filter: Optional[ContactFilter] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Iterate over the positions and the records of the stored contacts in the insertion order.
+        If the filter is given, the records which surely do not match it may be skipped.
+        """
+
+    @abc.abstractmethod
+    def _count_stored_contacts(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def _decode_stored_record(self, record: Any) -> Contact:
+        pass
+
+    @property
+    def contacts(self) -> List[Contact]:
+        return list(self._iter_contacts())
+
+    @contacts.setter
+    def contacts(self, value: List[Contact]):
+        self._clear_contacts()
+        self._check_new_contacts(value)
+        self._register_contacts(value)
+
+    @property
+    def contact_count(self) -> int:
+        return self._count_stored_contacts()
+
+    def get_contacts_page(self, offset: int, limit: int) -> List[Contact]:
+        """Only the records of the page are decoded, the records before the offset are skipped"""
+        return [
+            self._materialize(position, record)
+            for position, record in itertools.islice(self._iter_stored_records(), offset, offset + limit)
+        ]
+
+    @property
+    def current_results(self) -> List[Contact]:
+        if self._current_results is None:
+            self.apply(self.contact_filter)
+        return self._current_results
+
+    @current_results.setter
+    def current_results(self, value: List[Contact]):
+        self._current_results = value
+
+    def refresh_current_results(self):
+        self._current_results = None
+
+    def _iter_contacts(self, contact_filter: Optional[ContactFilter] = None) -> Iterator[Contact]:
+        for position, record in self._iter_stored_records(contact_filter):
+            yield self._materialize(position, record)
+
+    def _materialize(self, position: int, record: Any) -> Contact:
+        contact = self._materialized.get(position)
+        if contact is None:
+            contact = self._decode_stored_record(record)
+            self._bind(contact, position)
+        return contact
+
+    def _bind(self, contact: Contact, position: int):
+        self._materialized[position] = contact
+        self._positions[contact] = position
+        contact.subscribe(self)
+
+    def retrieve_contacts_by_name(self, name: str) -> List[Contact]:
+        name = name.lower()
+        return [contact for contact in self._iter_contacts() if name in contact.normalized_full_name]
+
+    def retrieve_contact_by_phone(self, phone_number: str) -> List[Contact]:
+        return [contact for contact in self._iter_contacts() if phone_number in contact.phone_number]
+
+    def retrieve_contacts_by_area_code(self, area_code: str) -> List[Contact]:
+        return [
+            contact for contact in self._iter_contacts()
+            if PhoneNumberIndex.get_digits(contact.phone_number).startswith(area_code)
+        ]
+
+    def retrieve_contacts_by_id(self, contact_id: str) -> List[Contact]:
+        found = self._find_stored_contact(contact_id)
+        if found is None:
+            return []
+        return [self._materialize(*found)]
+
+    def get_candidates(self, contact_filter: ContactFilter) -> Iterable[Contact]:
+        return self._iter_contacts(contact_filter)
+
+    def get_groups(self, name: str, key: Callable[[Contact], str], fields: Collection[str]) -> GroupIndex:
+        """The stored contacts are not kept in memory, so they are grouped again on every call"""
+        group_index = GroupIndex(key, fields)
+        group_index.add_many((contact, self._positions[contact]) for contact in self._iter_contacts())
+        return group_index
+
+    def _get_sorted_candidates(self, contact_filter: ContactFilter) -> Tuple[Iterable[Contact], bool]:
+        return self.get_candidates(contact_filter), False
+
+    def build_sort_indexes(self):
+        """The stored contacts are sorted when they are queried, there are no orderings to build"""
+
+    def replace_contact(self, contact: Contact, replacement: Contact):
+        """The replacement is stored first, so a replacement which can not be stored changes nothing"""
+        self._check_replacement(contact, replacement)
+        self._update_stored_contact(self._positions[contact], replacement)
+        super().replace_contact(contact, replacement)
+
+    def _reset_indexes(self):
+        self._materialized = weakref.WeakValueDictionary()
+        self._positions = weakref.WeakKeyDictionary()
+
+    def _clear_contacts(self):
+        for contact in list(self._positions.keys()):
+            contact.unsubscribe(self)
+        self._clear_stored_contacts()
+        self._reset_indexes()
+        self._current_results = None
+
+    def _is_registered(self, contact: Contact) -> bool:
+        return contact in self._positions
+
+    def _check_new_contacts(self, contacts: List[Contact]):
+        contact_ids = set()
+        for contact in contacts:
+            if contact in self._positions or contact.contact_id in contact_ids:
+                raise ContactAlreadyExistsException(f"Contact {contact.contact_id} already exists")
+            contact_ids.add(contact.contact_id)
+        for contact in self._get_contacts_to_look_up(contacts):
+            if self._find_stored_contact(contact.contact_id) is not None:
+                raise ContactAlreadyExistsException(f"Contact {contact.contact_id} already exists")
+
+    def _get_contacts_to_look_up(self, contacts: List[Contact]) -> List[Contact]:
+        """Return the new contacts whose ids are looked up in the storage before they are added"""
+        return contacts
+
+    def _register_contacts(self, contacts: List[Contact]):
+        positions = self._store_contacts(contacts)
+        for contact, position in zip(contacts, positions):
+            self._bind(contact, position)
+
+    def _get_group_keys(self, contacts: List[Contact]) -> List[List[str]]:
+        return []
+
+    def _replace_registered_contact(self, contact: Contact, replacement: Contact, group_names: List[List[str]]):
+        contact.unsubscribe(self)
+        self._bind(replacement, self._positions.pop(contact))
+
+    def _unregister_contact(self, contact: Contact):
+        self._unregister_contacts([contact])
+
+    def _unregister_contacts(self, contacts: List[Contact]):
+        positions = []
+        for contact in contacts:
+            contact.unsubscribe(self)
+            position = self._positions.pop(contact)
+            self._materialized.pop(position, None)
+            positions.append(position)
+        self._delete_stored_contacts(positions)
+
+    def _update_indexes(self, contact: Contact, old_values: Dict[str, Any]):
+        """If the update can not be stored, e.g. a field is too long, the contact is reverted to the old values"""
+        try:
+            self._update_stored_contact(self._positions[contact], contact)
+        except StorageException:
+            contact.revert(old_values)
+            raise
+
+    def _get_sequence_number(self, contact: Contact) -> int:
+        return self._positions[contact]
+
+    def _insert_current_result(self, contact: Contact):
+        if self._current_results is not None:
+            super()._insert_current_result(contact)
+
+    def _insert_current_results(self, contacts: List[Contact]):
+        if self._current_results is not None:
+            super()._insert_current_results(contacts)
+
+    def _remove_current_result(self, contact: Contact, old_values: Optional[Dict[str, Any]] = None):
+        if self._current_results is not None:
+            super()._remove_current_result(contact, old_values)
+
+    def _remove_current_results(self, contacts: List[Contact]):
+        if self._current_results is not None:
+            super()._remove_current_results(contacts)
@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+import sys
+
+from api.server import ContactServer
+from main import add_phone_book_arguments, close_phone_book, open_phone_book
+from phone_book.phone_book import PhoneBook
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Phonebook JSON API Server")
+    add_phone_book_arguments(parser)
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on, 0 picks a free port")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=60.0, help="Seconds after which an idle keep-alive connection is closed"
+    )
+    parser.add_argument("--backlog", type=int, default=4096, help="Number of pending connections the socket queues")
+
+    args = parser.parse_args()
+
+    phone_book = open_phone_book(args)
+    server = ContactServer(phone_book, args.host, args.port, args.idle_timeout, args.backlog)
+    try:
+        asyncio.run(serve(server, phone_book))
+    except KeyboardInterrupt:
+        print("Server stopped", file=sys.stderr)
+
+
+async def serve(server: ContactServer, phone_book: PhoneBook):
+    await server.start()
+    print(f"Serving {phone_book.contact_count} contacts on http://{server.host}:{server.port}", file=sys.stderr)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        close_phone_book(phone_book)
+
+
+if __name__ == "__main__":
+    main()
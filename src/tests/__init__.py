@@ -0,0 +1,9 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# The loggers are created when the modules are imported, so the test logs are redirected before any import
+LOG_DIRECTORY = tempfile.mkdtemp(prefix="phonebook-test-logs-")
+os.environ["PHONEBOOK_LOG_DIRECTORY"] = LOG_DIRECTORY
+atexit.register(shutil.rmtree, LOG_DIRECTORY, ignore_errors=True)
@@ -1,7 +1,11 @@
+import io
 import unittest
-from unittest.mock import patch
+from contextlib import redirect_stdout
+from unittest.mock import patch, PropertyMock
 
-from actions.action import ContactCreateAction, ExitAction
+from actions.action import ContactCreateAction, ExitAction, ShowContacts, ShowCurrentContacts, \
+    GroupByLastNameFirstLetter
+from contacts.contact import Contact
 from exceptions.exceptions import TerminateActionLoopException
 from phone_book.phone_book import PhoneBook
 
@@ -18,3 +22,39 @@ class TestAction(unittest.TestCase):
         action = ExitAction()
         with self.assertRaises(TerminateActionLoopException):
             action.execute(PhoneBook())
+
+    def test_show_current_contacts_pages(self):
+        contacts = [Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(5)]
+        phone_book = PhoneBook(contacts)
+        action = ShowCurrentContacts()
+        action.page_size = 2
+        output = io.StringIO()
+        with patch("builtins.input", side_effect=["n", "n", "n", "p", "q"]), redirect_stdout(output):
+            action.execute(phone_book)
+        pages = [line for line in output.getvalue().splitlines() if line.startswith("Page ")]
+        self.assertEqual(pages, ["Page 1 of 3", "Page 2 of 3", "Page 3 of 3", "Page 3 of 3", "Page 2 of 3"])
+        self.assertIn(contacts[4].contact_id, output.getvalue())
+
+    def test_show_contacts_pages(self):
+        contacts = [Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(5)]
+        action = ShowContacts()
+        action.page_size = 2
+        output = io.StringIO()
+        with patch("builtins.input", side_effect=["n", "q"]), redirect_stdout(output), \
+                patch.object(PhoneBook, "contacts", new_callable=PropertyMock, side_effect=AssertionError):
+            action.execute(PhoneBook(contacts))
+        pages = [line for line in output.getvalue().splitlines() if line.startswith("Page ")]
+        self.assertEqual(pages, ["Page 1 of 3", "Page 2 of 3"])
+        self.assertIn(contacts[3].contact_id, output.getvalue())
+        self.assertNotIn(contacts[4].contact_id, output.getvalue())
+
+    def test_group_by_last_name_first_letter(self):
+        contacts = [Contact("John", last_name, "(123) 456-7890") for last_name in ["Smith", "Doe", "Stone"]]
+        phone_book = PhoneBook(contacts)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            GroupByLastNameFirstLetter().execute(phone_book)
+            contacts[1].last_name = "Smith"
+            GroupByLastNameFirstLetter().execute(phone_book)
+        groups = [line for line in output.getvalue().splitlines() if line.startswith("Group Name: ")]
+        self.assertEqual(groups, ["Group Name: D", "Group Name: S", "Group Name: S"])
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from api.contact_api import ContactApi, get_error_response
+from api.http_protocol import HttpRequest, encode_request, read_response
+from api.server import ContactServer
+from benchmarks.generator import ContactDataGenerator
+from benchmarks.api_load import LoadClient, run_load_test
+from contacts.filter import ContactFilter
+from exceptions.exceptions import StorageException, ValueTooLongException
+from phone_book.mapped_phone_book import MappedPhoneBook
+from phone_book.phone_book import PhoneBook
+
+
+class TestContactApi(unittest.TestCase):
+    def setUp(self):
+        self.contacts = ContactDataGenerator().create_contacts(200)
+        self.phone_book = PhoneBook(list(self.contacts))
+        self.api = ContactApi(self.phone_book)
+
+    def test_search_pages(self):
+        status, body = self.api.handle(HttpRequest("GET", "/contacts", {
+            "search": "smith", "sort": "first_name", "descending": "true", "limit": "5", "offset": "2"
+        }))
+        self.assertEqual(status, 200)
+        expected = sorted(
+            (contact for contact in self.contacts if contact.last_name == "Smith"),
+            key=lambda contact: contact.first_name, reverse=True
+        )[2:7]
+        self.assertEqual([contact["id"] for contact in body["contacts"]], [contact.contact_id for contact in expected])
+        status, body = self.api.handle(HttpRequest("GET", "/contacts", {"min_created": "2023-01-01T00:01:00"}))
+        self.assertEqual(len(body["contacts"]), ContactApi.DEFAULT_LIMIT)
+        self.assertIs(self.phone_book.contact_filter.search_query, None)
+        self.assertEqual(len(self.phone_book.current_results), len(self.contacts))
+
+    def test_invalid_requests(self):
+        for request, expected_status in [
+            (HttpRequest("GET", "/contacts", {"limit": "-1"}), 400),
+            (HttpRequest("GET", "/contacts", {"offset": "\u00b2"}), 400),
+            (HttpRequest("GET", "/contacts", {"sort": "age"}), 400),
+            (HttpRequest("GET", "/contacts", {"max_updated": "yesterday"}), 400),
+            (HttpRequest("GET", "/contacts", {"min_created": "2023-01-01T00:00:00+00:00"}), 400),
+            (HttpRequest("GET", "/contacts/missing"), 404),
+            (HttpRequest("GET", "/groups"), 404),
+            (HttpRequest("PUT", "/contacts"), 405),
+            (HttpRequest("POST", "/contacts", body=b"[1]"), 400),
+            (HttpRequest("POST", "/contacts", body=b'{"first_name": "John", "age": 3}'), 400),
+            (HttpRequest("POST", "/contacts", body=b'{"first_name": "John", "phone_number": "1"}'), 400),
+        ]:
+            with self.subTest(method=request.method, path=request.path, query=request.query):
+                status, body = self.api.handle(request)
+                self.assertEqual(status, expected_status)
+                self.assertIn("error", body)
+        self.assertEqual(self.phone_book.contact_count, len(self.contacts))
+
+    def test_error_status_of_subclasses(self):
+        self.assertEqual(get_error_response(ValueTooLongException("too long"))[0], 400)
+        self.assertEqual(get_error_response(StorageException("disk full"))[0], 500)
+        with tempfile.TemporaryDirectory() as directory:
+            phone_book = MappedPhoneBook.open(os.path.join(directory, "contacts.db"))
+            status, _ = ContactApi(phone_book).handle(HttpRequest("POST", "/contacts", body=json.dumps({
+                "first_name": "John", "last_name": "Doe", "phone_number": "(123) 456-7890", "address": "x" * 300
+            }).encode()))
+            self.assertEqual((status, phone_book.contact_count), (400, 0))
+            phone_book.close()
+
+    def test_edit_is_validated_first(self):
+        contact = self.contacts[0]
+        old_phone_number = contact.phone_number
+        status, _ = self.api.handle(HttpRequest(
+            "PATCH", f"/contacts/{contact.contact_id}", body=b'{"phone_number": "(111) 222-3333", "email": "bad"}'
+        ))
+        self.assertEqual(status, 400)
+        self.assertEqual(contact.phone_number, old_phone_number)
+
+
+class TestContactServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.phone_book = PhoneBook(ContactDataGenerator().create_contacts(300))
+        self.server = ContactServer(self.phone_book, port=0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def connect(self) -> LoadClient:
+        return LoadClient(*await asyncio.open_connection(self.server.host, self.server.port), self.server.host)
+
+    async def test_contact_lifecycle(self):
+        client = await self.connect()
+        status, created = await client.send("POST", "/contacts", {
+            "first_name": "Zelda", "last_name": "Quartz", "phone_number": "(123) 456-7890", "email": "zq@example.com"
+        })
+        self.assertEqual(status, 201)
+        target = f"/contacts/{created['id']}"
+        status, edited = await client.send("PATCH", target, {"address": "1 Main St", "email": None})
+        self.assertEqual((status, edited["address"], edited["email"]), (200, "1 Main St", None))
+        status, body = await client.send("GET", "/contacts?search=zelda%20quartz")
+        self.assertEqual([contact["id"] for contact in body["contacts"]], [created["id"]])
+        self.assertEqual((await client.send("DELETE", target))[0], 204)
+        self.assertEqual((await client.send("GET", target))[0], 404)
+        self.assertEqual(self.phone_book.contact_count, 300)
+        client.close()
+
+    async def test_pipelined_requests_and_errors(self):
+        client = await self.connect()
+        client.writer.write(encode_request("GET", "/contacts?limit=1") + encode_request("GET", "/contacts?limit=2"))
+        self.assertEqual(len((await read_response(client.reader))[1]["contacts"]), 1)
+        self.assertEqual(len((await read_response(client.reader))[1]["contacts"]), 2)
+        client.writer.write(b"POST /contacts HTTP/1.1\r\nContent-Length: \xb2\r\n\r\n")
+        self.assertEqual((await read_response(client.reader))[0], 400)
+        self.assertEqual(await client.reader.read(), b"")
+        client.close()
+        client = await self.connect()
+        client.writer.write(b"NOT HTTP\r\n\r\n")
+        self.assertEqual((await read_response(client.reader))[0], 400)
+        self.assertEqual(await client.reader.read(), b"")
+        client.close()
+
+    async def test_concurrent_keep_alive_connections(self):
+        clients = [await self.connect() for _ in range(100)]
+        responses = await asyncio.gather(*(client.send("GET", "/contacts?search=son&limit=3") for client in clients))
+        self.assertEqual({status for status, _ in responses}, {200})
+        self.assertEqual(self.server.connection_count, 100)
+        for client in clients:
+            client.close()
+        self.assertEqual(self.phone_book.contact_filter.search_query, ContactFilter.search_query)
+
+    async def test_load_test(self):
+        result = await run_load_test(self.server.host, self.server.port, connections=50, requests_per_connection=5)
+        self.assertEqual((result.result.operations, result.errors, result.status_counts), (250, 0, {200: 250}))
+        self.assertLessEqual(result.result.latency_p50, result.result.latency_max)
+
+
+if __name__ == '__main__':
+    unittest.main()
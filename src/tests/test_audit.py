@@ -0,0 +1,64 @@
+import logging
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from audit import LoggingSetup, get_logger, collapse_logs, AuditLogger, BatchingRotatingFileHandler
+
+
+class TestAudit(unittest.TestCase):
+    def setUp(self):
+        self.log_directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.log_directory)
+
+    def create_logger(self, name: str, asynchronous: bool) -> AuditLogger:
+        logger = get_logger(LoggingSetup(
+            name=name, log_directory=self.log_directory, asynchronous=asynchronous, batch_size=4
+        ))
+        self.assertIsInstance(logger, AuditLogger)
+        return logger
+
+    def read_log(self, logger: logging.Logger) -> str:
+        return self.log_directory.joinpath(logger.name.lower() + ".log").read_text(encoding="utf-8")
+
+    def test_asynchronous_logging(self):
+        logger = self.create_logger("AsynchronousTestLogger", asynchronous=True)
+        for index in range(10):
+            logger.info("Record %d", index)
+        logger.flush_handlers()
+        lines = self.read_log(logger).splitlines()
+        self.assertEqual(len(lines), 10)
+        self.assertTrue(lines[9].endswith("INFO - Record 9"))
+
+    def test_batch_rollover(self):
+        file_path = self.log_directory.joinpath("rollover.log")
+        handler = BatchingRotatingFileHandler(file_path, batch_size=10, maxBytes=100, backupCount=5)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for message in ["a" * 150, "b" * 39, "c" * 39, "d" * 39]:
+            handler.emit(logging.makeLogRecord({"msg": message}))
+        handler.close()
+        contents = [
+            self.log_directory.joinpath(name).read_text(encoding="utf-8").split()
+            for name in ["rollover.log.2", "rollover.log.1", "rollover.log"]
+        ]
+        self.assertEqual(contents, [["a" * 150], ["b" * 39, "c" * 39], ["d" * 39]])
+        self.assertFalse(self.log_directory.joinpath("rollover.log.3").exists())
+
+    def test_collapse_logs(self):
+        logger = self.create_logger("CollapsedTestLogger", asynchronous=False)
+        with collapse_logs(logger, "Import"):
+            for index in range(1000):
+                logger.info("Contact %d created", index)
+            logger.info("Done")
+            logger.warning("Something is off")
+        logger.info("After the import")
+        lines = self.read_log(logger).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].endswith("WARNING - Something is off"))
+        self.assertTrue(lines[1].endswith(
+            "INFO - Import collapsed 1001 records: 1000 x 'Contact %d created'; 1 x 'Done'"
+        ))
+        self.assertTrue(lines[2].endswith("INFO - After the import"))
@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from unittest.mock import patch
+
+from benchmarks.generator import ContactDataGenerator
+from commands.batch import create_filter, delete_contacts, export_contacts, get_stats, query_contacts
+from contacts.filter import ContactSort
+from exceptions.exceptions import InvalidInputException
+from main import main
+from phone_book.phone_book import PhoneBook
+
+
+class TestBatchCommands(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.contacts = ContactDataGenerator().create_contacts(300)
+        self.phone_book = PhoneBook(list(self.contacts))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_query(self):
+        contact_filter = create_filter("smith", sort_field=ContactSort.FIRST_NAME, ascending=False)
+        output = io.StringIO()
+        contacts = query_contacts(self.phone_book, contact_filter, 3, 1, output_format="csv", output=output)
+        expected = sorted(
+            (contact for contact in self.contacts if contact.last_name == "Smith"),
+            key=lambda contact: contact.first_name, reverse=True
+        )[1:4]
+        self.assertEqual(contacts, expected)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith(expected[0].contact_id))
+        redirected = io.StringIO()
+        with redirect_stdout(redirected):
+            query_contacts(self.phone_book, contact_filter, 3, 1, output_format="csv")
+        self.assertEqual(redirected.getvalue(), output.getvalue())
+
+    def test_export_is_imported_again(self):
+        file_path = os.path.join(self.directory, "export.csv")
+        contact_filter = create_filter(sort_field=ContactSort.LAST_NAME)
+        self.assertEqual(export_contacts(self.phone_book, contact_filter, file_path), len(self.contacts))
+        imported = PhoneBook.from_file(file_path)
+        def get_values(contacts):
+            return [(contact.full_name, contact.phone_number, contact.email, contact.address) for contact in contacts]
+        self.assertEqual(get_values(imported.contacts), get_values(self.phone_book.query(contact_filter)))
+        self.assertTrue(any(contact.email is None for contact in imported.contacts))
+
+    def test_delete(self):
+        with self.assertRaises(InvalidInputException):
+            delete_contacts(self.phone_book, create_filter(sort_field=ContactSort.LAST_NAME))
+        matching_count = len(self.phone_book.query(create_filter("son")))
+        self.assertEqual(delete_contacts(self.phone_book, create_filter("son")), matching_count)
+        self.assertEqual(self.phone_book.contact_count, len(self.contacts) - matching_count)
+        self.assertEqual(self.phone_book.query(create_filter("son")), [])
+        self.assertEqual(delete_contacts(self.phone_book, create_filter(), delete_all=True),
+                         len(self.contacts) - matching_count)
+        self.assertEqual(self.phone_book.contact_count, 0)
+
+    def test_stats(self):
+        stats = get_stats(self.phone_book)
+        self.assertEqual(stats["contacts"], len(self.contacts))
+        first_created_date = min(contact.created_date for contact in self.contacts)
+        last_updated_date = max(contact.updated_date for contact in self.contacts)
+        self.assertEqual(stats["first_created_date"], first_created_date.isoformat())
+        self.assertEqual(stats["last_updated_date"], last_updated_date.isoformat())
+        self.assertEqual(sum(stats["last_name_first_letters"].values()), len(self.contacts))
+        self.assertIsNone(get_stats(PhoneBook())["first_created_date"])
+
+    def test_main_runs_script(self):
+        csv_path = ContactDataGenerator().write_csv(os.path.join(self.directory, "contacts.csv"), 100)
+        export_path = os.path.join(self.directory, "export.csv")
+        script_path = os.path.join(self.directory, "script.txt")
+        with open(script_path, mode="w", encoding="utf-8") as script_file:
+            script_file.write(f"import '{csv_path}'\n\n# keep the contacts without Smiths\ndelete --search smith\n"
+                              f"export '{export_path}'\nstats --format json\n")
+        store_path = os.path.join(self.directory, "store")
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["--store-path", store_path, "script", script_path]), 0)
+        stats = json.loads(output.getvalue()[output.getvalue().index("{"):])
+        smith_count = sum(row[1] == "Smith" for row in ContactDataGenerator().iter_rows(100))
+        self.assertEqual(stats["contacts"], 100 - smith_count)
+        self.assertEqual(PhoneBook.from_file(export_path).contact_count, 100 - smith_count)
+
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["--store-path", store_path, "delete"]), 1)
+            self.assertEqual(main(["--store-path", store_path, "delete", "--all"]), 0)
+            self.assertEqual(main(["--store-path", store_path, "stats"]), 0)
+
+    def test_dates_with_timezone_offset_are_rejected(self):
+        store_path = os.path.join(self.directory, "store")
+        error = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(error), self.assertRaises(SystemExit):
+            main(["--store-path", store_path, "query", "--min-created", "2023-01-01T00:00:00+00:00"])
+        self.assertIn("timezone offset", error.getvalue())
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["--store-path", store_path, "query", "--min-created", "2023-01-01T00:00:00"]), 0)
+
+    def test_interactive_run_closes_phone_book(self):
+        with patch("main.PhoneBookController.run", side_effect=KeyboardInterrupt), \
+                patch("main.close_phone_book") as close_phone_book, redirect_stderr(io.StringIO()):
+            with self.assertRaises(KeyboardInterrupt):
+                main(["--store-path", os.path.join(self.directory, "store")])
+        close_phone_book.assert_called_once()
+
+    def test_stats_with_empty_last_name(self):
+        csv_path = os.path.join(self.directory, "contacts.csv")
+        with open(csv_path, mode="w", encoding="utf-8") as csv_file:
+            csv_file.write("First Name,Last Name,Phone Number,Email,Address\nJohn,Doe,(123) 456-7890,,\n"
+                           "Jane,,(123) 456-7891,,\n")
+        store_path = os.path.join(self.directory, "store")
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(io.StringIO()):
+            arguments = ["--store-path", store_path, "--file-path", csv_path, "stats", "--format", "json"]
+            self.assertEqual(main(arguments), 0)
+        stats = json.loads(output.getvalue()[output.getvalue().index("{"):])
+        self.assertEqual(stats["last_name_first_letters"], {"": 1, "D": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks.generator import ContactDataGenerator
+from benchmarks.report import compare_results, read_results, write_results
+from benchmarks.suite import SCENARIOS, BenchmarkResult, get_percentile, iter_benchmark_results
+from phone_book.phone_book import PhoneBook
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_generator_is_deterministic(self):
+        generator = ContactDataGenerator(7)
+        self.assertEqual(list(generator.iter_rows(50)), list(ContactDataGenerator(7).iter_rows(50)))
+        self.assertNotEqual(list(generator.iter_rows(50)), list(ContactDataGenerator(8).iter_rows(50)))
+        first, second = generator.create_contacts(20), generator.create_contacts(20)
+        self.assertEqual(
+            [(contact.contact_id, contact.full_name, contact.created_date) for contact in first],
+            [(contact.contact_id, contact.full_name, contact.created_date) for contact in second]
+        )
+
+    def test_generated_csv_is_imported(self):
+        file_path = ContactDataGenerator().write_csv(os.path.join(self.directory, "contacts.csv"), 100)
+        phone_book = PhoneBook.from_file(file_path)
+        self.assertEqual(
+            [(contact.full_name, contact.email) for contact in phone_book.contacts],
+            [(f"{row[0]} {row[1]}", row[3]) for row in ContactDataGenerator().iter_rows(100)]
+        )
+
+    def test_all_scenarios_run(self):
+        results = list(iter_benchmark_results([200], SCENARIOS, self.directory, repeat=1, measure_memory=False))
+        self.assertEqual([result.scenario for result in results], list(SCENARIOS))
+        for result in results:
+            with self.subTest(scenario=result.scenario):
+                self.assertGreater(result.operations, 0)
+                self.assertLessEqual(result.latency_p50, result.latency_max)
+        memory_result = next(iter_benchmark_results([200], ["bulk_delete"], self.directory, repeat=1))
+        self.assertGreater(memory_result.peak_memory_bytes, 0)
+
+    def test_compare_with_baseline(self):
+        baseline = [
+            BenchmarkResult.from_latencies("search", 1000, 4, [0.1, 0.2, 0.3, 0.4]),
+            BenchmarkResult.from_latencies("import", 1000, 1000, [1.0]),
+        ]
+        file_path = os.path.join(self.directory, "baseline.json")
+        write_results(file_path, baseline, {"seed": 1})
+        self.assertEqual(read_results(file_path), baseline)
+        results = [
+            BenchmarkResult.from_latencies("search", 1000, 4, [0.3, 0.3, 0.3, 0.3]),
+            BenchmarkResult.from_latencies("import", 1000, 1000, [1.1]),
+            BenchmarkResult.from_latencies("import", 10000, 10000, [10.0]),
+        ]
+        comparisons = compare_results(results, read_results(file_path), max_regression=0.2)
+        self.assertEqual([(comparison.scenario, comparison.is_regression) for comparison in comparisons],
+                         [("search", True), ("import", False)])
+
+    def test_get_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual([get_percentile(values, percent) for percent in [50, 90, 99, 100]], [50.0, 90.0, 99.0, 100.0])
+        self.assertEqual(get_percentile([3.0], 99), 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import datetime
+import random
+import unittest
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from phone_book.columnar_index import ColumnarContactIndex
+from phone_book.phone_book import PhoneBook
+
+
+@unittest.skipUnless(ColumnarContactIndex.is_available(), "NumPy is not installed")
+class TestColumnarContactIndex(unittest.TestCase):
+    def setUp(self):
+        generator = random.Random(13)
+        base_date = datetime.datetime(2023, 1, 1)
+        contacts = []
+        for index in range(1500):
+            created_date = base_date + datetime.timedelta(minutes=generator.randrange(100))
+            contacts.append(Contact.restore(
+                f"00000000-0000-4000-8000-{index:012d}", generator.choice(["Ann", "Bob", "Cid", "Ännä", "Bob\0"]),
+                generator.choice(["Lee", "Doe", "Smith"]), f"({generator.randrange(100, 103)}) 555-0000",
+                None, None, created_date, created_date + datetime.timedelta(minutes=generator.randrange(100))
+            ))
+        self.base_date = base_date
+        self.phone_book = PhoneBook(contacts)
+        self.vectorized = PhoneBook(
+            [
+                Contact.restore(
+                    contact.contact_id, contact.first_name, contact.last_name, contact.phone_number, None, None,
+                    contact.created_date, contact.updated_date
+                )
+                for contact in contacts
+            ],
+            vectorized=True
+        )
+
+    def get_filters(self):
+        filters = []
+        for sort_field in ContactSort:
+            for ascending in [True, False]:
+                contact_filter = ContactFilter()
+                contact_filter.sort_field = sort_field
+                contact_filter.ascending = ascending
+                filters.append(contact_filter)
+        filters[1].search_query = "lee 101"
+        filters[2].min_created_date = self.base_date + datetime.timedelta(minutes=30)
+        filters[3].max_updated_date = self.base_date + datetime.timedelta(minutes=80)
+        filters[4].min_updated_date = self.base_date + datetime.timedelta(minutes=50)
+        filters[4].search_query = "nn"
+        return filters
+
+    def assert_same_results(self):
+        for contact_filter in self.get_filters():
+            with self.subTest(contact_filter=str(contact_filter), sort_field=contact_filter.sort_field):
+                self.assertEqual(
+                    [contact.contact_id for contact in self.vectorized.apply(contact_filter)],
+                    [contact.contact_id for contact in self.phone_book.apply(contact_filter)]
+                )
+
+    def test_same_results_as_python(self):
+        self.assert_same_results()
+
+    def test_same_results_after_changes(self):
+        self.assert_same_results()
+        for phone_book in [self.phone_book, self.vectorized]:
+            contacts = phone_book.contacts
+            for contact in contacts[:1000:3]:
+                phone_book.delete_contact(contact)
+            for contact in contacts[1000::7]:
+                contact.first_name = "Zoe the longest first name"
+            phone_book.add_contacts([
+                Contact.restore(
+                    f"00000000-0000-4000-9000-{index:012d}", "Ann", "Lee", "(101) 555-0000", None, None,
+                    self.base_date, self.base_date
+                )
+                for index in range(10)
+            ])
+        self.assert_same_results()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import threading
+import unittest
+
+from benchmarks.generator import ContactDataGenerator
+from commands.batch import create_filter
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import InvalidActionException, InvalidEmailException, InvalidInputException, \
+    NoContactsMatchedException
+from phone_book.concurrent_phone_book import ConcurrentPhoneBook
+from phone_book.phone_book import PhoneBook
+
+
+class TestConcurrentPhoneBook(unittest.TestCase):
+    def setUp(self):
+        self.contacts = ContactDataGenerator().create_contacts(100)
+        self.phone_book = ConcurrentPhoneBook(self.contacts)
+
+    def test_queries_match_phone_book(self):
+        phone_book = PhoneBook(list(self.contacts))
+        for contact_filter in [
+            ContactFilter(),
+            create_filter("son", sort_field=ContactSort.FIRST_NAME, ascending=False),
+        ]:
+            with self.subTest(contact_filter=contact_filter):
+                self.assertEqual(
+                    [contact.contact_id for contact in self.phone_book.query(contact_filter, 10, 5)],
+                    [contact.contact_id for contact in phone_book.query(contact_filter, 10, 5)]
+                )
+
+    def test_add_edit_delete(self):
+        contact = Contact("Zelda", "Quartz", "(123) 456-7890")
+        added = self.phone_book.add_contact(contact)
+        self.assertIsNot(added, contact)
+        self.assertEqual(self.phone_book.contact_count, 101)
+        edited = self.phone_book.edit_contact(contact.contact_id, {"address": "1 Main St", "email": None})
+        self.assertEqual((edited.address, added.address), ("1 Main St", None))
+        self.assertEqual(self.phone_book.retrieve_contacts_by_id(contact.contact_id), [edited])
+        self.assertEqual(self.phone_book.delete_contacts([contact, self.contacts[0]]), 2)
+        self.assertEqual(self.phone_book.contact_count, 99)
+        self.assertEqual(self.phone_book.version, 3)
+        with self.assertRaises(NoContactsMatchedException):
+            self.phone_book.delete_contacts_by_id(contact.contact_id)
+
+    def test_edit_keeps_insertion_order(self):
+        contact_ids = [contact.contact_id for contact in self.contacts]
+        with self.assertLogs(ConcurrentPhoneBook.logger, level="INFO") as logs:
+            self.phone_book.edit_contact(contact_ids[0], {"first_name": "Zelda"})
+        self.assertEqual(len(logs.output), 1)
+        for _ in range(2):
+            self.assertEqual([contact.contact_id for contact in self.phone_book.contacts], contact_ids)
+            self.assertEqual(self.phone_book.contacts[0].first_name, "Zelda")
+            self.phone_book.edit_contact(contact_ids[1], {"address": "1 Main St"})
+
+    def test_invalid_edits_change_nothing(self):
+        contact_id = self.contacts[0].contact_id
+        with self.assertRaises(InvalidEmailException):
+            self.phone_book.edit_contact(contact_id, {"phone_number": "(111) 222-3333", "email": "bad"})
+        with self.assertRaises(InvalidInputException):
+            self.phone_book.edit_contact(contact_id, {"age": "3"})
+        self.assertEqual(self.phone_book.retrieve_contacts_by_id(contact_id)[0].phone_number,
+                         self.contacts[0].phone_number)
+        self.assertEqual(self.phone_book.version, 0)
+
+    def test_write_inside_snapshot_fails(self):
+        with self.phone_book.snapshot():
+            with self.assertRaises(InvalidActionException):
+                self.phone_book.delete_contacts_by_id(self.contacts[0].contact_id)
+        self.assertEqual(self.phone_book.contact_count, 100)
+
+    def test_snapshot_does_not_change(self):
+        snapshot_open = threading.Event()
+        write_done = threading.Event()
+        writer = threading.Thread(target=lambda: (
+            snapshot_open.wait(), self.phone_book.delete_contacts(self.contacts[:10]), write_done.set()
+        ))
+        writer.start()
+        with self.phone_book.snapshot() as snapshot:
+            snapshot_open.set()
+            self.assertFalse(write_done.wait(0.2))
+            self.assertEqual(snapshot.contact_count, 100)
+            self.assertEqual(self.phone_book.contact_count, 100)
+        writer.join()
+        self.assertEqual(self.phone_book.contact_count, 90)
+
+    def test_readers_and_writers(self):
+        errors = []
+
+        def read():
+            for _ in range(200):
+                with self.phone_book.snapshot() as snapshot:
+                    count = snapshot.contact_count
+                    results = snapshot.query(create_filter(sort_field=ContactSort.LAST_NAME))
+                    if len(results) != count or len(snapshot.contacts) != count:
+                        errors.append(count)
+
+        def write(contacts):
+            for contact in contacts:
+                self.phone_book.add_contact(contact)
+                self.phone_book.edit_contact(contact.contact_id, {"address": "1 Main St"})
+                self.phone_book.delete_contacts_by_id(contact.contact_id)
+
+        new_contacts = ContactDataGenerator(seed=7).create_contacts(40)
+        threads = [threading.Thread(target=read) for _ in range(4)] + [
+            threading.Thread(target=write, args=(new_contacts[index::2],)) for index in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.phone_book.version, 120)
+        self.assertEqual(
+            sorted(contact.contact_id for contact in self.phone_book.contacts),
+            sorted(contact.contact_id for contact in self.contacts)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,17 @@
 """
 Tests for Contact class
 """
+import csv
+import os
+import shutil
+import tempfile
+import tracemalloc
 import unittest
 from datetime import datetime
 
 from contacts.contact import Contact
-from exceptions.exceptions import InvalidPhoneNumberException, InvalidEmailException
+from contacts.contact_import import RejectedRowsWriter
+from exceptions.exceptions import InvalidPhoneNumberException, InvalidEmailException, ImportFailedException
 
 
 class TestContact(unittest.TestCase):
@@ -56,6 +62,38 @@ class TestContact(unittest.TestCase):
         self.assertEqual(self.contact.address, "456 Elm St")
         self.assertGreater(self.contact.updated_date, self.contact.created_date)
 
+    def test_search_keys_follow_changes(self):
+        self.assertEqual(self.contact.normalized_full_name, "john doe")
+        self.assertEqual(
+            self.contact.search_haystack, "john\x00doe\x00(123) 456-7890\x00john@example.com\x00123 main st"
+        )
+        self.contact.last_name = "SMITH"
+        self.contact.email = None
+        self.contact.address = "456 Elm St"
+        self.assertEqual(self.contact.normalized_full_name, "john smith")
+        self.assertEqual(
+            self.contact.normalized_fields, ("john", "smith", "(123) 456-7890", None, "456 elm st")
+        )
+        self.assertEqual(self.contact.search_haystack, "john\x00smith\x00(123) 456-7890\x00456 elm st")
+
+    def test_contact_is_compact(self):
+        self.assertFalse(hasattr(self.contact, "__dict__"))
+        contact_count = 1000
+        tracemalloc.start()
+        try:
+            Contact.logger.disabled = True
+            start = tracemalloc.get_traced_memory()[0]
+            contacts = [
+                Contact("John", f"Doe{index % 10}", "(123) 456-7890", f"john{index}@example.com", f"{index} Main St")
+                for index in range(contact_count)
+            ]
+            used = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            Contact.logger.disabled = False
+            tracemalloc.stop()
+        self.assertEqual(len(contacts), contact_count)
+        self.assertLess(used / contact_count, 512)
+
     def test_contact_invalid_phone_number(self):
         invalid_phone_numbers = [
             "123-456-7890",  # Missing parentheses
@@ -133,3 +171,48 @@ class TestEmailPattern(unittest.TestCase):
             with self.subTest(email=email):
                 with self.assertRaises(InvalidEmailException):
                     Contact.validate_email(email)
+
+
+class TestCsvImport(unittest.TestCase):
+    CSV_CONTENT = (
+        "First Name,Last Name,Phone Number,Email,Address\n"
+        "John,Smith,(123) 456-7890,john.smith@example.com,123 Main St\n"
+        "Alice,Johnson,123-456-7890,alice.johnson@example.com,456 Elm St\n"
+        "Michael,Williams,(555) 123-7890,michael.williams@example.com,789 Oak St\n"
+        "Emily,Jones,(333) 555-7777,not-an-email,101 Pine St\n"
+        "Sam,Lee,(444) 555-6666,sam.lee@example.com,\"1 Long St\nSpringfield\"\n"
+    )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "contacts.csv")
+        self.reject_file_path = os.path.join(self.directory, "rejects.csv")
+        with open(self.file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+            csv_file.write(self.CSV_CONTENT)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_iter_contacts_in_chunks(self):
+        with RejectedRowsWriter(self.reject_file_path) as rejects:
+            chunks = list(Contact.iter_contacts_from_csv(self.file_path, chunk_size=2, rejects=rejects))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual([contact.first_name for contact in chunks[0] + chunks[1]], ["John", "Michael", "Sam"])
+        self.assertEqual(chunks[1][0].address, "1 Long St\nSpringfield")
+        self.assertEqual(rejects.rejected_count, 2)
+
+        with open(self.reject_file_path, newline="", encoding="utf-8") as reject_file:
+            rejected_rows = list(csv.DictReader(reject_file))
+        self.assertEqual([row["Line Number"] for row in rejected_rows], ["3", "5"])
+        self.assertEqual([row["First Name"] for row in rejected_rows], ["Alice", "Emily"])
+        self.assertIn("should be of the form", rejected_rows[0]["Reason"])
+        self.assertEqual(rejected_rows[1]["Reason"], "Invalid email")
+
+    def test_import_fails_without_rejects(self):
+        with self.assertRaises(ImportFailedException):
+            Contact.bulk_create_contacts_from_csv(self.file_path)
+
+    def test_import_missing_file(self):
+        with self.assertRaises(ImportFailedException):
+            Contact.bulk_create_contacts_from_csv(os.path.join(self.directory, "missing.csv"))
+        self.assertFalse(os.path.exists(self.reject_file_path))
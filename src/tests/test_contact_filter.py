@@ -42,6 +42,23 @@ class TestContactFilter(unittest.TestCase):
         self.assertFalse(ContactFilter.matches(self.john, contact_filter))
         self.assertFalse(ContactFilter.matches(self.jane, contact_filter))
 
+    def test_compiled_predicate_is_equivalent(self):
+        contacts = [self.john, self.jane, self.joe, Contact("Ann", "Lee", "(111) 222-3333")]
+        filters = []
+        for search_query in [None, "SMITH", "ne th", "ice", "", "  ", "uottawa 123", "n\0doe", "t\0"]:
+            for min_created_date, max_updated_date in [(None, None), (self.before_joe_created, None),
+                                                       (None, self.before_joe_created)]:
+                contact_filter = ContactFilter()
+                contact_filter.search_query = search_query
+                contact_filter.min_created_date = min_created_date
+                contact_filter.max_updated_date = max_updated_date
+                filters.append(contact_filter)
+        for contact_filter in filters:
+            predicate = ContactFilter.compile_predicate(contact_filter)
+            for contact in contacts:
+                with self.subTest(contact=contact.full_name, contact_filter=str(contact_filter)):
+                    self.assertEqual(predicate(contact), ContactFilter.matches(contact, contact_filter))
+
 
 if __name__ == '__main__':
     unittest.main()
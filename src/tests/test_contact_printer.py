@@ -0,0 +1,45 @@
+import io
+import unittest
+
+from contacts.contact import Contact
+from contacts.contact_printer import ContactPrinter
+
+
+class TestContactPrinter(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            Contact(f"Name{index}", "Doe", "(123) 456-7890", address="123 Main St") for index in range(5)
+        ]
+        self.output = io.StringIO()
+
+    def test_lines_match_to_line(self):
+        printer = ContactPrinter(output=self.output)
+        printer.print_contacts(self.contacts)
+        self.assertEqual(
+            self.output.getvalue().splitlines(),
+            [printer.get_headers()] + [printer.to_line(contact) for contact in self.contacts]
+        )
+
+    def test_page(self):
+        printer = ContactPrinter(page_size=2, output=self.output)
+        self.assertEqual(printer.get_page_count(len(self.contacts)), 3)
+        printer.print_contacts(self.contacts, 4)
+        lines = self.output.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(self.contacts[4].contact_id))
+
+    def test_columns_are_widened_for_the_page(self):
+        self.contacts[1].address = "A" * 30
+        printer = ContactPrinter(page_size=2, output=self.output)
+        printer.print_contacts(self.contacts)
+        lines = self.output.getvalue().splitlines()
+        self.assertEqual(len({len(line) for line in lines}), 1)
+        self.assertTrue(lines[2].endswith("A" * 30))
+
+    def test_no_contacts(self):
+        ContactPrinter(output=self.output).print_contacts([])
+        self.assertEqual(self.output.getvalue(), "No contacts matching current filter\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+import datetime
+import unittest
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+from phone_book.indexes import TrigramIndex, PhoneNumberIndex, DateIndex, SortIndex, GroupIndex
+from phone_book.phone_book import PhoneBook
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.john = Contact("John", "Doe", "(123) 456-7890", "john@example.com", "123 Main St")
+        self.jane = Contact("Jane", "Smith", "(987) 654-3210", "jane@example.com", "456 Elm St")
+        self.index = TrigramIndex()
+        self.index.add(self.john)
+        self.index.add(self.jane)
+
+    def test_get_candidates(self):
+        self.assertEqual(self.index.get_candidates("JOHN"), {self.john})
+        self.assertEqual(self.index.get_candidates("smith main"), {self.john, self.jane})
+        self.assertEqual(self.index.get_candidates("alice"), set())
+
+    def test_short_token_is_not_narrowed(self):
+        self.assertIsNone(self.index.get_candidates("jo"))
+        self.assertIsNone(self.index.get_candidates("john st"))
+
+    def test_remove(self):
+        self.index.remove(self.john)
+        self.assertEqual(self.index.get_candidates("example"), {self.jane})
+        self.index.remove(self.jane)
+        self.assertEqual(len(self.index), 0)
+
+    def test_update(self):
+        old_values = {"last_name": self.john.last_name}
+        self.john.last_name = "Johnson"
+        self.index.update(self.john, old_values)
+        self.assertEqual(self.index.get_candidates("johnson"), {self.john})
+        self.assertEqual(self.index.get_candidates("doe"), set())
+        self.assertEqual(self.index.get_candidates("john"), {self.john})
+
+
+class TestPhoneNumberIndex(unittest.TestCase):
+    def setUp(self):
+        self.john = Contact("John", "Doe", "(123) 456-7890")
+        self.jane = Contact("Jane", "Smith", "(987) 654-3210")
+        self.joe = Contact("Joe", "Smith", "(123) 654-3210")
+        self.index = PhoneNumberIndex()
+        for contact in [self.john, self.jane, self.joe]:
+            self.index.add(contact)
+
+    def test_get_digits(self):
+        self.assertEqual(PhoneNumberIndex.get_digits("(123) 456-7890"), "1234567890")
+
+    def test_lookups(self):
+        self.assertEqual(self.index.find_exact("9876543210"), [self.jane])
+        self.assertEqual(self.index.find_exact("987654321"), [])
+        self.assertCountEqual(self.index.find_by_area_code("123"), [self.john, self.joe])
+        self.assertCountEqual(self.index.find_by_prefix("1236"), [self.joe])
+        self.assertCountEqual(self.index.find_by_suffix("3210"), [self.jane, self.joe])
+
+    def test_find(self):
+        self.assertEqual(self.index.find("(987) 654-3210"), {self.jane})
+        self.assertEqual(self.index.find("(123)"), {self.john, self.joe})
+        self.assertEqual(self.index.find("-3210"), {self.jane, self.joe})
+        self.assertEqual(self.index.find(") "), {self.john, self.jane, self.joe})
+        self.assertEqual(self.index.find("abc"), set())
+        self.assertIsNone(self.index.find(" 654"))
+
+    def test_update(self):
+        old_values = {"phone_number": self.john.phone_number}
+        self.john.phone_number = "(555) 123-4567"
+        self.index.update(self.john, old_values)
+        self.assertEqual(self.index.find_by_area_code("555"), [self.john])
+        self.assertEqual(self.index.find_exact("1234567890"), [])
+        self.assertEqual(len(self.index), 3)
+
+
+class TestDateIndex(unittest.TestCase):
+    def setUp(self):
+        self.john = Contact("John", "Doe", "(123) 456-7890")
+        self.jane = Contact("Jane", "Smith", "(987) 654-3210")
+        self.index = DateIndex("updated_date")
+        self.index.add(self.john, 0)
+        self.index.add(self.jane, 1)
+
+    def test_get_range(self):
+        self.assertEqual(self.index.get_range(), [self.john, self.jane])
+        self.assertEqual(self.index.get_range(min_date=self.jane.updated_date), [self.jane])
+        self.assertEqual(self.index.get_range(max_date=self.john.updated_date), [self.john])
+        self.assertEqual(self.index.get_range(self.jane.updated_date, self.john.updated_date), [])
+
+    def test_update(self):
+        old_values = {"updated_date": self.john.updated_date}
+        self.john.address = "123 Main St"
+        self.index.update(self.john, 0, old_values)
+        self.assertEqual(self.index.get_range(), [self.jane, self.john])
+        self.assertEqual(self.index.get_range(min_date=self.john.updated_date), [self.john])
+        self.assertEqual(len(self.index), 2)
+
+
+class TestSortIndex(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            Contact("John", "Doe", "(123) 456-7890"),
+            Contact("Ann", "Doe", "(987) 654-3210"),
+            Contact("Zoe", "Doe", "(987) 654-3210"),
+            Contact("Bob", "Doe", "(555) 000-0000"),
+        ]
+        self.index = SortIndex("phone_number")
+        self.index.add_many((contact, sequence_number) for sequence_number, contact in enumerate(self.contacts))
+
+    def test_iter_sorted_keeps_insertion_order_of_ties(self):
+        for ascending in [True, False]:
+            with self.subTest(ascending=ascending):
+                expected = sorted(self.contacts, key=lambda contact: contact.phone_number, reverse=not ascending)
+                self.assertEqual(list(self.index.iter_sorted(ascending)), expected)
+
+    def test_update(self):
+        old_values = {"phone_number": self.contacts[2].phone_number}
+        self.contacts[2].phone_number = "(000) 000-0000"
+        self.index.update(self.contacts[2], 2, old_values)
+        self.index.remove(self.contacts[0], 0)
+        self.assertEqual(list(self.index.iter_sorted(False)), [self.contacts[1], self.contacts[3], self.contacts[2]])
+        self.assertEqual(len(self.index), 3)
+
+
+class TestGroupIndex(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            Contact("John", "Smith", "(123) 456-7890"),
+            Contact("Ann", "Doe", "(987) 654-3210"),
+            Contact("Zoe", "Stone", "(987) 654-3210"),
+        ]
+        self.index = GroupIndex(lambda contact: contact.last_name[0], ["last_name"])
+        self.index.add_many((contact, sequence_number) for sequence_number, contact in enumerate(self.contacts))
+
+    def test_groups(self):
+        self.assertEqual(self.index.get_group_names(), ["D", "S"])
+        self.assertEqual(
+            list(self.index.items()), [("D", [self.contacts[1]]), ("S", [self.contacts[0], self.contacts[2]])]
+        )
+        self.assertEqual(self.index.get_count("S"), 2)
+        self.assertEqual(self.index.get_count("X"), 0)
+        self.assertEqual(len(self.index), 3)
+
+    def test_update_and_remove(self):
+        old_values = {"last_name": self.contacts[1].last_name}
+        self.contacts[1].last_name = "Adams"
+        self.index.update(self.contacts[1], 1, old_values)
+        self.index.update(self.contacts[2], 2, {"first_name": "Zoe"})
+        self.index.remove_many([0, 2])
+        self.assertEqual(list(self.index.items()), [("A", [self.contacts[1]])])
+        self.assertEqual(self.index.get_group("S"), [])
+
+
+class TestPhoneBookSearch(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            Contact("John", "Doe", "(123) 456-7890", "john@example.com", "123 Main St"),
+            Contact("Jane", "Smith", "(987) 654-3210", "jane@example.com", "456 Elm St"),
+            Contact("Joe", "Smith", "(987) 654-3210", "joe@uottawa.ca", "789 Last St"),
+        ]
+        self.phone_book = PhoneBook(list(self.contacts))
+
+    def assert_matches_full_scan(self, search_query: str):
+        contact_filter = ContactFilter()
+        contact_filter.search_query = search_query
+        expected = PhoneBook.sort_values(
+            [contact for contact in self.phone_book.contacts if ContactFilter.matches(contact, contact_filter)],
+            contact_filter
+        )
+        self.assertEqual(self.phone_book.apply(contact_filter), expected)
+
+    def test_search_matches_full_scan(self):
+        for search_query in ["smith", "ne th", "ottawa", "654", "nobody", "", "a  b"]:
+            with self.subTest(search_query=search_query):
+                self.assert_matches_full_scan(search_query)
+
+    def test_date_range_matches_full_scan(self):
+        contact_filter = ContactFilter()
+        contact_filter.min_created_date = self.contacts[1].created_date
+        contact_filter.max_updated_date = self.contacts[1].updated_date
+        self.assertEqual(self.phone_book.apply(contact_filter), [self.contacts[1]])
+
+        before_edit = datetime.datetime.now()
+        self.contacts[0].first_name = "Johnny"
+        contact_filter = ContactFilter()
+        contact_filter.min_updated_date = before_edit
+        contact_filter.search_query = "johnny smith"
+        self.assertEqual(self.phone_book.apply(contact_filter), [self.contacts[0]])
+
+    def test_search_after_edit(self):
+        self.contacts[0].email = "johnny@uottawa.ca"
+        self.assert_matches_full_scan("uottawa")
+        self.assertEqual(len(self.phone_book.current_results), 2)
+
+    def test_search_after_delete(self):
+        self.phone_book.delete_contact(self.contacts[2])
+        self.contacts[2].last_name = "Brown"
+        self.assert_matches_full_scan("smith")
+        self.assert_matches_full_scan("brown")
+        self.assertEqual(self.phone_book.current_results, [])
+
+    def test_retrieve_contact_by_phone_after_edit(self):
+        self.contacts[0].phone_number = "(555) 123-4567"
+        for phone_number in ["(555) 123-4567", "(987)", "3210", " 654", "(123) 456-7890"]:
+            with self.subTest(phone_number=phone_number):
+                expected = [contact for contact in self.contacts if phone_number in contact.phone_number]
+                self.assertEqual(self.phone_book.retrieve_contact_by_phone(phone_number), expected)
+        self.assertEqual(self.phone_book.retrieve_contacts_by_area_code("555"), [self.contacts[0]])
@@ -0,0 +1,184 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import ContactAlreadyExistsException, StorageException
+from phone_book.contact_store import ContactRecordCodec
+from phone_book.mapped_phone_book import MappedPhoneBook
+from phone_book.phone_book import PhoneBook
+
+
+class TestMappedPhoneBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "contacts.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def get_values(contacts):
+        return [ContactRecordCodec.encode(contact) for contact in contacts]
+
+    def reopen(self, phone_book: MappedPhoneBook) -> MappedPhoneBook:
+        phone_book.close()
+        return MappedPhoneBook.open(self.file_path)
+
+    def test_mutations_are_written_in_place(self):
+        phone_book = MappedPhoneBook.open(self.file_path)
+        john = Contact("John", "Doe", "(123) 456-7890", "john@example.com")
+        jane = Contact("Jäne", "Smith", "(987) 654-3210")
+        joe = Contact("Joe", "Smith", "(555) 123-4567", address="789 Last St")
+        phone_book.add_contacts([john, jane])
+        phone_book.add_contact(joe)
+        phone_book.delete_contact(john)
+        jane.email = "jane@example.com"
+
+        reopened = self.reopen(phone_book)
+        self.assertEqual(reopened.contact_count, 2)
+        self.assertEqual(self.get_values(reopened.contacts), self.get_values([jane, joe]))
+        reopened.retrieve_contacts_by_id(joe.contact_id)[0].last_name = "Brown"
+        self.assertEqual(reopened.retrieve_contacts_by_id(john.contact_id), [])
+
+        reopened = self.reopen(reopened)
+        self.assertEqual([contact.full_name for contact in reopened.contacts], ["Jäne Smith", "Joe Brown"])
+        reopened.close()
+
+    def test_contacts_are_materialized_once(self):
+        phone_book = MappedPhoneBook.open(self.file_path)
+        phone_book.add_contacts([Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(3)])
+        phone_book = self.reopen(phone_book)
+        self.assertEqual(phone_book.contact_count, 3)
+        first = phone_book.retrieve_contacts_by_name("Name1")[0]
+        self.assertIs(phone_book.retrieve_contacts_by_id(first.contact_id)[0], first)
+        self.assertEqual([contact.first_name for contact in phone_book.get_contacts_page(1, 5)], ["Name1", "Name2"])
+        self.assertIs(phone_book.get_contacts_page(1, 1)[0], first)
+        self.assertIn(first, phone_book.current_results)
+        with self.assertRaises(ContactAlreadyExistsException):
+            phone_book.add_contact(Contact.restore(
+                first.contact_id, "Name1", "Doe", "(123) 456-7890", None, None,
+                first.created_date, first.updated_date
+            ))
+        phone_book.close()
+
+    def test_ids_are_indexed(self):
+        phone_book = MappedPhoneBook.open(self.file_path)
+        contacts = [Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(3)]
+        phone_book.add_contacts(contacts)
+        phone_book.delete_contact(contacts[1])
+        phone_book = self.reopen(phone_book)
+        store = phone_book.store
+        self.assertEqual([store.find(contact.contact_id) for contact in contacts], [0, None, 2])
+        self.assertIsNone(store.find("not an id"))
+        with self.assertRaises(ContactAlreadyExistsException):
+            phone_book.add_contacts([contacts[1], Contact.restore(
+                contacts[2].contact_id, "Name2", "Doe", "(123) 456-7890", None, None,
+                contacts[2].created_date, contacts[2].updated_date
+            )])
+        phone_book.add_contacts([contacts[1]])
+        self.assertEqual(store.find(contacts[1].contact_id), 3)
+        phone_book.close()
+
+    def test_matches_in_memory_phone_book(self):
+        phone_book = MappedPhoneBook.open(self.file_path)
+        contacts = [
+            Contact(f"Name{index % 7}", f"Last{index % 5}", f"({100 + index % 3}) 555-{1000 + index}")
+            for index in range(200)
+        ]
+        phone_book.add_contacts(contacts)
+        phone_book = self.reopen(phone_book)
+        restored = phone_book.contacts
+        in_memory = PhoneBook([
+            Contact.restore(
+                contact.contact_id, contact.first_name, contact.last_name, contact.phone_number, contact.email,
+                contact.address, contact.created_date, contact.updated_date
+            )
+            for contact in restored
+        ])
+        middle = restored[100].created_date
+        filters = [ContactFilter(), ContactFilter(), ContactFilter()]
+        filters[0].search_query = "name3 last4"
+        filters[0].sort_field = ContactSort.LAST_NAME
+        filters[1].min_created_date = middle
+        filters[1].ascending = False
+        filters[1].sort_field = ContactSort.FIRST_NAME
+        filters[2].max_updated_date = middle + datetime.timedelta(microseconds=1)
+        for contact_filter in filters:
+            with self.subTest(contact_filter=str(contact_filter)):
+                self.assertEqual(
+                    [contact.contact_id for contact in phone_book.apply(contact_filter)],
+                    [contact.contact_id for contact in in_memory.apply(contact_filter)]
+                )
+        self.assertEqual(
+            self.get_values(phone_book.retrieve_contacts_by_area_code("101")),
+            self.get_values(in_memory.retrieve_contacts_by_area_code("101"))
+        )
+
+        edited = phone_book.current_results[0]
+        edited.first_name = "Zed"
+        self.assertEqual(
+            [contact.contact_id for contact in phone_book.current_results],
+            [contact.contact_id for contact in phone_book.apply(phone_book.contact_filter)]
+        )
+        phone_book.close()
+
+    def test_too_long_field_is_rejected(self):
+        phone_book = MappedPhoneBook.open(self.file_path)
+        with self.assertRaises(StorageException):
+            phone_book.add_contacts([
+                Contact("John", "Doe", "(123) 456-7890"), Contact("John", "Doe", "(123) 456-7890", address="x" * 300)
+            ])
+        self.assertEqual(phone_book.contact_count, 0)
+
+        contact = Contact("John", "Doe", "(123) 456-7890", address="123 Main St")
+        phone_book.add_contact(contact)
+        updated_date = contact.updated_date
+        with self.assertRaises(StorageException):
+            contact.address = "x" * 300
+        self.assertEqual((contact.address, contact.updated_date), ("123 Main St", updated_date))
+        self.assertEqual(phone_book.retrieve_contact_by_phone("456"), [contact])
+        self.assertEqual(phone_book.current_results, [contact])
+        replacement = contact.copy()
+        replacement.address = "x" * 300
+        with self.assertRaises(StorageException):
+            phone_book.replace_contact(contact, replacement)
+        self.assertEqual(phone_book.current_results, [contact])
+        replacement.address = "1 Main St"
+        phone_book.replace_contact(contact, replacement)
+        self.assertIs(phone_book.retrieve_contacts_by_id(contact.contact_id)[0], replacement)
+        phone_book = self.reopen(phone_book)
+        self.assertEqual(self.get_values(phone_book.contacts), self.get_values([replacement]))
+        phone_book.close()
+
+    def test_too_long_row_is_rejected_on_import(self):
+        csv_path = os.path.join(self.directory, "contacts.csv")
+        reject_path = os.path.join(self.directory, "rejects.csv")
+        with open(csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write("First Name,Last Name,Phone Number,Email,Address\n")
+            csv_file.write("John,Doe,(123) 456-7890,,\n")
+            csv_file.write(f"Jane,Doe,(123) 456-7891,,{'x' * 300}\n")
+            csv_file.write("Joe,Doe,(123) 456-7892,,\n")
+        for workers in [0, 2]:
+            with self.subTest(workers=workers):
+                phone_book = MappedPhoneBook.open(os.path.join(self.directory, f"contacts{workers}.db"))
+                self.assertEqual(phone_book.import_from_file(csv_path, reject_path, workers=workers), 2)
+                self.assertEqual([contact.first_name for contact in phone_book.contacts], ["John", "Joe"])
+                with open(reject_path, encoding="utf-8") as reject_file:
+                    rejected = reject_file.read().splitlines()
+                self.assertEqual(len(rejected), 2)
+                self.assertTrue(rejected[1].startswith("3,The address is longer than the 256 bytes of the record"))
+                phone_book.close()
+
+    def test_not_a_store(self):
+        with open(self.file_path, "wb") as file:
+            file.write(b"not a contact store" * 10)
+        with self.assertRaises(StorageException):
+            MappedPhoneBook.open(self.file_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
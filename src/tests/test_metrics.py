@@ -0,0 +1,76 @@
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter
+from metrics import CallProfiler, LatencyHistogram, MetricsRegistry
+from phone_book.phone_book import PhoneBook
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_histogram_buckets(self):
+        histogram = LatencyHistogram([0.1, 1.0])
+        for seconds in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(seconds)
+        self.assertEqual(histogram.get_cumulative_counts(), [("0.1", 2), ("1.0", 3), ("+Inf", 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+        self.assertEqual(histogram.get_quantile(0.5), 0.1)
+        self.assertEqual(histogram.get_quantile(0.75), 1.0)
+        self.assertEqual(histogram.get_quantile(1.0), 2.0)
+        self.assertEqual(LatencyHistogram().get_quantile(0.5), 0.0)
+
+    def test_dump(self):
+        metrics = MetricsRegistry([0.1])
+        metrics.observe("action", 'Show "All"', 0.05)
+        metrics.observe("operation", "apply", 0.2)
+        prometheus_path = os.path.join(self.directory, "metrics.prom")
+        metrics.dump(prometheus_path)
+        with open(prometheus_path, encoding="utf-8") as metrics_file:
+            lines = metrics_file.read().splitlines()
+        self.assertIn("# TYPE phone_book_action_duration_seconds histogram", lines)
+        self.assertIn('phone_book_action_duration_seconds_bucket{name="Show \\"All\\"",le="0.1"} 1', lines)
+        self.assertIn('phone_book_operation_duration_seconds_bucket{name="apply",le="+Inf"} 1', lines)
+        self.assertIn('phone_book_operation_duration_seconds_count{name="apply"} 1', lines)
+
+        json_path = os.path.join(self.directory, "metrics.json")
+        metrics.dump(json_path, "json")
+        with open(json_path, encoding="utf-8") as metrics_file:
+            self.assertEqual(json.load(metrics_file)["operation"]["apply"]["buckets"], {"0.1": 0, "+Inf": 1})
+        self.assertEqual(sorted(os.listdir(self.directory)), ["metrics.json", "metrics.prom"])
+
+    def test_instrument(self):
+        phone_book = PhoneBook([Contact("John", "Doe", "(123) 456-7890")])
+        metrics = MetricsRegistry()
+        metrics.instrument(phone_book, ["apply", "query"])
+        phone_book.apply(ContactFilter())
+        phone_book.query(ContactFilter(), limit=1)
+        self.assertEqual(metrics.get_histogram("operation", "apply").count, 1)
+        self.assertEqual(metrics.get_histogram("operation", "query").count, 2)
+        self.assertEqual(len(phone_book.current_results), 1)
+        self.assertIsNone(MetricsRegistry().get_histogram("operation", "apply"))
+        self.assertNotIn("apply", vars(PhoneBook()))
+
+    def test_profiler(self):
+        profiler = CallProfiler(os.path.join(self.directory, "profiles"))
+        with profiler.profile("Build List"):
+            sorted(str(value) for value in range(1000))
+        profile_path, allocations_path = profiler.last_paths
+        self.assertTrue(profile_path.name.startswith("build_list-"))
+        self.assertGreater(pstats.Stats(str(profile_path)).total_calls, 0)
+        with open(allocations_path, encoding="utf-8") as allocations_file:
+            self.assertTrue(allocations_file.readline().startswith("Peak traced memory: "))
+
+
+if __name__ == '__main__':
+    unittest.main()
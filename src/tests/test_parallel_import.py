@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts.contact import Contact
+from contacts.contact_import import RejectedRowsWriter
+from contacts.parallel_import import split_into_row_ranges, iter_contacts_from_csv_parallel
+from exceptions.exceptions import ImportFailedException
+from phone_book.phone_book import PhoneBook
+
+
+class TestParallelImport(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "contacts.csv")
+        lines = ["First Name,Last Name,Phone Number,Email,Address"]
+        for index in range(60):
+            phone_number = f"(123) 456-{index:04d}" if index % 13 != 5 else "123-456-7890"
+            lines.append(f"Name{index},Last{index},{phone_number},name{index}@example.com,{index} Main St")
+        with open(self.file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+            csv_file.write("\n".join(lines) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_split_into_row_ranges(self):
+        field_names, ranges = split_into_row_ranges(self.file_path, 100)
+        self.assertEqual(field_names, ["First Name", "Last Name", "Phone Number", "Email", "Address"])
+        self.assertGreater(len(ranges), 1)
+        with open(self.file_path, mode="rb") as csv_file:
+            content = csv_file.read()
+        self.assertEqual(ranges[-1][1], len(content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(content[end - 1:end], b"\n")
+
+    def test_parallel_import_matches_sequential(self):
+        sequential_rejects_path = os.path.join(self.directory, "sequential_rejects.csv")
+        parallel_rejects_path = os.path.join(self.directory, "parallel_rejects.csv")
+        with RejectedRowsWriter(sequential_rejects_path) as rejects:
+            chunks = list(Contact.iter_contacts_from_csv(self.file_path, rejects=rejects))
+        sequential = [contact for chunk in chunks for contact in chunk]
+        with RejectedRowsWriter(parallel_rejects_path) as rejects:
+            chunks = list(iter_contacts_from_csv_parallel(
+                self.file_path, chunk_size=7, rejects=rejects, workers=2, range_size=200
+            ))
+        parallel = [contact for chunk in chunks for contact in chunk]
+        self.assertTrue(all(len(chunk) <= 7 for chunk in chunks))
+        self.assertEqual(
+            [(contact.full_name, contact.phone_number, contact.email, contact.address) for contact in parallel],
+            [(contact.full_name, contact.phone_number, contact.email, contact.address) for contact in sequential]
+        )
+        with open(sequential_rejects_path, encoding="utf-8") as sequential_file, \
+                open(parallel_rejects_path, encoding="utf-8") as parallel_file:
+            self.assertEqual(parallel_file.read(), sequential_file.read())
+
+    def test_parallel_import_fails_without_rejects(self):
+        with self.assertRaises(ImportFailedException):
+            PhoneBook.from_file(self.file_path, workers=2)
+
+    def test_phone_book_from_file(self):
+        phone_book = PhoneBook.from_file(self.file_path, os.path.join(self.directory, "rejects.csv"), workers=2)
+        self.assertEqual(len(phone_book.contacts), 55)
+        self.assertEqual(phone_book.retrieve_contacts_by_name("Name59 Last59")[0].email, "name59@example.com")
@@ -0,0 +1,119 @@
+import shutil
+import tempfile
+import unittest
+
+from contacts.contact import Contact
+from exceptions.exceptions import StorageException
+from phone_book.contact_store import ContactStore, ContactRecordCodec
+from phone_book.persistent_phone_book import PersistentPhoneBook
+
+
+class TestPersistentPhoneBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def get_values(contacts):
+        return [
+            (contact.contact_id, contact.first_name, contact.last_name, contact.phone_number, contact.email,
+             contact.address, contact.created_date, contact.updated_date)
+            for contact in contacts
+        ]
+
+    def reopen(self, phone_book: PersistentPhoneBook) -> PersistentPhoneBook:
+        phone_book.close()
+        return PersistentPhoneBook.open(self.directory)
+
+    def test_codec_round_trip(self):
+        contact = Contact("Jöhn", "Doe", "(123) 456-7890", None, "123 Main St")
+        decoded, offset = ContactRecordCodec.decode(ContactRecordCodec.encode(contact))
+        self.assertEqual(self.get_values([decoded]), self.get_values([contact]))
+        self.assertEqual(offset, len(ContactRecordCodec.encode(contact)))
+
+    def test_mutations_survive_restart(self):
+        phone_book = PersistentPhoneBook.open(self.directory)
+        john = Contact("John", "Doe", "(123) 456-7890", "john@example.com")
+        jane = Contact("Jane", "Smith", "(987) 654-3210")
+        joe = Contact("Joe", "Smith", "(555) 123-4567", address="789 Last St")
+        phone_book.add_contact(john)
+        phone_book.add_contacts([jane, joe])
+        jane.email = "jane@example.com"
+        phone_book.delete_contact(john)
+
+        reopened = self.reopen(phone_book)
+        self.assertEqual(self.get_values(reopened.contacts), self.get_values([jane, joe]))
+        self.assertEqual(reopened.store.journal_entry_count, 5)
+
+        reopened.compact()
+        reopened.retrieve_contacts_by_id(joe.contact_id)[0].last_name = "Brown"
+        reopened = self.reopen(reopened)
+        self.assertEqual(reopened.store.journal_entry_count, 1)
+        self.assertEqual([contact.full_name for contact in reopened.contacts], ["Jane Smith", "Joe Brown"])
+        self.assertEqual(reopened.retrieve_contacts_by_id(jane.contact_id)[0].created_date, jane.created_date)
+        reopened.close()
+
+    def test_too_long_field_changes_nothing(self):
+        phone_book = PersistentPhoneBook.open(self.directory)
+        contact = Contact("John", "Doe", "(123) 456-7890")
+        too_long = "x" * ContactRecordCodec.NONE_LENGTH
+        with self.assertRaises(StorageException):
+            phone_book.add_contacts([Contact("Jane", "Doe", "(123) 456-7891", address=too_long), contact])
+        self.assertEqual(phone_book.contact_count, 0)
+        phone_book.add_contact(contact)
+        updated_date = contact.updated_date
+        with self.assertRaises(StorageException):
+            contact.address = too_long
+        self.assertEqual((contact.address, contact.updated_date), (None, updated_date))
+        self.assertEqual(phone_book.retrieve_contacts_by_name("john"), [contact])
+
+        reopened = self.reopen(phone_book)
+        self.assertEqual(self.get_values(reopened.contacts), self.get_values([contact]))
+        self.assertEqual(reopened.store.journal_entry_count, 1)
+        reopened.close()
+
+    def test_delete_contacts_survives_restart(self):
+        phone_book = PersistentPhoneBook.open(self.directory)
+        contacts = [Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(50)]
+        phone_book.add_contacts(contacts)
+        phone_book.delete_contacts(contact for contact in contacts if contact.first_name.endswith("3"))
+        self.assertEqual(phone_book.store.journal_entry_count, 55)
+        reopened = self.reopen(phone_book)
+        self.assertEqual(
+            self.get_values(reopened.contacts),
+            self.get_values([contact for contact in contacts if not contact.first_name.endswith("3")])
+        )
+        reopened.close()
+
+    def test_journal_is_compacted(self):
+        phone_book = PersistentPhoneBook.open(self.directory)
+        contacts = [Contact(f"Name{index}", "Doe", "(123) 456-7890") for index in range(10)]
+        for contact in contacts:
+            phone_book.add_contact(contact)
+        ContactStore.MIN_COMPACTION_ENTRIES = 1
+        try:
+            phone_book.delete_contact(contacts[0])
+        finally:
+            ContactStore.MIN_COMPACTION_ENTRIES = 1000
+        self.assertEqual(phone_book.store.journal_entry_count, 0)
+        reopened = self.reopen(phone_book)
+        self.assertEqual(self.get_values(reopened.contacts), self.get_values(contacts[1:]))
+        reopened.close()
+
+    def test_partially_written_journal_entry_is_dropped(self):
+        phone_book = PersistentPhoneBook.open(self.directory)
+        contact = Contact("John", "Doe", "(123) 456-7890")
+        phone_book.add_contact(contact)
+        phone_book.add_contact(Contact("Jane", "Smith", "(987) 654-3210"))
+        phone_book.close()
+        with open(phone_book.store.journal_path, mode="r+b") as journal:
+            journal.truncate(journal.seek(0, 2) - 3)
+
+        reopened = PersistentPhoneBook.open(self.directory)
+        self.assertEqual(self.get_values(reopened.contacts), self.get_values([contact]))
+        reopened.add_contact(Contact("Joe", "Smith", "(555) 123-4567"))
+        reopened = self.reopen(reopened)
+        self.assertEqual([contact.first_name for contact in reopened.contacts], ["John", "Joe"])
+        reopened.close()
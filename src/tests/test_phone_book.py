@@ -1,7 +1,15 @@
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 
 from contacts.contact import Contact
+from contacts.contact_editor import ContactEditor
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import ContactAlreadyExistsException, NoContactsMatchedException, \
+    ContactIsNotRegisteredException, InvalidInputException
 from phone_book.phone_book import PhoneBook
+from util.grouping import LAST_NAME_FIRST_LETTER, get_last_name_first_letter
 
 
 class TestPhoneBook(unittest.TestCase):
@@ -38,3 +46,248 @@ class TestPhoneBook(unittest.TestCase):
         phone_book.add_contact(contact)
         phone_book.delete_contact(contact)
         self.assertEqual(len(phone_book.contacts), 0)
+
+    def test_add_duplicate_contact(self):
+        phone_book = PhoneBook()
+        contact = Contact("John", "Doe", "(123) 456-7890")
+        phone_book.add_contact(contact)
+        with self.assertRaises(ContactAlreadyExistsException):
+            phone_book.add_contact(contact)
+        self.assertEqual(len(phone_book.contacts), 1)
+
+    def test_retrieve_contacts_by_id(self):
+        contact1 = Contact("John", "Doe", "(123) 456-7890")
+        contact2 = Contact("Alice", "Smith", "(987) 654-3210")
+        phone_book = PhoneBook([contact1, contact2])
+
+        self.assertEqual(phone_book.retrieve_contacts_by_id(contact2.contact_id), [contact2])
+        self.assertEqual(phone_book.retrieve_contacts_by_id("missing"), [])
+
+    def test_delete_contacts_by_id(self):
+        contact1 = Contact("John", "Doe", "(123) 456-7890")
+        contact2 = Contact("Alice", "Smith", "(987) 654-3210")
+        phone_book = PhoneBook([contact1, contact2])
+
+        phone_book.delete_contacts_by_id(contact1.contact_id)
+        self.assertEqual(phone_book.contacts, [contact2])
+        self.assertEqual(phone_book.current_results, [contact2])
+        with self.assertRaises(NoContactsMatchedException):
+            phone_book.delete_contacts_by_id(contact1.contact_id)
+
+    def test_delete_unregistered_contact(self):
+        phone_book = PhoneBook([Contact("John", "Doe", "(123) 456-7890")])
+        with self.assertRaises(ContactIsNotRegisteredException):
+            phone_book.delete_contact(Contact("John", "Doe", "(123) 456-7890"))
+
+    def test_current_results_are_kept_incrementally(self):
+        for sort_field in ContactSort:
+            for ascending in [True, False]:
+                with self.subTest(sort_field=sort_field, ascending=ascending):
+                    contact_filter = ContactFilter()
+                    contact_filter.search_query = "smith"
+                    contact_filter.sort_field = sort_field
+                    contact_filter.ascending = ascending
+                    phone_book = PhoneBook()
+                    phone_book.apply(contact_filter)
+                    contacts = [
+                        Contact("John", "Smith", "(123) 456-7890"),
+                        Contact("Alice", "Smith", "(987) 654-3210"),
+                        Contact("Bob", "Doe", "(555) 123-4567"),
+                        Contact("Alice", "Smithson", "(123) 456-7890"),
+                    ]
+                    for contact in contacts:
+                        phone_book.add_contact(contact)
+                    contacts[2].last_name = "Smith"
+                    contacts[0].first_name = "Zed"
+                    contacts[1].phone_number = "(000) 000-0000"
+                    contacts[3].last_name = "Brown"
+                    phone_book.delete_contact(contacts[1])
+
+                    current_results = list(phone_book.current_results)
+                    self.assertEqual(current_results, phone_book.apply(contact_filter))
+                    self.assertEqual(len(current_results), 2)
+
+    def test_current_results_follow_contact_editor(self):
+        contact = Contact("John", "Doe", "(123) 456-7890")
+        phone_book = PhoneBook([contact])
+        contact_filter = ContactFilter()
+        contact_filter.search_query = "doe"
+        phone_book.apply(contact_filter)
+        with patch("builtins.input", side_effect=["n", "y", "Smith", "n", "n", "n"]):
+            ContactEditor.update_from_command_line(contact)
+        self.assertEqual(contact.last_name, "Smith")
+        self.assertEqual(phone_book.current_results, [])
+
+    def test_add_contacts(self):
+        existing = Contact("John", "Smith", "(123) 456-7890")
+        phone_book = PhoneBook([existing])
+        contact_filter = ContactFilter()
+        contact_filter.search_query = "smith"
+        contact_filter.sort_field = ContactSort.FIRST_NAME
+        phone_book.apply(contact_filter)
+        contacts = [Contact(f"Name{index % 7}", "Smith", "(123) 456-7890") for index in range(50)]
+        phone_book.add_contacts(contacts[:3])
+        phone_book.add_contacts(contacts[3:])
+        self.assertEqual(len(phone_book.contacts), 51)
+        self.assertEqual(list(phone_book.current_results), phone_book.apply(contact_filter))
+
+        with self.assertRaises(ContactAlreadyExistsException):
+            phone_book.add_contacts([Contact("Jane", "Doe", "(123) 456-7890"), existing])
+        self.assertEqual(len(phone_book.contacts), 51)
+
+    def test_query_pages(self):
+        phone_book = PhoneBook([
+            Contact(f"Name{index % 7}", f"Last{index % 3}", "(123) 456-7890") for index in range(40)
+        ])
+        current_filter = ContactFilter()
+        current_filter.search_query = "name3"
+        current_results = phone_book.apply(current_filter)
+        expected_pages = []
+        for index, sort_field in enumerate(list(ContactSort) * 2):
+            contact_filter = ContactFilter()
+            contact_filter.search_query = "last1" if index % 3 == 0 else None
+            contact_filter.sort_field, contact_filter.ascending = sort_field, index < len(ContactSort)
+            matching = filter(ContactFilter.compile_predicate(contact_filter), phone_book.contacts)
+            expected_pages.append((contact_filter, PhoneBook.sort_values(list(matching), contact_filter)))
+        for contact_filter, expected in expected_pages:
+            for limit, offset in [(None, 0), (None, 5), (0, 0), (1, 0), (5, 3), (10, 35), (100, 0)]:
+                with self.subTest(contact_filter=str(contact_filter), limit=limit, offset=offset):
+                    self.assertEqual(
+                        phone_book.query(contact_filter, limit, offset),
+                        expected[offset:offset + limit] if limit is not None else expected[offset:]
+                    )
+        self.assertIs(phone_book.contact_filter, current_filter)
+        self.assertEqual(phone_book.current_results, current_results)
+
+        with self.assertRaises(InvalidInputException):
+            phone_book.query(current_filter, limit=-1)
+        with self.assertRaises(InvalidInputException):
+            phone_book.query(current_filter, offset=-1)
+
+    def test_sort_orders_follow_changes(self):
+        contacts = [
+            Contact(f"Name{index % 5}", f"Last{index % 4}", f"(123) 456-{index % 3:04d}") for index in range(30)
+        ]
+        phone_book = PhoneBook(contacts[:20])
+        contact_filter = ContactFilter()
+        for sort_field in ContactSort:
+            contact_filter.sort_field = sort_field
+            phone_book.apply(contact_filter)
+        phone_book.add_contacts(contacts[20:])
+        for contact in contacts[:10:3]:
+            phone_book.delete_contact(contact)
+        for contact in contacts[1::4]:
+            contact.first_name = "Renamed"
+            contact.phone_number = "(999) 000-0000"
+        for sort_field in ContactSort:
+            for ascending in [True, False]:
+                contact_filter.sort_field, contact_filter.ascending = sort_field, ascending
+                with self.subTest(sort_field=sort_field, ascending=ascending):
+                    expected = PhoneBook.sort_values(phone_book.contacts, contact_filter)
+                    self.assertEqual(phone_book.apply(contact_filter), expected)
+                    self.assertEqual(phone_book.query(contact_filter, 4, 3), expected[3:7])
+
+    def test_delete_contacts(self):
+        contacts = [
+            Contact(f"Name{index % 6}", f"Last{index % 4}", f"(123) 456-{index:04d}") for index in range(100)
+        ]
+        phone_book = PhoneBook(contacts)
+        contact_filter = ContactFilter()
+        contact_filter.search_query = "last1"
+        contact_filter.sort_field = ContactSort.FIRST_NAME
+        phone_book.apply(contact_filter)
+        phone_book.apply(ContactFilter())
+        with self.assertRaises(ContactIsNotRegisteredException):
+            phone_book.delete_contacts([contacts[0], Contact("John", "Doe", "(123) 456-7890")])
+        self.assertEqual(phone_book.contact_count, 100)
+
+        for deleted in [contacts[:3], contacts[3:70:2] + contacts[3:70:2]]:
+            with self.assertLogs(PhoneBook.logger, level="INFO") as logs:
+                phone_book.delete_contacts(deleted)
+            self.assertEqual(logs.output, [f"INFO:PhoneBookLogger:{len(set(deleted))} contacts deleted"])
+        remaining = [contact for contact in contacts[3:] if contact not in contacts[3:70:2]]
+        self.assertEqual(phone_book.contacts, remaining)
+        self.assertEqual(phone_book.current_results, remaining)
+        self.assertEqual(
+            phone_book.apply(contact_filter),
+            PhoneBook.sort_values([contact for contact in remaining if contact.last_name == "Last1"], contact_filter)
+        )
+        self.assertEqual(phone_book.retrieve_contact_by_phone("(123) 456-0005"), [])
+        self.assertEqual(phone_book.retrieve_contacts_by_area_code("123"), remaining)
+        contacts[5].first_name = "Deleted"
+        self.assertNotIn(contacts[5], phone_book.current_results)
+
+    def test_replace_contact(self):
+        for vectorized in [False, True]:
+            with self.subTest(vectorized=vectorized):
+                contacts = [Contact("John", f"Doe{index}", f"(123) 456-{index:04d}") for index in range(3)]
+                phone_book = PhoneBook(list(contacts), vectorized=vectorized)
+                groups = phone_book.get_groups("first_letter", lambda contact: contact.first_name[0], ["first_name"])
+                contact_filter = ContactFilter()
+                contact_filter.sort_field = ContactSort.FIRST_NAME
+                phone_book.apply(contact_filter)
+                replacement = contacts[0].copy()
+                replacement.first_name = "Jane"
+                with self.assertRaises(InvalidInputException):
+                    phone_book.replace_contact(contacts[0], contacts[1].copy())
+                phone_book.replace_contact(contacts[0], replacement)
+                with self.assertRaises(ContactIsNotRegisteredException):
+                    phone_book.replace_contact(contacts[0], replacement)
+                self.assertEqual(phone_book.contacts, [replacement] + contacts[1:])
+                self.assertEqual(phone_book.current_results, [replacement] + contacts[1:])
+                self.assertEqual(phone_book.retrieve_contact_by_phone("0000"), [replacement])
+                self.assertEqual(list(groups.items()), [("J", [replacement] + contacts[1:])])
+                contacts[0].last_name = "Unregistered"
+                replacement.first_name = "Zed"
+                self.assertEqual(phone_book.current_results, contacts[1:] + [replacement])
+                contact_filter.sort_field = ContactSort.CREATED_DATE
+                self.assertEqual(phone_book.apply(contact_filter), [replacement] + contacts[1:])
+
+    def test_groups_follow_changes(self):
+        contacts = [Contact("John", f"{'ABC'[index % 3]}oe", "(123) 456-7890") for index in range(60)]
+        phone_book = PhoneBook(contacts[:40])
+        groups = phone_book.get_groups("first_letter", lambda contact: contact.last_name[0], ["last_name"])
+        self.assertIs(phone_book.get_groups("first_letter", lambda contact: "", []), groups)
+        phone_book.add_contacts(contacts[40:])
+        phone_book.delete_contacts(contacts[:45])
+        phone_book.delete_contact(contacts[45])
+        contacts[46].last_name = "Zed"
+        contacts[47].first_name = "Jane"
+        expected = PhoneBook.get_grouped_by(phone_book.contacts, lambda contact: contact.last_name[0])
+        self.assertEqual(list(groups.items()), sorted(expected.items()))
+        self.assertEqual(groups.get_count("Z"), 1)
+
+    def test_failing_group_key_changes_nothing(self):
+        contacts = [Contact("John", "Doe", "(123) 456-7890"), Contact("Jane", "", "(123) 456-7891")]
+        phone_book = PhoneBook(contacts[:1])
+        phone_book.get_groups("strict", lambda contact: contact.last_name[0], ["last_name"])
+        with self.assertRaises(IndexError):
+            phone_book.add_contacts(contacts[1:])
+        self.assertEqual(phone_book.contacts, contacts[:1])
+        self.assertEqual(phone_book.current_results, contacts[:1])
+        self.assertEqual(phone_book.retrieve_contacts_by_name("Jane"), [])
+
+        contacts = [Contact("John", "Doe", "(123) 456-7890"), Contact("Jane", "", "(123) 456-7891")]
+        phone_book = PhoneBook(contacts[:1])
+        groups = phone_book.get_groups(LAST_NAME_FIRST_LETTER, get_last_name_first_letter, ["last_name"])
+        phone_book.add_contacts(contacts[1:])
+        contacts[0].last_name = ""
+        self.assertEqual(list(groups.items()), [("", contacts)])
+        phone_book.delete_contact(contacts[1])
+        self.assertEqual(phone_book.current_results, contacts[:1])
+
+    def test_from_file_with_rejects(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "contacts.csv")
+            reject_file_path = os.path.join(directory, "rejects.csv")
+            with open(file_path, mode="w", newline="", encoding="utf-8") as csv_file:
+                csv_file.write(
+                    "First Name,Last Name,Phone Number,Email,Address\n"
+                    "John,Smith,(123) 456-7890,john.smith@example.com,123 Main St\n"
+                    "Alice,Johnson,123-456-7890,alice.johnson@example.com,456 Elm St\n"
+                    "Michael,Williams,(555) 123-7890,michael.williams@example.com,789 Oak St\n"
+                )
+            phone_book = PhoneBook.from_file(file_path, reject_file_path, chunk_size=1)
+            self.assertEqual([contact.first_name for contact in phone_book.contacts], ["John", "Michael"])
+            self.assertEqual(phone_book.current_results, phone_book.contacts)
+            self.assertTrue(os.path.exists(reject_file_path))
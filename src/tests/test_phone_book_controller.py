@@ -1,7 +1,12 @@
+import json
+import os
+import shutil
+import tempfile
 import unittest
 from io import StringIO
 from unittest.mock import patch
 
+from metrics import MetricsSetup
 from phone_book.phone_book_controller import PhoneBookController
 
 
@@ -30,3 +35,22 @@ class TestPhoneBookController(unittest.TestCase):
         assert mock_input
         phone_book_controller = PhoneBookController()
         phone_book_controller.run()
+
+    @patch("builtins.input", side_effect=["9", "y", "Smith", "n", "n", "n", "n", "n", "n", "12"])
+    def test_run_records_metrics(self, mock_input=None):
+        assert mock_input
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        metrics_path = os.path.join(directory, "metrics.json")
+        metrics_setup = MetricsSetup(metrics_path, "json", "Update Filter", os.path.join(directory, "profiles"))
+        phone_book_controller = PhoneBookController(metrics_setup=metrics_setup)
+        with patch("sys.stdout", new_callable=StringIO):
+            phone_book_controller.run()
+
+        metrics = phone_book_controller.metrics
+        self.assertEqual(metrics.get_histogram("action", "Update Filter").count, 1)
+        self.assertEqual(metrics.get_histogram("action", "Exit").count, 1)
+        self.assertEqual(metrics.get_histogram("operation", "apply").count, 1)
+        with open(metrics_path, encoding="utf-8") as metrics_file:
+            self.assertEqual(json.load(metrics_file)["action"]["Update Filter"]["count"], 1)
+        self.assertEqual(len(os.listdir(os.path.join(directory, "profiles"))), 2)
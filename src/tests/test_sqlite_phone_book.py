@@ -0,0 +1,117 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+from contacts.contact import Contact
+from contacts.filter import ContactFilter, ContactSort
+from exceptions.exceptions import ContactAlreadyExistsException
+from phone_book.phone_book import PhoneBook
+from phone_book.sqlite_phone_book import SqlitePhoneBook
+
+
+class TestSqlitePhoneBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database_path = os.path.join(self.directory, "contacts.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reopen(self, phone_book: SqlitePhoneBook) -> SqlitePhoneBook:
+        phone_book.close()
+        return SqlitePhoneBook.open(self.database_path)
+
+    def assert_same_ids(self, contacts, expected):
+        self.assertEqual([contact.contact_id for contact in contacts], [contact.contact_id for contact in expected])
+
+    def test_mutations_survive_restart(self):
+        phone_book = SqlitePhoneBook.open(self.database_path)
+        ann = Contact("Ann", "Lee", "(123) 456-7890", "ann@example.com")
+        bob = Contact("Bob", "Lee", "(987) 654-3210", address="1 First St")
+        phone_book.add_contacts([ann, bob])
+        bob.first_name = "Rob"
+        with self.assertRaises(ContactAlreadyExistsException):
+            phone_book.add_contacts([Contact("Cid", "Lee", "(111) 222-3333"), Contact.restore(
+                ann.contact_id, "Ann", "Lee", "(123) 456-7890", None, None, ann.created_date, ann.updated_date
+            )])
+        self.assertEqual(phone_book.contact_count, 2)
+        phone_book.delete_contact(ann)
+
+        reopened = self.reopen(phone_book)
+        self.assertEqual([contact.full_name for contact in reopened.contacts], ["Rob Lee"])
+        restored = reopened.retrieve_contacts_by_id(bob.contact_id)[0]
+        self.assertEqual((restored.created_date, restored.updated_date), (bob.created_date, bob.updated_date))
+        self.assertEqual(restored.address, "1 First St")
+        self.assertIsNone(restored.email)
+        reopened.close()
+
+    def test_delete_contacts(self):
+        phone_book = SqlitePhoneBook.open(self.database_path)
+        contacts = [Contact(f"Name{index}", "Lee", "(123) 456-7890") for index in range(40)]
+        phone_book.add_contacts(contacts)
+        self.assertEqual(len(phone_book.current_results), 40)
+        phone_book.delete_contacts(contacts[::2])
+        self.assert_same_ids(phone_book.current_results, contacts[1::2])
+        reopened = self.reopen(phone_book)
+        self.assert_same_ids(reopened.contacts, contacts[1::2])
+        reopened.close()
+
+    def test_matches_in_memory_phone_book(self):
+        phone_book = SqlitePhoneBook.open(self.database_path)
+        phone_book.add_contacts([
+            Contact(f"First{index % 4}", f"Last{index % 9}", f"({200 + index % 5}) 555-{1000 + index}",
+                    f"user{index}@example.com" if index % 2 else None)
+            for index in range(150)
+        ])
+        in_memory = PhoneBook([
+            Contact.restore(
+                contact.contact_id, contact.first_name, contact.last_name, contact.phone_number, contact.email,
+                contact.address, contact.created_date, contact.updated_date
+            )
+            for contact in phone_book.contacts
+        ])
+        middle = phone_book.contacts[70].updated_date
+        filters = [ContactFilter() for _ in range(4)]
+        filters[0].search_query = "FIRST2 ast8"
+        filters[0].sort_field = ContactSort.LAST_NAME
+        filters[0].ascending = False
+        filters[1].search_query = "r1"
+        filters[1].sort_field = ContactSort.PHONE_NUMBER
+        filters[2].min_updated_date = middle
+        filters[2].max_created_date = middle + datetime.timedelta(seconds=1)
+        filters[2].sort_field = ContactSort.FIRST_NAME
+        filters[3].search_query = "user1"
+        filters[3].sort_field = ContactSort.ID
+        for contact_filter in filters:
+            with self.subTest(contact_filter=str(contact_filter)):
+                self.assert_same_ids(phone_book.apply(contact_filter), in_memory.apply(contact_filter))
+                self.assert_same_ids(phone_book.query(contact_filter, 3, 2), in_memory.query(contact_filter, 3, 2))
+
+        renamed = phone_book.current_results[-1]
+        renamed.email = "nobody@example.com"
+        self.assertNotIn(renamed, phone_book.current_results)
+        self.assertEqual(phone_book.current_results, phone_book.apply(phone_book.contact_filter))
+        phone_book.close()
+
+    def test_nul_characters_match_in_memory_phone_book(self):
+        phone_book = SqlitePhoneBook.open(self.database_path)
+        contacts = [
+            Contact("Ann", "Lee", "(123) 456-7890", address="1\0Main Street"),
+            Contact("Bob", "Main", "(987) 654-3210", address="2 Elm Street"),
+        ]
+        phone_book.add_contacts(contacts)
+        in_memory = PhoneBook(contacts)
+        for _ in range(2):
+            for search_query in ["main", "street", "lee\0(123"]:
+                contact_filter = ContactFilter()
+                contact_filter.search_query = search_query
+                with self.subTest(search_query=search_query):
+                    self.assert_same_ids(phone_book.query(contact_filter), in_memory.query(contact_filter))
+            phone_book = self.reopen(phone_book)
+        phone_book.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,40 @@
-from typing import List, Callable
+from typing import Iterable, List, Callable, Collection, Tuple
 
 from contacts.contact import Contact
 from contacts.contact_printer import ContactPrinter
 from phone_book.phone_book import PhoneBook
 
+LAST_NAME_FIRST_LETTER = "last_name_first_letter"
+
+
+def get_last_name_first_letter(contact: Contact) -> str:
+    return contact.last_name[:1]
+
 
 def group_and_print(contacts: List[Contact], key: Callable[[Contact], str]):
     if len(contacts) == 0:
         print("No contacts, can't group")
         return
     groups = PhoneBook.get_grouped_by(contacts, key)
+    print_groups(sorted(groups.items()))
+
+
+def group_phone_book_and_print(
+        phone_book: PhoneBook,
+        name: str,
+        key: Callable[[Contact], str],
+        fields: Collection[str]
+):
+    """Print the groups of the whole phone book, which are maintained by the phone book under the name"""
+    groups = phone_book.get_groups(name, key, fields)
+    if len(groups) == 0:
+        print("No contacts, can't group")
+        return
+    print_groups(groups.items())
+
+
+def print_groups(groups: Iterable[Tuple[str, List[Contact]]]):
     printer = ContactPrinter()
-    for name, group in groups.items():
-        print(f"Group Name: {name}")
-        print('-' * 20)
+    for name, group in groups:
+        printer.write(f"Group Name: {name}\n{'-' * 20}\n")
         printer.print_contacts(group)